@@ -2,6 +2,91 @@ import configparser
 import os
 
 class ConfigManager:
+    # 기본 설정값 (신규 키는 load() 에서 자동으로 추가됨)
+    DEFAULTS = {
+        'GEMINI_API_KEY': '',
+        'KIPRIS_API_KEY': '',
+        'TARGET_ITEMS': '',
+        'SHOP_URLS': '',
+        'ITEM_COUNT': '10',
+        'EXCEL_FILE': 'result.xlsx',
+        # 배송비 기본값
+        'COST_BASIC': '3000',
+        'COST_EXCHANGE': '6000',
+        'COST_RETURN': '6000',
+        'COST_AGENCY': '10000',
+        # 엑셀 저장 주기 (N개마다 또는 T초마다 디스크에 기록)
+        'SAVE_EVERY_N': '10',
+        'SAVE_INTERVAL_SEC': '30',
+        # 저장 방식 (excel: 엑셀에 바로 기록 / sqlite: 스테이징 DB 저장 후 종료 시 일괄 내보내기)
+        'SAVE_BACKEND': 'excel',
+        'EXPORT_SHARD_SIZE': '0',
+        # KIPRIS 상표 조회 캐시 유효기간(일) - 상표 발견 / 미발견
+        'KIPRIS_CACHE_FOUND_DAYS': '90',
+        'KIPRIS_CACHE_CLEAR_DAYS': '14',
+        # KIPRIS 동시 조회 스레드 수 / 키 하나당 동시 요청 수
+        'KIPRIS_WORKERS': '4',
+        'KIPRIS_PER_KEY_LIMIT': '2',
+        # Gemini 응답 캐시 사용 여부 / 최대 저장 개수
+        'AI_CACHE_ENABLED': '1',
+        'AI_CACHE_MAX_ENTRIES': '5000',
+        # 상품 분석 방식 (combined: 정보추출+카테고리 1회 호출 / separate: 기존 2회 호출)
+        'ANALYSIS_MODE': 'combined',
+        # 일괄 분석 시 AI 1회 호출에 묶을 상품 수 / 상품당 상세 텍스트 최대 길이
+        'AI_BATCH_SIZE': '10',
+        'AI_BATCH_DETAIL_CHARS': '1200',
+        # 수집-분석 파이프라인 작업 스레드 수 (0: 기존 순차 처리) / 분석 대기열 크기
+        'PIPELINE_WORKERS': '2',
+        'PIPELINE_QUEUE_SIZE': '4',
+        # 결과 페이지 상품 탐색을 JS 1회로 일괄 수행 (0: 기존 요소별 탐색)
+        'FAST_HARVEST': '1',
+        # 상세 페이지 진입 방식 (click: 클릭 후 뒤로가기 / direct: 백그라운드 탭으로 바로 열기) / 미리 열어둘 탭 수
+        'DETAIL_NAV_MODE': 'click',
+        'DETAIL_PREFETCH_TABS': '3',
+        # 조건 기반 대기 (0: 기존 고정 대기) / 최대 대기(초) / 사이트별 최대 대기 (예: taobao:25,1688:25)
+        'ADAPTIVE_WAIT': '1',
+        'WAIT_TIMEOUT': '15',
+        'WAIT_SITE_TIMEOUTS': '',
+        # 사람처럼 보이기 위한 지연 범위(초) - 로딩 대기와 별도
+        'POLITE_DELAY_MIN': '1.0',
+        'POLITE_DELAY_MAX': '3.0',
+        # 리소스 차단 (0: 끄기) / 차단 종류 / 사이트별 허용(예: taobao:images) / 사이트별 추가 차단 패턴 / 차단 끌 사이트
+        'BLOCK_RESOURCES': '1',
+        'BLOCK_CATEGORIES': 'images,media,fonts,trackers',
+        'BLOCK_SITE_ALLOW': '',
+        'BLOCK_SITE_DENY': '',
+        'BLOCK_DISABLED_SITES': '',
+        # 검색/페이지 이동을 주소 템플릿으로 바로 수행 (0: 항상 검색창 입력 + 다음 버튼 클릭)
+        'URL_TEMPLATE_SEARCH': '1',
+        # 브라우저 없이 HTTP 로 먼저 수집 (0: 끄기) / 대상 사이트 / 상세 페이지 동시 요청 수
+        'HTTP_FETCH': '1',
+        'HTTP_FETCH_SITES': 'ebay,rakuten',
+        'HTTP_FETCH_WORKERS': '6',
+        # 동시에 띄울 브라우저 수 (쇼핑몰/키워드 작업 분배, 같은 사이트는 한 번에 한 브라우저만, 1 이면 기존 방식)
+        'BROWSER_WORKERS': '1',
+        # 상세 페이지 핵심 정보만 추출 (0: 기존 body 전체 텍스트) / 추출 텍스트 최대 글자 수
+        'DETAIL_EXTRACT': '1',
+        'DETAIL_TEXT_BUDGET': '2000',
+        # 상세 페이지 구조화 데이터(JSON-LD/microdata)의 브랜드/제조사/모델을 AI 추출 대신 사용 (0: 끄기)
+        'STRUCTURED_EXTRACT': '1',
+        # 목록 단계 사전 필터 (0: 끄기) / 제외할 브랜드 목록 (콤마 구분)
+        'LIST_PREFILTER': '1',
+        'BRAND_DENY_LIST': '',
+        # Gemini 키 풀 스케줄러 (0: 기존 오류 후 키 교체 방식) / 모델별 한도 '모델:RPM/TPM/RPD' (빈 값: 무료 등급 기본값) / 한도 대기 최대 초
+        'AI_RATE_LIMITER': '1',
+        'AI_RATE_LIMITS': '',
+        'AI_QUEUE_MAX_WAIT': '300',
+        # 사용할 Gemini 모델 (콤마 구분, 앞쪽 우선)
+        'AI_MODELS': 'gemini-2.5-flash-lite,gemini-2.5-flash',
+        # 작업별 모델 선택기 (0: 끄기) / 최소 성공률 / 연속 오류 시 제외 횟수 / 제외 시간(초)
+        'AI_MODEL_ROUTER': '1',
+        'AI_QUALITY_FLOOR': '0.9',
+        'AI_BREAKER_ERRORS': '3',
+        'AI_BREAKER_COOLDOWN': '120',
+        # 정보추출/분석/카테고리 응답을 스키마(JSON)로 받기 (0: 일반 응답 + JSON 복구만)
+        'AI_STRUCTURED_OUTPUT': '1',
+    }
+
     def __init__(self, config_file='config.ini'):
         self.config_file = config_file
         self.config = configparser.ConfigParser()
@@ -16,19 +101,7 @@ class ConfigManager:
 
     def create_default(self):
         """기본 설정 생성"""
-        self.config['SETTINGS'] = {
-            'GEMINI_API_KEY': '',
-            'KIPRIS_API_KEY': '',
-            'TARGET_ITEMS': '',
-            'SHOP_URLS': '',
-            'ITEM_COUNT': '10',
-            'EXCEL_FILE': 'result.xlsx',
-            # 배송비 기본값
-            'COST_BASIC': '3000',
-            'COST_EXCHANGE': '6000',
-            'COST_RETURN': '6000',
-            'COST_AGENCY': '10000'
-        }
+        self.config['SETTINGS'] = dict(self.DEFAULTS)
         self.save()
 
     def load(self):
@@ -58,14 +131,8 @@ class ConfigManager:
                 del settings[key]
                 is_modified = True
         
-        # 3. [신규 키 추가] 새로 추가된 배송비 키가 없는 경우 기본값 추가
-        default_costs = {
-            'COST_BASIC': '3000',
-            'COST_EXCHANGE': '6000',
-            'COST_RETURN': '6000',
-            'COST_AGENCY': '10000'
-        }
-        for key, val in default_costs.items():
+        # 3. [신규 키 추가] 새로 추가된 키(배송비, 저장 주기 등)가 없는 경우 기본값 추가
+        for key, val in self.DEFAULTS.items():
             if key not in settings:
                 settings[key] = val
                 is_modified = True
@@ -94,4 +161,27 @@ class ConfigManager:
             # 모든 값을 문자열로 변환하여 저장
             self.config['SETTINGS'][key] = str(value)
             
-        self.save()
\ No newline at end of file
+        self.save()
+
+
+# ==========================
+# 설정값 변환 헬퍼 (설정은 모두 문자열로 저장됨)
+# ==========================
+def get_int(config, key, default):
+    try: return int(str(config.get(key, default)).strip())
+    except (TypeError, ValueError): return default
+
+def get_float(config, key, default):
+    try: return float(str(config.get(key, default)).strip())
+    except (TypeError, ValueError): return default
+
+def get_bool(config, key, default):
+    val = str(config.get(key, '')).strip().lower()
+    if not val: return default
+    return val in ('1', 'true', 'yes', 'on', 'y')
+
+def get_list(config, key, default=None):
+    """콤마 구분 문자열 -> 리스트 (공백 항목 제외)"""
+    val = config.get(key, '')
+    if not val: return list(default or [])
+    return [v.strip() for v in str(val).split(',') if v.strip()]
@@ -0,0 +1,150 @@
+import time
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key         TEXT PRIMARY KEY,
+    model       TEXT NOT NULL,
+    context     TEXT,
+    response    TEXT NOT NULL,
+    created_at  REAL NOT NULL,
+    expires_at  REAL,               -- NULL 이면 만료 없음
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access);
+"""
+
+_DAY = 24 * 60 * 60
+
+# 작업(context)별 유효기간 - None 은 만료 없음
+DEFAULT_TTLS = {
+    '번역': None,                     # 키워드 번역은 바뀌지 않음
+    '개별 카테고리 분석': 30 * _DAY,
+    '정보추출': 7 * _DAY,
+    '통합분석': 7 * _DAY,
+    '일괄분석': 7 * _DAY,
+}
+DEFAULT_TTL = 7 * _DAY
+
+
+def normalize_prompt(prompt):
+    """공백 차이만 있는 프롬프트는 같은 키가 되도록 정리"""
+    return " ".join(str(prompt).split())
+
+
+def cache_key(model, prompt):
+    return hashlib.sha256(f"{model}\n{normalize_prompt(prompt)}".encode('utf-8')).hexdigest()
+
+
+class AIResponseCache:
+    """
+    Gemini 응답 캐시 (키: 모델 + 정규화된 프롬프트의 해시)
+    - 메모리 LRU (즉시 응답) + SQLite 영구 저장 (실행 간 공유)
+    - 최대 개수를 넘으면 가장 오래 사용하지 않은 항목부터 삭제
+    - 적중/미적중 횟수를 작업(context)별로 집계
+    """
+    def __init__(self, db_path, max_entries=5000, memory_entries=1000, ttls=None):
+        self.max_entries = max(1, max_entries)
+        self.memory_entries = max(1, memory_entries)
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.hits = {}
+        self.misses = {}
+
+        self._memory = OrderedDict()  # key -> (response, expires_at)
+        self._touched = {}            # key -> 마지막 사용 시각 (DB 반영 대기, 조회 때마다 쓰지 않기 위함)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def _remember(self, key, response, expires_at):
+        self._memory[key] = (response, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, prompt, models, context=""):
+        """models 중 하나로 캐시된 응답이 있으면 반환 (없으면 None)"""
+        now = time.time()
+        with self._lock:
+            for model in models:
+                key = cache_key(model, prompt)
+                entry = self._memory.get(key)
+                if entry is None:
+                    row = self._conn.execute(
+                        "SELECT response, expires_at FROM responses WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row is None: continue
+                    entry = (row[0], row[1])
+                response, expires_at = entry
+                if expires_at is not None and expires_at < now:
+                    self._memory.pop(key, None)
+                    continue
+
+                self._remember(key, response, expires_at)
+                self._touched[key] = now
+                self.hits[context] = self.hits.get(context, 0) + 1
+                return response
+
+            self.misses[context] = self.misses.get(context, 0) + 1
+            return None
+
+    def put(self, model, prompt, context, response):
+        now = time.time()
+        ttl = self.ttls.get(context, DEFAULT_TTL)
+        expires_at = now + ttl if ttl is not None else None
+        key = cache_key(model, prompt)
+        with self._lock:
+            self._remember(key, response, expires_at)
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, model, context, response, created_at, expires_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, model, context, response, now, expires_at, now)
+                )
+                self._flush_touched()
+                self._evict()
+
+    def _flush_touched(self):
+        if not self._touched: return
+        self._conn.executemany(
+            "UPDATE responses SET last_access = ? WHERE key = ?", [(t, k) for k, t in self._touched.items()]
+        )
+        self._touched = {}
+
+    def _evict(self):
+        """최대 개수 초과 시 오래 사용하지 않은 항목을 10% 여유분까지 삭제"""
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        if count <= self.max_entries: return
+        remove = count - int(self.max_entries * 0.9)
+        self._conn.execute(
+            "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_access LIMIT ?)", (remove,)
+        )
+
+    def discard(self, prompt, models):
+        """잘못된 응답(파싱 실패 등)이 재사용되지 않도록 삭제"""
+        keys = [cache_key(model, prompt) for model in models]
+        with self._lock:
+            for key in keys: self._memory.pop(key, None)
+            with self._conn:
+                self._conn.executemany("DELETE FROM responses WHERE key = ?", [(k,) for k in keys])
+
+    def summary(self):
+        """'번역 3/4, 정보추출 0/2' 형식 (적중/전체)"""
+        contexts = sorted(set(self.hits) | set(self.misses))
+        return ", ".join(
+            f"{ctx or '기타'} {self.hits.get(ctx, 0)}/{self.hits.get(ctx, 0) + self.misses.get(ctx, 0)}"
+            for ctx in contexts
+        )
+
+    def close(self):
+        with self._lock:
+            try:
+                with self._conn: self._flush_touched()
+            except Exception: pass
+            try: self._conn.close()
+            except Exception: pass
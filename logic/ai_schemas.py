@@ -0,0 +1,61 @@
+from typing import List
+
+from pydantic import BaseModel, ValidationError
+
+
+# Gemini 구조화 출력(response_schema) + 응답 검증에 함께 사용하는 결과 형식
+# (Gemini 스키마는 기본값을 지원하지 않으므로 기본값 없이 정의하고, 누락 항목은 to_typed 에서 채움)
+class ProductInfo(BaseModel):
+    """정보추출 결과"""
+    is_valid: bool
+    productTitle: str
+    manufacturer: str
+    brand: str
+    model: str
+    keywords: List[str]
+
+
+class ProductAnalysis(ProductInfo):
+    """통합분석 결과 (정보추출 + 카테고리 경로)"""
+    categoryPath: str
+
+
+class BatchProductAnalysis(ProductAnalysis):
+    """일괄분석 결과 (요청한 상품 id 포함)"""
+    id: int
+
+
+class CategoryResult(BaseModel):
+    """카테고리 분석 결과"""
+    categoryPath: str
+
+
+def _empty(annotation):
+    if annotation is bool: return True
+    if annotation == List[str]: return []
+    return ''
+
+
+def to_typed(data, model_cls):
+    """
+    JSON 객체 -> 형식 검증된 dict (누락 항목은 빈 값, 문자열 키워드는 목록으로 변환), 쓸 수 없으면 None
+    - 숫자 항목(id)이 없으면 어느 상품 결과인지 알 수 없으므로 None
+    """
+    if not isinstance(data, dict): return None
+    values = {}
+    for name, field in model_cls.model_fields.items():
+        annotation, value = field.annotation, data.get(name)
+        if value is None:
+            if annotation is int: return None
+            value = _empty(annotation)
+        elif annotation == List[str]:
+            if isinstance(value, str): value = [v.strip() for v in value.split(',') if v.strip()]
+            elif isinstance(value, list): value = [str(v) for v in value if v is not None]
+            else: value = []
+        elif annotation is str and not isinstance(value, str):
+            value = str(value)
+        values[name] = value
+    try:
+        return model_cls.model_validate(values).model_dump()
+    except ValidationError:
+        return None
@@ -3,6 +3,8 @@ import time
 import shutil
 import subprocess
 import random
+import threading
+from urllib.parse import urlsplit
 from tkinter import messagebox
 
 from selenium import webdriver
@@ -16,31 +18,166 @@ from selenium.common.exceptions import WebDriverException, StaleElementReference
 from selenium.webdriver.common.action_chains import ActionChains
 from webdriver_manager.chrome import ChromeDriverManager
 
+from config_manager import get_bool, get_int, get_float, get_list
+from logic.tab_pool import DetailTabPool
+from logic.wait_engine import WaitEngine
+from logic.resource_policy import ResourcePolicy, parse_site_entries
+from logic.site_profiles import SiteProfileRegistry
+from logic.http_fetcher import HttpFetcher, origin_of
+from logic.detail_extractor import DetailExtractor
+
+# 상품이 아닌 링크(고객센터/약관 등) 걸러내는 금지어
+BAD_WORDS = ['contact', 'policy', 'terms', 'privacy', 'guide', 'faq', 'customer', 'support', 'about us']
+
+# [일괄 수집] 모든 식별자를 브라우저 안에서 한 번에 평가 -> 필터/중복 제거 후 후보 목록 반환 (RPC 1회)
+# 기존 방식과 같은 조건: 보이는 텍스트 5자 이상, href 존재, 금지어 제외, 페이지 하단 400px 이내 제외
+_HARVEST_JS = """
+const selectors = arguments[0], badWords = arguments[1], skip = new Set(arguments[2]);
+const bottomLimit = document.body.scrollHeight - 400;
+const seen = new Set(), out = [];
+for (const sel of selectors) {
+    let nodes;
+    try { nodes = document.querySelectorAll(sel); } catch (e) { continue; }
+    for (const el of nodes) {
+        if (!el.getClientRects().length) continue;
+        const text = (el.innerText || '').trim();
+        if (text.length < 5) continue;
+        const href = el.href;
+        if (typeof href !== 'string' || !href || seen.has(href) || skip.has(href)) continue;
+        const lowText = text.toLowerCase(), lowHref = href.toLowerCase();
+        if (badWords.some(b => lowText.includes(b) || lowHref.includes(b))) continue;
+        const y = el.getBoundingClientRect().top + window.scrollY;
+        if (y > 0 && y > bottomLimit) continue;
+        seen.add(href);
+        // 결과 카드에 따로 표시된 브랜드 (있으면 목록 단계 사전 필터에 사용)
+        let brand = '';
+        const card = el.closest('li, article, [data-component-type="s-search-result"], [class*="item" i], [class*="card" i]');
+        const brandEl = card && card.querySelector('[itemprop="brand"], [class*="brand" i]');
+        if (brandEl && brandEl !== el) brand = (brandEl.innerText || '').trim().slice(0, 60);
+        out.push({el: el, text: text, href: href, y: y, sel: sel, brand: brand});
+    }
+}
+return out;
+"""
+
+# 여러 브라우저 작업자가 동시에 확인 창을 띄우지 않도록 한 번에 하나씩 표시
+_PROMPT_LOCK = threading.Lock()
+
+
 class BrowserManager:
-    def __init__(self, log_callback):
-        self.log_callback = log_callback
+    def __init__(self, log_callback, seen_urls=None, config=None, worker_id=0, label='', shared=None, prefilter=None):
+        # 작업자 구분 표시 (여러 브라우저 동시 실행 시 로그/확인 창 앞에 붙임)
+        self.label = label
+        self._base_log = log_callback
+        self.log_callback = self._log_with_label if label else log_callback
+        log_callback = self.log_callback
         self.driver = None
         self.proc = None 
         self.checked_sites = set() # [추가] 로그인 확인을 완료한 사이트 목록
-
-    def start_driver(self):
+        # 작업자 번호: 프로필 폴더/디버그 포트를 작업자마다 따로 사용
+        self.worker_id = worker_id
+        # 첫 번째 작업자(shared)의 식별자/로딩 시간 기록과 HTTP 세션을 함께 사용 (기록 저장은 첫 번째 작업자만)
+        self._owns_shared = shared is None
+        self.seen_urls = seen_urls # 이미 수집한 상품 URL 색인 (SeenUrlIndex, 없으면 확인 안 함)
+        self.prefilter = prefilter # 목록 단계 브랜드 사전 필터 (ListPrefilter, 없으면 확인 안 함)
+        self.config = config or {}
+        # 결과 페이지 상품 탐색: JS 1회로 일괄 수집 (실패 시 기존 요소별 탐색)
+        self.fast_harvest = get_bool(self.config, 'FAST_HARVEST', True)
+        # 상세 페이지 진입 방식: click(기존, 사람처럼 클릭) / direct(백그라운드 탭으로 바로 열고 다음 상품 미리 로딩)
+        self.detail_nav = str(self.config.get('DETAIL_NAV_MODE', 'click')).strip().lower()
+        self.prefetch_tabs = max(1, get_int(self.config, 'DETAIL_PREFETCH_TABS', 3))
+        self.waits = WaitEngine(
+            log_callback,
+            enabled=get_bool(self.config, 'ADAPTIVE_WAIT', True),
+            default_timeout=get_float(self.config, 'WAIT_TIMEOUT', 15.0),
+            site_timeouts=self._parse_site_timeouts(get_list(self.config, 'WAIT_SITE_TIMEOUTS')),
+            jitter=(get_float(self.config, 'POLITE_DELAY_MIN', 1.0), get_float(self.config, 'POLITE_DELAY_MAX', 3.0))
+        )
+        if shared is not None: self.waits.share_stats(shared.waits)
+        # 불필요한 리소스(이미지/영상/폰트/광고) 차단 정책
+        self.resources = ResourcePolicy(
+            log_callback,
+            enabled=get_bool(self.config, 'BLOCK_RESOURCES', True),
+            categories=get_list(self.config, 'BLOCK_CATEGORIES', ['images', 'media', 'fonts', 'trackers']),
+            site_allow=parse_site_entries(get_list(self.config, 'BLOCK_SITE_ALLOW')),
+            site_deny=parse_site_entries(get_list(self.config, 'BLOCK_SITE_DENY')),
+            disabled_sites=get_list(self.config, 'BLOCK_DISABLED_SITES')
+        )
+        # 사이트별 식별자(검색창/상품/다음 버튼/상세 항목) 프로필 + 식별자 성공 기록
+        self.profiles = shared.profiles if shared is not None else SiteProfileRegistry(log_callback)
+        # 상세 페이지에서 제목/브랜드/사양/설명만 골라 예산 안의 짧은 텍스트로 추출 (0 이면 기존 body 전체 텍스트)
+        self.detail_extractor = DetailExtractor(
+            self.profiles,
+            budget=get_int(self.config, 'DETAIL_TEXT_BUDGET', 2000),
+            enabled=get_bool(self.config, 'DETAIL_EXTRACT', True),
+            structured=get_bool(self.config, 'STRUCTURED_EXTRACT', True)
+        )
+        # 검색/페이지 이동을 주소 템플릿으로 바로 수행 (템플릿 없는 사이트는 기존 입력/클릭 방식)
+        self.url_templates = get_bool(self.config, 'URL_TEMPLATE_SEARCH', True)
+        # 서버에서 그려지는 사이트는 브라우저 없이 HTTP 로 먼저 수집 (차단/JS 전용 감지 시 브라우저로 대체)
+        self.http = shared.http if shared is not None else None
+        if shared is None and get_bool(self.config, 'HTTP_FETCH', True):
+            self.http = HttpFetcher(
+                log_callback,
+                sites=get_list(self.config, 'HTTP_FETCH_SITES', ['ebay', 'rakuten']),
+                pool_size=get_int(self.config, 'HTTP_FETCH_WORKERS', 6),
+                structured_data=get_bool(self.config, 'STRUCTURED_EXTRACT', True)
+            )
+
+    @staticmethod
+    def _parse_site_timeouts(entries):
+        """['taobao:25', '1688:25'] -> {'taobao': 25.0, '1688': 25.0} (형식이 잘못된 항목은 무시)"""
+        timeouts = {}
+        for entry in entries:
+            site, _, value = entry.partition(':')
+            try: timeouts[site.strip().lower()] = float(value)
+            except ValueError: continue
+        return timeouts
+
+    def _detect_site(self, url):
+        """URL -> 사이트 식별자 (ebay/rakuten/taobao/1688/amazon 등 등록된 프로필, 그 외 common)"""
+        return self.profiles.detect(url).key
+
+    def site_key(self, url):
+        """작업 분배용 사이트 구분: 등록된 프로필이면 프로필 이름, 그 외에는 도메인"""
+        key = self._detect_site(url)
+        return key if key != 'common' else urlsplit(origin_of(url)).netloc.lower()
+
+    def _log_with_label(self, msg):
+        # 앞쪽 줄바꿈은 그대로 두고 내용 앞에 작업자 표시
+        body = msg.lstrip('\n')
+        self._base_log(f"{msg[:len(msg) - len(body)]}{self.label} {body}")
+
+    def _ask(self, ask, title, message):
+        """확인 창 표시 (작업자 간 순서대로, 제목에 작업자 표시)"""
+        with _PROMPT_LOCK:
+            return ask(f"{self.label} {title}" if self.label else title, message)
+
+    def start_driver(self, kill_existing=True):
         """
         Selenium 실행 (기존 프로필/하드웨어 정보 유지 + 창 크기/리퍼러만 자연스럽게 변경)
+        - kill_existing: 실행 중인 크롬을 모두 종료 후 시작 (여러 작업자 동시 실행 시 첫 작업자만)
         """
-        try:
-            subprocess.run("taskkill /F /IM chrome.exe /T", shell=True, stderr=subprocess.DEVNULL)
-            time.sleep(1)
-        except: pass
+        if kill_existing:
+            try:
+                subprocess.run("taskkill /F /IM chrome.exe /T", shell=True, stderr=subprocess.DEVNULL)
+                time.sleep(1)
+            except: pass
 
         current_folder = os.getcwd()
         bot_profile_path = os.path.join(current_folder, "bot_profile")
         real_user_data = os.path.join(os.environ['LOCALAPPDATA'], 'Google', 'Chrome', 'User Data')
+        # 두 번째 작업자부터는 별도 프로필 폴더 (첫 작업자 프로필이 있으면 로그인 정보째 복제)
+        source_profile = real_user_data
+        if self.worker_id > 0:
+            if os.path.exists(bot_profile_path): source_profile = bot_profile_path
+            bot_profile_path = f"{bot_profile_path}_{self.worker_id + 1}"
 
         # 프로필이 없으면 복사 (최초 1회만)
         if not os.path.exists(bot_profile_path):
             self.log_callback("♻️ [Init] 프로필 복제 중... (최초 1회)")
             try:
-                shutil.copytree(real_user_data, bot_profile_path, 
+                shutil.copytree(source_profile, bot_profile_path, 
                                 ignore=shutil.ignore_patterns('*.lock', 'Singleton*', '*.tmp', 'Cache*', 'Code Cache*'))
             except: pass
 
@@ -48,7 +185,7 @@ class BrowserManager:
         if not os.path.exists(chrome_exe_path): 
             chrome_exe_path = r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe"
         
-        debug_port = 9222
+        debug_port = 9222 + self.worker_id # 작업자마다 다른 포트
         
         # [은신 1] 창 크기 랜덤화 (User-Agent나 하드웨어 정보는 건드리지 않음)
         # 매번 조금씩 다른 크기로 브라우저를 띄워 '기계적인 느낌'만 제거
@@ -71,7 +208,9 @@ class BrowserManager:
         
         self.log_callback(f"🚀 [Init] 크롬 프로세스 시작 (Stealth Mode)")
         self.proc = subprocess.Popen(cmd)
-        time.sleep(3)
+        # 디버그 포트가 열릴 때까지 대기 (고정 3초 대신)
+        if not self.waits.wait_port(debug_port):
+            self.log_callback("⚠️ [Init] 크롬 디버그 포트 응답 지연 (연결 계속 시도)")
 
         chrome_options = Options()
         chrome_options.add_experimental_option("debuggerAddress", f"127.0.0.1:{debug_port}")
@@ -88,12 +227,14 @@ class BrowserManager:
                     });
                 """
             })
+            self.waits.bind(self.driver)
+            self.resources.apply(self.driver, 'common')
 
             # [은신 2] 구글을 거쳐서 들어온 척하기 (Referer 조작 효과)
             # 타겟 사이트 접속 전에 구글을 한 번 띄워줌
             try:
                 self.driver.get("https://www.google.com")
-                time.sleep(1.5) # 구글이 로딩될 때까지 잠깐 대기
+                self.waits.wait_ready('google', fallback=1.5, record=False) # 구글이 로딩될 때까지 대기
             except: pass
             
             self.log_callback("✅ [Init] Selenium 연결 성공")
@@ -107,168 +248,149 @@ class BrowserManager:
         return ""
 
 
-    def search_and_collect(self, url, keyword, count, is_running_check, process_callback=None):
+    def search_and_collect(self, url, keyword, count, is_running_check, process_callback=None, done_check=None):
         """
         [순서 교정본] 
         1. 페이지 이동(driver.get)을 가장 먼저 수행
         2. 그 다음 사이트 타입(이베이/라쿠텐 등)을 감지
         3. 올바른 식별자를 장전하여 0개 발견 문제 해결
+
+        - process_callback(item): 상세 페이지에서 추출한 {'name', 'url', 'detail_text', 'structured'} 를 받아 처리, 성공 시 True
+        - done_check(): 목표 달성 여부 (파이프라인 모드에서 작업 스레드의 저장 결과로 판단)
+          없으면 process_callback 이 True 를 반환한 개수로 판단
         """
         driver = self.driver
         if not driver: return 0
 
         collected_count = 0
+        is_done = done_check or (lambda: collected_count >= count)
         page_num = 1
         is_first_load = True 
         processed_links = set()
-
-        # -------------------------------------------------------------
-        # 1. 사이트별 설정 정의
-        # -------------------------------------------------------------
-        next_btns_map = {
-            'ebay': ["//a[contains(@type, 'next')]", "//a[@aria-label='Next page']", "//a[contains(@class, 'pagination__next')]"],
-            'rakuten': ["//a[@class='nextPage']", "//div[@class='pagination']//a[contains(text(), '次の')]"],
-            'taobao': ["//button[contains(@class, 'next-next')]", "//span[contains(text(), '下一页')]"],
-            'amazon': ["//a[contains(@class, 's-pagination-next')]", "//a[contains(text(), 'Next')]"],
-            '1688': ["//a[contains(@class, 'next')]", "//a[contains(text(), '下一页')]"],
-            'common': [
-                "//a[contains(text(), 'Next')]", "//a[contains(text(), 'next')]", 
-                "//a[contains(text(), '다음')]", "//a[contains(@class, 'next')]",
-                "//li[contains(@class, 'next')]/a"
-            ]
-        }
-
-        product_selectors_map = {
-            'ebay': [
-                # 1. [표준] 가장 일반적인 상품 링크 클래스
-                "a.s-item__link",
-                
-                # 2. [제목 기반] 링크가 아니라 제목 텍스트(h3)를 직접 찾음
-                "h3.s-item__title",
-                
-                # 3. href 주소에 '/itm/'이 포함된 모든 링크 (가장 강력함)
-                # 이베이 상품 주소는 무조건 ebay.com/itm/1234... 형식을 따릅니다.
-                "a[href*='/itm/']",
-                
-                # 4. [구조 기반] 상품 정보 박스 안의 첫 번째 링크
-                "div.s-item__info a"
-            ],
-            'rakuten': [
-                "div.searchresultitem h2 a",   # [라쿠텐]
-                "div[data-shop-id] h2 a",      
-                "a[data-link='item']",         
-                "div[class*='title-link-wrapper'] a",
-                "div[class*='title--'] a"
-            ],
-            'taobao': [
-                "div[class*='title--']",       # [타오바오]
-                "a[class*='doubleCardWrapper']",
-                ".ctx-box .title a"
-            ],
-            '1688': [
-                "div.title a",
-                ".offer-title a"
-            ],
-            'amazon': [
-                "div[data-component-type='s-search-result'] h2 a", # 검색 결과 표준
-                "div.s-result-item h2 a",      # 백업
-                "h2.a-size-mini a",            # 모바일/컴팩트 뷰
-                "a.a-link-normal.s-underline-text" # 최신 텍스트 링크
-            ],           
-            'common': [ 
-                "[class*='title--']", "[class*='Title--']", 
-                "span.a-text-normal", "div.item-name", "a[id*='item-title']", 
-                "h1", "h2", "h3"
-            ]
-        }
-
-        search_selectors = [
-            "input#q", "input[name='q']", "input#mq",               # 타오바오
-            "input#commonSearchInput", "input[name='k']",           # 라쿠텐
-            "input#gh-ac",                                          # 이베이
-            "input.alisearch-input", "input#alisearch-input",       # 1688
-            "input#twotabsearchtextbox", "input[name='field-keywords']", # 아마존
-            "input#headerSearchKeyword",                            # 쿠팡
-            "input[name='keyword']", "input[type='search']", "input[id*='search']"
-        ]
+        tab_pool = None
+
+        def record_success(link):
+            nonlocal collected_count
+            # 파이프라인 모드는 실제 저장 시점에 기록 (분석에서 걸러진 상품은 다음 실행 때 재확인)
+            if self.seen_urls is not None and done_check is None: self.seen_urls.add(link)
+            collected_count += 1
+            if done_check is None:
+                self.log_callback(f"   ✅ 수집 완료 ({collected_count}/{count})")
+            else:
+                self.log_callback(f"   📥 분석 대기열 전달 ({collected_count}번째)")
 
         # --- [A] 페이지 진입 (최초 1회) - 순서 변경됨 ---
+        # 검색 주소 템플릿이 있는 사이트는 홈 화면 대신 검색 결과로 바로 이동
+        search_profile = self.profiles.detect(url)
+        search_url = search_profile.build_search_url(url, keyword, 1) if self.url_templates else None
+        empty_template_pages = 0
+
+        # --- [HTTP] 브라우저 없이 먼저 수집 -> 차단/JS 전용 페이지를 만나면 그 페이지부터 브라우저로 이어서 수집
+        if search_url and self.http is not None and search_profile.http_links and self.http.supports(search_profile.key):
+            fallback_page = self._http_collect(search_profile, url, keyword, is_running_check, is_done,
+                                               process_callback, processed_links, record_success)
+            if fallback_page is None: return collected_count
+            page_num = fallback_page
+            search_url = search_profile.build_search_url(url, keyword, page_num)
+
         if is_first_load:
-            self.log_callback(f"🚀 [Access] 사이트 접속 중: {url}")
+            self.log_callback(f"🚀 [Access] 사이트 접속 중: {search_url or url}")
             try:
-                driver.get(url)
-                time.sleep(3) # 페이지 로딩 대기
+                self.resources.apply(driver, search_profile.key) # 접속 전에 사이트별 차단 정책 적용
+                driver.get(search_url or url)
+                # 페이지 로딩 대기
+                self.waits.wait_ready(search_profile.key, selectors=self.profiles.ordered(search_profile, 'products') if search_url else None, fallback=3)
             except Exception as e:
                 self.log_callback(f"❌ 접속 실패: {e}")
                 return 0
 
+        if self.detail_nav == 'direct':
+            pool_site = self._detect_site(driver.current_url)
+            tab_pool = DetailTabPool(driver, self.log_callback, size=self.prefetch_tabs,
+                                     waits=self.waits, site=pool_site,
+                                     prepare_tab=lambda: self.resources.apply(driver, pool_site))
+
         while is_running_check():
             try:
                 found_on_page = 0 
                 
                 # --- [B] 현재 사이트 감지 (페이지 접속 후에 해야 정확함) ---
-                current_url_lower = driver.current_url.lower()
-                
-                current_site_key = 'common'
-                if 'ebay' in current_url_lower: current_site_key = 'ebay'
-                elif 'rakuten' in current_url_lower: current_site_key = 'rakuten'
-                elif 'taobao' in current_url_lower or 'tmall' in current_url_lower: current_site_key = 'taobao'
-                elif '1688' in current_url_lower: current_site_key = '1688'
-                elif 'amazon' in current_url_lower: current_site_key = 'amazon'
+                profile = self.profiles.detect(driver.current_url)
+                current_site_key = profile.key
 
-                target_selectors = product_selectors_map[current_site_key]
-                target_next_btns = next_btns_map.get(current_site_key, []) + next_btns_map['common']
+                # 마지막으로 성공한 식별자부터 시도
+                target_selectors = self.profiles.ordered(profile, 'products')
 
                 # 첫 로드 시에만 로그 출력
                 if is_first_load:
                     self.log_callback(f"🌍 사이트 식별: {current_site_key.upper()} 모드")
 
                 # --- [C] 검색 수행 (최초 1회) ---
+                if is_first_load and search_url:
+                    self.log_callback(f"🔗 [Search] '{keyword}' 검색 결과 주소로 바로 이동")
+                    if profile.login_required and (url not in self.checked_sites):
+                        self.log_callback("👮 [Login Check] 로그인 확인 요청...")
+                        self.resources.suspend(driver) # 로그인 화면이 제대로 보이도록 차단 해제
+                        is_ok = self._ask(messagebox.askokcancel, "로그인 확인", "로그인이 완료되었다면 [확인]을 눌러주세요.")
+                        self.resources.resume(driver, current_site_key)
+                        if not is_ok: return collected_count
+                        self.checked_sites.add(url)
+                        # 로그인 과정에서 다른 페이지로 이동했을 수 있으므로 검색 결과를 다시 엶
+                        driver.get(search_url)
+                        self.waits.wait_ready(current_site_key, selectors=target_selectors, fallback=3)
+                    is_first_load = False
+
                 if page_num == 1 and is_first_load:
                     self.log_callback(f"🔍 [Search] '{keyword}' 검색어 입력...")
                     
                     # 로그인 체크
-                    if current_site_key in ['taobao', '1688'] and (url not in self.checked_sites):
+                    if profile.login_required and (url not in self.checked_sites):
                         self.log_callback("👮 [Login Check] 로그인 확인 요청...")
-                        is_ok = messagebox.askokcancel("로그인 확인", "로그인이 완료되었다면 [확인]을 눌러주세요.")
+                        self.resources.suspend(driver) # 로그인 화면이 제대로 보이도록 차단 해제
+                        is_ok = self._ask(messagebox.askokcancel, "로그인 확인", "로그인이 완료되었다면 [확인]을 눌러주세요.")
+                        self.resources.resume(driver, current_site_key)
                         if is_ok:
                             self.checked_sites.add(url)
                         else:
                             return collected_count 
                     
-                    # 검색어 입력
-                    search_input = None
-                    for sel in search_selectors:
-                        try:
-                            search_input = WebDriverWait(driver, 1).until(EC.element_to_be_clickable((By.CSS_SELECTOR, sel)))
-                            if search_input: break
-                        except: continue
+                    # 검색어 입력 (검색창 후보를 한꺼번에 확인, 최대 5초)
+                    search_input = self.profiles.find(driver, profile, 'search', timeout=5, need_enabled=True)
 
                     if search_input:
                         try:
                             # 기존 검색어 있으면 지우기
                             search_input.click()
-                            time.sleep(0.5)
+                            self.waits.pause(0.25)
                             search_input.clear()
                             search_input.send_keys(Keys.CONTROL + "a")
                             search_input.send_keys(Keys.DELETE)
                             # 새 검색어 입력
                             search_input.send_keys(keyword)
-                            time.sleep(1)
+                            self.waits.pause(0.4)
+                            before_search_url = driver.current_url
                             search_input.send_keys(Keys.ENTER)
                             
                             # 검색 결과 대기
                             self.log_callback("   ⏳ 검색 결과 로딩 대기...")
-                            time.sleep(3)
-                            
-                            # (중요) 사이트별 상품 컨테이너가 뜰 때까지 대기
-                            try:
-                                WebDriverWait(driver, 8).until(
-                                    lambda d: any(d.find_elements(By.CSS_SELECTOR, s) for s in target_selectors)
-                                )
-                                self.log_callback("   ✅ 리스트 로딩 완료.")
-                            except TimeoutException:
-                                self.log_callback("   ⚠️ 로딩 지연 (상품 탐색 계속 시도)")
+                            if self.waits.enabled:
+                                # URL 변경 + 사이트별 상품 컨테이너 등장 + 네트워크 유휴까지 대기
+                                if self.waits.wait_ready(current_site_key, selectors=target_selectors,
+                                                         old_url=before_search_url, url_grace=2.0):
+                                    self.log_callback("   ✅ 리스트 로딩 완료.")
+                                else:
+                                    self.log_callback("   ⚠️ 로딩 지연 (상품 탐색 계속 시도)")
+                            else:
+                                time.sleep(3)
+                                
+                                # (중요) 사이트별 상품 컨테이너가 뜰 때까지 대기
+                                try:
+                                    WebDriverWait(driver, 8).until(
+                                        lambda d: any(d.find_elements(By.CSS_SELECTOR, s) for s in target_selectors)
+                                    )
+                                    self.log_callback("   ✅ 리스트 로딩 완료.")
+                                except TimeoutException:
+                                    self.log_callback("   ⚠️ 로딩 지연 (상품 탐색 계속 시도)")
 
                         except Exception as e:
                             self.log_callback(f"⚠️ 검색어 입력 중 오류: {e}")
@@ -283,42 +405,55 @@ class BrowserManager:
                 next_page_clicked = False 
 
                 while True:
-                    if not is_running_check() or collected_count >= count: break
+                    if not is_running_check() or is_done(): break
                     
                     found_target = None
                     
                     # 식별자로 상품 탐색
-                    for selector in target_selectors:
-                        elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                        for el in elements:
+                    candidates = self._harvest_candidates(target_selectors, processed_links) if self.fast_harvest else None
+                    if candidates is None:
+                        candidates = self._scan_candidates(target_selectors, processed_links)
+                    wanted = tab_pool.free_slots() if tab_pool is not None else 1
+                    targets = []
+                    for el, link, text, selector, brand in (candidates if wanted > 0 else []):
+                        # 이미 수집한 상품 / 금지·상표권 브랜드 상품은 클릭하지 않음
+                        skip_reason = self._prefilter(link, text, brand)
+                        if skip_reason:
+                            processed_links.add(link)
+                            self.log_callback(f"   ⏭️ {skip_reason} 건너뜀: '{text[:15]}...'")
+                            continue
+                        targets.append((el, link, text, selector))
+                        if len(targets) >= wanted: break
+
+                    if tab_pool is not None:
+                        # [직접 이동] 빈 탭 수만큼 다음 상품을 미리 열어두고, 가장 먼저 연 탭부터 처리
+                        for _, link, text, selector in targets:
+                            self.profiles.record_hit(current_site_key, 'products', selector)
+                            processed_links.add(link)
+                            found_on_page += 1
+                            if tab_pool.open(link, text):
+                                self.log_callback(f"   🔎 발견! '{text[:15]}...' (미리 열기)")
+                        opened = tab_pool.take()
+                        if opened:
+                            target_link, product_name = opened
+                            success = False
                             try:
-                                if len(el.text.strip()) < 5: continue
-
-                                txt = el.text.lower()
-                                link = el.get_attribute('href')
-                                if not link or link in processed_links: continue
-                                
-                                # 금지어 필터
-                                bad_words = ['contact', 'policy', 'terms', 'privacy', 'guide', 'faq', 'customer', 'support', 'about us']
-                                if any(b in txt for b in bad_words) or (link and any(b in link.lower() for b in bad_words)): 
-                                    continue
-                                
-                                # Y좌표 필터
-                                try:
-                                    if el.location['y'] > 0 and el.location['y'] > driver.execute_script("return document.body.scrollHeight") - 400:
-                                        continue
-                                except: pass
-
-                                found_target = (el, link)
-                                break
-                            except: continue
-                        if found_target: break
+                                if process_callback:
+                                    success = process_callback(self._capture_detail(product_name))
+                            except Exception as e:
+                                self.log_callback(f"   ⚠️ 에러: {e}")
+                            finally:
+                                tab_pool.release()
+                            if success: record_success(target_link)
+                            continue
+                    elif targets:
+                        found_target = targets[0]
                     
                     if found_target:
-                        target_el, target_link = found_target
+                        target_el, target_link, product_name, selector = found_target
+                        self.profiles.record_hit(current_site_key, 'products', selector)
                         processed_links.add(target_link)
                         found_on_page += 1 
-                        product_name = target_el.text.strip()
                         self.log_callback(f"   🔎 발견! '{product_name[:15]}...'")
 
                         try:
@@ -327,7 +462,8 @@ class BrowserManager:
                             current_list_url = driver.current_url 
                             
                             self._click_like_human(target_el)
-                            time.sleep(3)
+                            # 새 탭이 열리거나 URL 이 바뀔 때까지 대기
+                            self.waits.wait_for_navigation(current_site_key, old_windows, current_list_url)
                             
                             new_windows = driver.window_handles
                             success = False
@@ -335,28 +471,32 @@ class BrowserManager:
                             if len(new_windows) > len(old_windows):
                                 new_tab = [w for w in new_windows if w not in old_windows][-1]
                                 driver.switch_to.window(new_tab)
+                                self.resources.apply(driver, current_site_key) # 새 탭에도 차단 정책 적용 (이후 요청부터)
+                                self.waits.wait_ready(current_site_key, fallback=0)
                                 if process_callback:
                                     self._scroll_a_bit_in_detail()
-                                    success = process_callback(driver, product_name)
+                                    success = process_callback(self._capture_detail(product_name))
                                 try:
                                     if len(driver.window_handles) > 1: driver.close()
                                 except: pass
                                 driver.switch_to.window(main_window)
                             else:
                                 if driver.current_url != current_list_url:
+                                    self.waits.wait_ready(current_site_key, fallback=0)
                                     if process_callback:
                                         self._scroll_a_bit_in_detail()
-                                        success = process_callback(driver, product_name)
+                                        success = process_callback(self._capture_detail(product_name))
+                                    detail_url = driver.current_url
                                     driver.back()
-                                    time.sleep(2)
+                                    self.waits.wait_ready(current_site_key, selectors=target_selectors,
+                                                          old_url=detail_url, fallback=2)
                                     if driver.current_url != current_list_url:
                                         driver.get(current_list_url)
-                                        time.sleep(3)
+                                        self.waits.wait_ready(current_site_key, selectors=target_selectors, fallback=3)
                             
                             if success:
-                                collected_count += 1
-                                self.log_callback(f"   ✅ 수집 완료 ({collected_count}/{count})")
-                                time.sleep(random.uniform(1.0, 3.0))
+                                record_success(target_link)
+                                self.waits.pause() # 사람처럼 보이기 위한 지연 (POLITE_DELAY_MIN~MAX)
                             
                         except Exception as e:
                             self.log_callback(f"   ⚠️ 에러: {e}")
@@ -364,21 +504,35 @@ class BrowserManager:
                             except: pass
                         continue 
 
+                    # 주소 이동 모드: 상품은 있는데 새 상품이 없으면 (모두 수집/확인됨) 다음 페이지로
+                    if found_on_page == 0 and search_url and self._has_products(target_selectors):
+                        empty_template_pages += 1
+                        if empty_template_pages >= 2: # 마지막 페이지 이후 같은 결과가 반복되는 경우
+                            self.log_callback("   🛑 새 상품 없음 (마지막 페이지)")
+                            break
+                        page_num += 1
+                        self._goto_search_page(search_profile, url, keyword, page_num, target_selectors)
+                        next_page_clicked = True
+                        break
+
                     # 상품 못 찾음 (0개) -> 캡차 수동 개입
                     if found_on_page == 0:
                         self.log_callback("🚫 화면 내 상품 0개. (스크롤 시도)")
-                        time.sleep(2)
+                        self.waits.wait_idle(max_wait=2, fallback=2)
                         driver.execute_script("window.scrollBy(0, 350);") 
                         
                         same_scroll_count += 1
                         if same_scroll_count > 3: # 3번 정도 못 찾으면 사용자에게 물어봄
-                            is_retry = messagebox.askretrycancel(
+                            self.resources.suspend(driver) # 캡차 이미지가 보이도록 차단 해제
+                            is_retry = self._ask(messagebox.askretrycancel,
                                 "상품 탐색 실패", 
                                 "상품을 찾을 수 없습니다 (캡차 의심).\n\n"
                                 "1. 브라우저에서 캡차를 확인하고 직접 풀어주세요.\n"
+                                "   (캡차 이미지가 보이지 않으면 새로고침(F5) 해주세요)\n"
                                 "2. 풀었다면 [재시도]를 눌러주세요.\n"
                                 "3. [취소]를 누르면 다음 페이지로 넘어갑니다."
                             )
+                            self.resources.resume(driver, current_site_key)
                             if is_retry:
                                 same_scroll_count = 0
                                 continue
@@ -387,27 +541,20 @@ class BrowserManager:
                                 break
                         continue
 
-                    # 다음 페이지 이동
-                    found_next_btn = None
-                    for xpath in target_next_btns:
-                        try:
-                            btns = driver.find_elements(By.XPATH, xpath)
-                            for btn in btns:
-                                if btn.is_displayed():
-                                    try:
-                                        if btn.location['y'] < 2000: continue
-                                    except: pass
-                                    found_next_btn = btn
-                                    break
-                            if found_next_btn: break
-                        except: continue
+                    # 다음 페이지 이동 (페이지 하단(y >= 2000)에 보이는 버튼만, 후보를 한꺼번에 확인)
+                    # 주소 이동 모드는 버튼 대신 페이지 끝까지 스크롤한 뒤 다음 페이지 주소로 이동
+                    found_next_btn = None if search_url else self.profiles.find(driver, profile, 'next', min_y=2000)
                     
                     if found_next_btn:
                         self.log_callback("   🚀 다음 페이지 이동")
                         try:
                             driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", found_next_btn)
+                            before_page_url = driver.current_url
                             self._click_like_human(found_next_btn)
-                            time.sleep(random.uniform(4.0, 6.0))
+                            # URL 이 바뀌지 않는(AJAX) 페이지 이동도 있으므로 2초 후에는 같은 URL 로딩으로 간주
+                            self.waits.wait_ready(current_site_key, selectors=target_selectors, old_url=before_page_url,
+                                                  url_grace=2.0, fallback=random.uniform(4.0, 6.0))
+                            if self.waits.enabled: self.waits.pause()
                             page_num += 1
                             next_page_clicked = True
                             break 
@@ -415,16 +562,21 @@ class BrowserManager:
 
                     # 일반 스크롤
                     driver.execute_script(f"window.scrollBy({{top: {random.randint(300, 600)}, behavior: 'smooth'}});")
-                    time.sleep(1.5)
+                    self.waits.wait_idle(max_wait=1.5, fallback=1.5)
                     
                     current_scroll_y = driver.execute_script("return window.scrollY")
                     if current_scroll_y == last_scroll_y:
                         self.log_callback("   🛑 페이지 끝")
+                        if search_url:
+                            empty_template_pages = 0
+                            page_num += 1
+                            self._goto_search_page(search_profile, url, keyword, page_num, target_selectors)
+                            next_page_clicked = True
                         break
                     else:
                         last_scroll_y = current_scroll_y
                 
-                if collected_count >= count:
+                if is_done():
                     self.log_callback("🎉 목표 달성")
                     break
                 if next_page_clicked: continue 
@@ -432,10 +584,143 @@ class BrowserManager:
 
             except Exception as e:
                 self.log_callback(f"⚠️ 에러: {e}")
-                if not messagebox.askretrycancel("오류", f"오류 발생: {e}\n재시도 하시겠습니까?"): break
+                if not self._ask(messagebox.askretrycancel, "오류", f"오류 발생: {e}\n재시도 하시겠습니까?"): break
 
+        if tab_pool is not None: tab_pool.close_all()
         return collected_count
 
+    def _http_collect(self, profile, shop_url, keyword, is_running_check, is_done, process_callback,
+                      processed_links, record_success):
+        """
+        [HTTP 수집] 결과 페이지를 HTTP 로 읽고 상세 페이지는 여러 개를 동시에 요청
+        - 상세 페이지가 차단/JS 전용이면 그 상품만 브라우저로 읽음
+        - 반환: 완료(목표 달성/중지/마지막 페이지)면 None,
+          결과 페이지가 차단되거나 상세 페이지 차단이 쌓이면 브라우저로 이어갈 페이지 번호
+        """
+        site = profile.key
+        if site not in self.http.session_sites:
+            # 브라우저 쿠키는 해당 사이트를 열어야 읽을 수 있으므로 최초 1회 접속
+            try:
+                self.resources.apply(self.driver, site)
+                self.driver.get(origin_of(profile.build_search_url(shop_url, keyword, 1)))
+                self.waits.wait_ready(site, fallback=3)
+            except Exception: pass
+            self.http.import_browser_session(self.driver, site)
+
+        self.log_callback(f"⚡ [HTTP] 브라우저 없이 수집 시작 ({site.upper()})")
+        page, empty_pages = 1, 0
+        while is_running_check() and not is_done():
+            fetched = self.http.fetch_page(profile.build_search_url(shop_url, keyword, page))
+            if fetched is None:
+                self.http.mark_failure(site, f"{page}페이지 차단/오류")
+                return page
+            links, _, page_url = fetched
+            products = self.http.harvest_links(links, profile.http_links, BAD_WORDS)
+            if not products:
+                self.http.mark_failure(site, f"{page}페이지 상품 링크 없음 (JS 전용 페이지 의심)")
+                return page
+            self.http.mark_success(site)
+
+            new_products = []
+            for href, name in products:
+                if href in processed_links: continue
+                skip_reason = self._prefilter(href, name)
+                if skip_reason:
+                    processed_links.add(href)
+                    self.log_callback(f"   ⏭️ {skip_reason} 건너뜀: '{name[:15]}...'")
+                    continue
+                new_products.append((href, name))
+            self.log_callback(f"📄 [HTTP Page {page}] 상품 {len(products)}개 (새 상품 {len(new_products)}개)")
+
+            if not new_products:
+                empty_pages += 1
+                if empty_pages >= 2:
+                    self.log_callback("   🛑 새 상품 없음 (마지막 페이지)")
+                    return None
+            else:
+                empty_pages = 0
+
+            # 상세 페이지는 pool_size 개씩 동시에 요청, 앞의 것부터 도착하는 대로 처리
+            for start in range(0, len(new_products), self.http.pool_size):
+                if not is_running_check() or is_done(): break
+                chunk = new_products[start:start + self.http.pool_size]
+                details = self.http.fetch_details([href for href, _ in chunk], referer=page_url, site=site)
+                for (href, name), detail in zip(chunk, details):
+                    if not is_running_check() or is_done(): break
+                    processed_links.add(href)
+                    self.log_callback(f"   🔎 발견! '{name[:15]}...' (HTTP)")
+                    if detail is None:
+                        self.log_callback("   ↩️ [HTTP] 상세 페이지 읽기 실패 -> 브라우저로 대체")
+                        detail = self._visit_and_capture(href, name)
+                    success = process_callback(dict(detail, name=name)) if process_callback else False
+                    if success: record_success(href)
+                if not self.http.supports(site):
+                    # 상세 페이지 차단이 쌓여 HTTP 수집 중단 -> 이 페이지부터 브라우저로 이어서 수집 (처리한 상품은 건너뜀)
+                    return page
+
+            page += 1
+            if is_running_check() and not is_done(): self.waits.pause()
+        return None
+
+    def _goto_search_page(self, profile, shop_url, keyword, page, selectors):
+        """검색 결과 page 페이지로 주소 이동 (다음 버튼 탐색/클릭 없음)"""
+        self.log_callback(f"   🚀 다음 페이지 이동 ({page}페이지, 주소 이동)")
+        self.driver.get(profile.build_search_url(shop_url, keyword, page))
+        self.waits.wait_ready(profile.key, selectors=selectors, fallback=random.uniform(4.0, 6.0))
+        if self.waits.enabled: self.waits.pause()
+
+    def _has_products(self, selectors):
+        """현재 페이지에 상품 식별자에 해당하는 요소가 보이는지"""
+        try:
+            return self.profiles.probe(self.driver, selectors)[1] is not None
+        except Exception:
+            return False
+
+    def _prefilter(self, link, text, brand=''):
+        """목록 단계 사전 필터: 상세 페이지를 열기 전에 건너뛸 이유 (이미 수집 / 금지·상표권 브랜드), 통과면 None"""
+        if self.seen_urls is not None and link in self.seen_urls: return "이미 수집한 상품"
+        if self.prefilter is not None: return self.prefilter.check(text, brand)
+        return None
+
+    def _harvest_candidates(self, selectors, processed_links):
+        """
+        [일괄 수집] 결과 페이지의 상품 후보를 JS 1회로 수집 -> [(요소, 링크, 상품명, 식별자, 카드 브랜드), ...]
+        - 실패하면 None (호출 측에서 기존 요소별 탐색으로 대체)
+        """
+        try:
+            records = self.driver.execute_script(_HARVEST_JS, selectors, BAD_WORDS, list(processed_links))
+            return [(r['el'], r['href'], r['text'], r['sel'], r.get('brand') or '') for r in records or []]
+        except Exception as e:
+            self.log_callback(f"   ⚠️ 일괄 탐색 실패 -> 기존 방식으로 탐색: {e}")
+            return None
+
+    def _scan_candidates(self, selectors, processed_links):
+        """[기존 방식] 요소마다 텍스트/링크/좌표를 따로 조회하며 상품 후보를 하나씩 반환 (카드 브랜드는 확인 안 함)"""
+        driver = self.driver
+        for selector in selectors:
+            elements = driver.find_elements(By.CSS_SELECTOR, selector)
+            for el in elements:
+                try:
+                    text = el.text.strip()
+                    if len(text) < 5: continue
+
+                    txt = text.lower()
+                    link = el.get_attribute('href')
+                    if not link or link in processed_links: continue
+                    
+                    # 금지어 필터
+                    if any(b in txt for b in BAD_WORDS) or any(b in link.lower() for b in BAD_WORDS): 
+                        continue
+                    
+                    # Y좌표 필터
+                    try:
+                        if el.location['y'] > 0 and el.location['y'] > driver.execute_script("return document.body.scrollHeight") - 400:
+                            continue
+                    except: pass
+
+                    yield el, link, text, selector, ''
+                except: continue
+
     def _scroll_a_bit_in_detail(self):
         """상세 페이지에서 사람처럼 불규칙하게 스크롤 (속도/깊이 랜덤 변형)"""
         try:
@@ -487,18 +772,42 @@ class BrowserManager:
             # 실패 시 안전하게 일반 클릭
             self.driver.execute_script("arguments[0].click();", element)
 
+    def _capture_detail(self, product_name):
+        """현재 상세 페이지에서 분석에 필요한 정보만 추출 (이후 처리는 브라우저 없이 가능)"""
+        detail = self.detail_extractor.extract(self.driver)
+        return {'name': product_name, 'url': self.driver.current_url, 'detail_text': detail['text'],
+                'structured': detail.get('structured') or {}}
+
+    def _visit_and_capture(self, url, product_name):
+        """상세 페이지로 직접 이동해 추출 (HTTP 실패 시 대체용, 실패하면 본문 없이 주소만)"""
+        try:
+            self.driver.get(url)
+            self.waits.wait_ready(self._detect_site(url), fallback=3)
+            return self._capture_detail(product_name)
+        except Exception:
+            return {'name': product_name, 'url': url, 'detail_text': ''}
+
     def visit_and_get_text(self, url):
         if not self.driver: return ""
         try:
             self.driver.get(url)
-            time.sleep(3)
-            return self.driver.find_element(By.TAG_NAME, "body").text[:3000]
+            self.waits.wait_ready(self._detect_site(url), fallback=3)
+            return self.detail_extractor.extract(self.driver)['text']
         except: return ""
 
     def close(self):
+        """브라우저 종료 (오류 후 재시작할 때도 사용, HTTP 세션은 유지)"""
+        if self._owns_shared:
+            self.waits.save() # 사이트별 로딩 시간 기록 (다음 실행의 대기 상한에 반영)
+            self.profiles.save() # 식별자 성공 기록 (다음 실행에서 성공한 식별자부터 시도)
         try: 
             if self.driver: self.driver.quit()
         except: pass
         try: 
             if self.proc: self.proc.kill()
-        except: pass
\ No newline at end of file
+        except: pass
+
+    def shutdown(self):
+        """작업 종료: 브라우저 + (첫 번째 작업자면) 공유 HTTP 세션 정리"""
+        self.close()
+        if self._owns_shared and self.http is not None: self.http.close()
\ No newline at end of file
@@ -0,0 +1,366 @@
+import os
+import re
+import mmap
+import struct
+import hashlib
+from array import array
+
+# 카테고리 경로 토큰 구분자: '>', '/', 공백류 (기존 find_best_category 토큰화 규칙과 동일)
+_SPLIT_RE = re.compile(r"[>/\s]+")
+_SEPARATOR_RE = re.compile(r"[>/\s]")
+
+_NO_TOKEN = 0xFFFFFFFF
+
+
+def tokenize_path(cat_path):
+    """카테고리 경로를 단어 단위로 분리 (예: "문구/사무용품>연필꽂이" -> ['문구', '사무용품', '연필꽂이'])"""
+    return [t for t in _SPLIT_RE.split(cat_path) if t]
+
+
+def tokenize_hint(ai_path_hint):
+    """AI 힌트 전처리 (예: "문구 > 필기구 > 연필" -> ['문구', '필기구', '연필'])"""
+    return [k.strip() for k in ai_path_hint.replace('>', ' ').split() if len(k.strip()) > 0]
+
+
+class _StringTable:
+    """offsets(uint32) + utf-8 blob 으로 저장된 문자열 목록 (접근 시에만 디코딩)"""
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return bytes(self.blob[self.offsets[i]:self.offsets[i + 1]]).decode('utf-8')
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+class CategoryIndex:
+    """
+    카테고리 경로 역색인 (token -> row id)
+    - 로드 시 1회만 토큰화하고, 검색 시에는 힌트와 토큰을 공유하는 행만 채점
+    - 채점 규칙/동점 처리는 기존 find_best_category 와 완전히 동일
+    - 모든 데이터는 uint32 배열 + utf-8 blob 이라 그대로 디스크에 쓰고 mmap 으로 읽을 수 있음
+    """
+    # 직렬화 순서 (배열 이름, 타입) - 'B' 는 utf-8 blob
+    _FIELDS = [
+        ('path_offsets', 'I'), ('path_blob', 'B'),        # row id -> 경로 문자열
+        ('tok_offsets', 'I'), ('tok_blob', 'B'),          # token id -> 토큰 문자열
+        ('row_tok_offsets', 'I'), ('row_tok_ids', 'I'),   # row id -> 토큰 id 목록 (경로 순서)
+        ('leaf_ids', 'I'),                                # row id -> 마지막 토큰 id
+        ('post_offsets', 'I'), ('post_ids', 'I'),         # token id -> row id 목록 (오름차순)
+    ]
+
+    def __init__(self, arrays, shortest_row):
+        for name, _ in self._FIELDS:
+            setattr(self, name, arrays[name])
+        self.shortest_row = shortest_row  # 전체 중 가장 짧은 경로 (동점이면 먼저 나온 행)
+
+        self.paths = _StringTable(self.path_offsets, self.path_blob)
+        tokens = _StringTable(self.tok_offsets, self.tok_blob)
+        self.token_ids = {tok: tid for tid, tok in enumerate(tokens)}
+
+        # 소문자 토큰 -> 토큰 id 목록 (대소문자 무시 부분일치 후보 탐색용)
+        self.lower_vocab = {}
+        for tok, tid in self.token_ids.items():
+            self.lower_vocab.setdefault(tok.lower(), []).append(tid)
+
+        self._substr_cache = {}  # (검색어, 대소문자 무시 여부) -> 후보 row id 목록
+
+    @classmethod
+    def from_paths(cls, paths):
+        """카테고리 경로 목록(문자열이 아닌 값은 무시)으로 색인 생성"""
+        path_offsets, path_blob = array('I', [0]), bytearray()
+        row_tok_offsets, row_tok_ids, leaf_ids = array('I', [0]), array('I'), array('I')
+        token_ids, postings = {}, []
+        shortest_row, shortest_len = -1, 0
+
+        for cat_path in paths:
+            if not isinstance(cat_path, str): continue
+            row_id = len(leaf_ids)
+            path_blob += cat_path.encode('utf-8')
+            path_offsets.append(len(path_blob))
+
+            tids = []
+            for tok in tokenize_path(cat_path):
+                tid = token_ids.get(tok)
+                if tid is None:
+                    tid = token_ids[tok] = len(postings)
+                    postings.append([])
+                if not postings[tid] or postings[tid][-1] != row_id:
+                    postings[tid].append(row_id)
+                tids.append(tid)
+            row_tok_ids.extend(tids)
+            row_tok_offsets.append(len(row_tok_ids))
+            leaf_ids.append(tids[-1] if tids else _NO_TOKEN)
+
+            if shortest_row == -1 or len(cat_path) < shortest_len:
+                shortest_row, shortest_len = row_id, len(cat_path)
+
+        tok_offsets, tok_blob = array('I', [0]), bytearray()
+        for tok in token_ids:  # dict 는 삽입 순서 = token id 순서
+            tok_blob += tok.encode('utf-8')
+            tok_offsets.append(len(tok_blob))
+
+        post_offsets, post_ids = array('I', [0]), array('I')
+        for rows in postings:
+            post_ids.extend(rows)
+            post_offsets.append(len(post_ids))
+
+        arrays = {
+            'path_offsets': path_offsets, 'path_blob': bytes(path_blob),
+            'tok_offsets': tok_offsets, 'tok_blob': bytes(tok_blob),
+            'row_tok_offsets': row_tok_offsets, 'row_tok_ids': row_tok_ids,
+            'leaf_ids': leaf_ids,
+            'post_offsets': post_offsets, 'post_ids': post_ids,
+        }
+        return cls(arrays, shortest_row)
+
+    def __len__(self):
+        return len(self.paths)
+
+    def _postings(self, tid):
+        return self.post_ids[self.post_offsets[tid]:self.post_offsets[tid + 1]]
+
+    def _rows_containing(self, word, ignore_case):
+        """경로에 word 가 부분 문자열로 포함된 행 목록 (row id 오름차순)"""
+        cache_key = (word, ignore_case)
+        cached = self._substr_cache.get(cache_key)
+        if cached is not None: return cached
+
+        needle = word.lower() if ignore_case else word
+        if _SEPARATOR_RE.search(needle):
+            # 구분자를 포함한 검색어는 토큰 경계를 넘으므로 경로 원문을 직접 확인
+            rows = [i for i, p in enumerate(self.paths) if needle in (p.lower() if ignore_case else p)]
+        else:
+            # 구분자가 없는 검색어는 반드시 하나의 토큰 안에 들어 있음 -> 어휘 목록만 훑으면 됨
+            row_set = set()
+            if ignore_case:
+                for low_tok, tids in self.lower_vocab.items():
+                    if needle in low_tok:
+                        for tid in tids: row_set.update(self._postings(tid))
+            else:
+                for tok, tid in self.token_ids.items():
+                    if needle in tok: row_set.update(self._postings(tid))
+            rows = sorted(row_set)
+
+        self._substr_cache[cache_key] = rows
+        return rows
+
+    def _score(self, row_id, cat_path, hint_keywords, hint_tids, hint_last_tid):
+        row_tids = self.row_tok_ids[self.row_tok_offsets[row_id]:self.row_tok_offsets[row_id + 1]]
+        score = 0
+        for kw, tid in zip(hint_keywords, hint_tids):
+            if tid is not None and tid in row_tids: score += 10
+            elif kw in cat_path: score += 1
+        if hint_last_tid is not None and self.leaf_ids[row_id] == hint_last_tid:
+            score += 50
+        return score
+
+    def _pick_best(self, rows, hint_keywords):
+        """(점수 내림차순, 경로 길이 오름차순, 행 순서) 기준 최적 경로와 점수"""
+        hint_tids = [self.token_ids.get(kw) for kw in hint_keywords]
+        best_match, max_score = "", -1
+        for row_id in rows:
+            cat_path = self.paths[row_id]
+            score = self._score(row_id, cat_path, hint_keywords, hint_tids, hint_tids[-1])
+            if score > max_score:
+                best_match, max_score = cat_path, score
+            elif score == max_score and len(cat_path) < len(best_match):
+                best_match = cat_path
+        return best_match, max_score
+
+    def find_best(self, ai_path_hint):
+        if not len(self.paths) or not ai_path_hint: return ""
+
+        hint_keywords = tokenize_hint(ai_path_hint)
+        if not hint_keywords: return ""
+        hint_last_word = hint_keywords[-1]
+
+        # 1차 후보: 핵심 단어(마지막 단어)가 포함된 경로 (대소문자 무시)
+        candidates = self._rows_containing(hint_last_word, ignore_case=True)
+        if candidates:
+            return self._pick_best(candidates, hint_keywords)[0]
+
+        # 전체 검색 대체: 어떤 힌트 단어도 포함하지 않는 행은 0점이므로
+        # 힌트 단어를 하나라도 포함한 행만 채점하고, 모두 0점이면 가장 짧은 경로를 반환
+        row_set = set()
+        for kw in hint_keywords:
+            row_set.update(self._rows_containing(kw, ignore_case=False))
+        best_match, max_score = self._pick_best(sorted(row_set), hint_keywords)
+        if max_score > 0:
+            return best_match
+        return self.paths[self.shortest_row]
+
+
+# ==========================
+# 디스크 캐시 (.catidx)
+# ==========================
+# 파일 구조: [헤더][섹션 목록][섹션들]
+#   헤더: magic, 버전, 섹션 수, 원본 엑셀 mtime_ns / size / sha256
+#   섹션: 행 수, 최단 경로 행, 그리고 _FIELDS 순서의 배열들 (각각 byte 길이 + 8바이트 정렬)
+_MAGIC = b'GSHCIDX\x00'
+_VERSION = 1
+_HEADER = struct.Struct('<8sHHqq32s')
+_SECTION_ENTRY = struct.Struct('<32sQ')
+_SECTION_HEADER = struct.Struct('<Ii')
+_CHUNK_LEN = struct.Struct('<Q')
+
+
+def _pad8(n):
+    return (8 - n % 8) % 8
+
+
+def workbook_fingerprint(path, with_hash=True):
+    """(mtime_ns, size, sha256) - 해시는 필요할 때만 계산"""
+    st = os.stat(path)
+    digest = b''
+    if with_hash:
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                h.update(chunk)
+        digest = h.digest()
+    return st.st_mtime_ns, st.st_size, digest
+
+
+def _write_index_file(cache_path, fingerprint, indexes):
+    """indexes({이름: CategoryIndex}) 를 임시 파일에 쓴 뒤 원자적으로 교체"""
+    mtime_ns, size, digest = fingerprint
+    sections = []
+    for name, index in indexes.items():
+        body = bytearray(_SECTION_HEADER.pack(len(index), index.shortest_row))
+        for field, _ in CategoryIndex._FIELDS:
+            data = getattr(index, field)
+            raw = data.tobytes() if isinstance(data, array) else bytes(data)
+            body += _CHUNK_LEN.pack(len(raw)) + raw + b'\x00' * _pad8(len(raw))
+        sections.append((name, body))
+
+    offset = _HEADER.size + _SECTION_ENTRY.size * len(sections)
+    out = bytearray(_HEADER.pack(_MAGIC, _VERSION, len(sections), mtime_ns, size, digest))
+    for name, body in sections:
+        out += _SECTION_ENTRY.pack(name.encode('utf-8'), offset)
+        offset += len(body)
+    for _, body in sections:
+        out += body
+
+    tmp_path = cache_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(out)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, cache_path)
+
+
+def _read_fingerprint(mm):
+    """캐시 파일 헤더 -> (섹션 수, 저장된 fingerprint)"""
+    magic, version, count, mtime_ns, size, digest = _HEADER.unpack_from(mm, 0)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError("캐시 형식 불일치")
+    return count, (mtime_ns, size, digest)
+
+
+def _read_indexes(mm, count):
+    """mmap 된 캐시 파일 -> {이름: CategoryIndex} (배열은 복사 없이 mmap 을 직접 참조)"""
+    view = memoryview(mm)
+    indexes = {}
+    for i in range(count):
+        raw_name, offset = _SECTION_ENTRY.unpack_from(mm, _HEADER.size + i * _SECTION_ENTRY.size)
+        _, shortest_row = _SECTION_HEADER.unpack_from(mm, offset)
+        pos = offset + _SECTION_HEADER.size
+        arrays = {}
+        for field, typecode in CategoryIndex._FIELDS:
+            (length,) = _CHUNK_LEN.unpack_from(mm, pos)
+            pos += _CHUNK_LEN.size
+            chunk = view[pos:pos + length]
+            arrays[field] = chunk if typecode == 'B' else chunk.cast('I')
+            pos += length + _pad8(length)
+        indexes[raw_name.rstrip(b'\x00').decode('utf-8')] = CategoryIndex(arrays, shortest_row)
+    return indexes
+
+
+class CategoryIndexCache:
+    """
+    엑셀 옆에 저장되는 컴파일된 카테고리 색인 (<엑셀파일>.catidx)
+    - 로드 시 mmap 한 번으로 끝 (XLSX 파싱 없음)
+    - 엑셀의 mtime/size 가 같으면 바로 사용, 다르면 sha256 비교 후 내용이 바뀐 경우에만 재생성
+    """
+    def __init__(self, workbook_path, log_callback):
+        self.workbook_path = workbook_path
+        self.cache_path = workbook_path + '.catidx'
+        self.log_callback = log_callback
+        self._mm = None
+
+    def load(self, build_func):
+        """
+        캐시가 유효하면 mmap 으로 로드, 아니면 build_func() -> {이름: 경로 목록} 으로 재생성
+        반환: {이름: CategoryIndex}
+        """
+        self.close()
+        current = workbook_fingerprint(self.workbook_path, with_hash=False)
+        indexes = self._try_load(current)
+        if indexes is not None:
+            return indexes
+
+        self.log_callback("🛠️ [Excel] 카테고리 색인 생성 중... (엑셀 변경 감지)")
+        indexes = {name: CategoryIndex.from_paths(paths) for name, paths in build_func().items()}
+        try:
+            _write_index_file(self.cache_path, workbook_fingerprint(self.workbook_path), indexes)
+            reloaded = self._try_load(workbook_fingerprint(self.workbook_path, with_hash=False))
+            if reloaded is not None:
+                return reloaded
+        except Exception as e:
+            self.log_callback(f"⚠️ [Excel] 색인 캐시 저장 실패 (메모리 색인 사용): {e}")
+        return indexes
+
+    def _try_load(self, current):
+        if not os.path.exists(self.cache_path): return None
+        try:
+            with open(self.cache_path, 'rb') as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            return None
+
+        try:
+            count, stored = _read_fingerprint(mm)
+            mtime_ns, size, _ = current
+            if stored[:2] != (mtime_ns, size):
+                # 저장 시각만 바뀐 경우(내용 동일)는 해시로 확인 후 지문만 갱신
+                if stored[1] != size or workbook_fingerprint(self.workbook_path)[2] != stored[2]:
+                    mm.close()
+                    return None
+                self.restamp()
+            indexes = _read_indexes(mm, count)
+        except Exception:
+            try: mm.close()
+            except Exception: pass
+            return None
+
+        self._mm = mm
+        return indexes
+
+    def restamp(self):
+        """
+        엑셀 지문만 현재 상태로 갱신 (색인 내용은 그대로)
+        - 이 프로그램이 결과 시트에만 쓰고 저장한 직후 호출 -> 카테고리 시트는 그대로이므로 재생성 불필요
+        """
+        try:
+            if not os.path.exists(self.cache_path): return
+            mtime_ns, size, digest = workbook_fingerprint(self.workbook_path)
+            with open(self.cache_path, 'r+b') as f:
+                magic, version, count, _, _, _ = _HEADER.unpack(f.read(_HEADER.size))
+                if magic != _MAGIC or version != _VERSION: return
+                f.seek(0)
+                f.write(_HEADER.pack(magic, version, count, mtime_ns, size, digest))
+        except Exception as e:
+            self.log_callback(f"⚠️ [Excel] 색인 지문 갱신 실패: {e}")
+
+    def close(self):
+        if self._mm is not None:
+            try: self._mm.close()
+            except Exception: pass
+            self._mm = None
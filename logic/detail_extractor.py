@@ -0,0 +1,182 @@
+from selenium.webdriver.common.by import By
+
+from logic.structured_data import COLLECT_JS, STRUCTURED_JS, structured_fields
+
+# 상세 페이지 항목 종류 (사이트 프로필 detail_fields 의 키)
+DETAIL_KINDS = ('title', 'brand', 'manufacturer', 'specs', 'description')
+
+# 프로필에 식별자가 없을 때 쓰는 일반 식별자
+GENERIC_FIELDS = {
+    'title': ["h1", "[itemprop='name']"],
+    'brand': ["[itemprop='brand']", "#bylineInfo", "[class*='brand' i]"],
+    'manufacturer': ["[itemprop='manufacturer']"],
+    'specs': [
+        "#productDetails_techSpec_section_1", "#detailBullets_feature_div", "#productOverview_feature_div",
+        "[class*='spec' i] table", "[id*='spec' i] table", "[class*='attribute' i]", "[class*='param' i]",
+    ],
+    'description': [
+        "#feature-bullets", "#productDescription", "[itemprop='description']",
+        "[id*='description' i]", "[class*='description' i]", "[class*='item-desc' i]", "[class*='detail' i]",
+    ],
+}
+
+# 브랜드/제조사/모델 표 항목 이름 (표의 머리칸이 이 문구와 정확히 같을 때만 값을 해당 항목으로 사용)
+# ('Compatible Brand', 'Coffee Maker', 'Manufacturer Part Number' 처럼 일부만 겹치는 항목은 제외)
+LABELS = {
+    'brand': ['brand', 'brand name', 'ブランド', 'ブランド名', '品牌', '브랜드'],
+    'manufacturer': ['manufacturer', 'maker', 'メーカー', 'メーカー名', '製造元', '生产厂家', '制造商', '厂家', '제조사', '제조자'],
+    'model': ['model', 'model number', 'model no', 'item model number', 'mpn', '型番', '型号', '모델명'],
+}
+
+# 본문에서 제외할 영역 (메뉴/머리말/꼬리말/추천·광고 목록 등)
+BOILERPLATE = [
+    "nav", "header", "footer", "aside", "[role='navigation']", "[role='banner']", "[role='contentinfo']",
+    "[class*='recommend' i]", "[class*='carousel' i]", "[class*='similar' i]", "[class*='related' i]",
+    "[class*='sponsored' i]", "[id*='sims' i]", "[class*='footer' i]", "[class*='breadcrumb' i]",
+    "[class*='review' i]", "[id*='review' i]",
+]
+
+# 페이지 안에서 한 번에 실행: 항목별로 필요한 부분만 골라 정리된 짧은 텍스트로 반환
+# (전체 본문 텍스트를 WebDriver 로 주고받지 않음)
+_EXTRACT_JS = COLLECT_JS + """
+const fields = arguments[0], generic = arguments[1], labels = arguments[2], boiler = arguments[3], budget = arguments[4];
+const clean = (s) => (s || '').split('\\n').map(l => l.replace(/\\s+/g, ' ').trim()).filter(l => l.length > 1);
+const isBoiler = (el) => boiler.some(sel => { try { return !!el.closest(sel); } catch (e) { return false; } });
+const visible = (el) => el.getClientRects().length > 0;
+const hits = {};
+
+function first(kind) {
+    const lists = [[fields[kind] || [], true], [generic[kind] || [], false]];
+    for (const [sels, learned] of lists) {
+        for (const sel of sels) {
+            let nodes;
+            try { nodes = document.querySelectorAll(sel); } catch (e) { continue; }
+            for (const el of nodes) {
+                if (!visible(el) || isBoiler(el)) continue;
+                const text = (el.innerText || '').trim();
+                if (!text) continue;
+                if (learned) hits[kind] = sel;
+                return text;
+            }
+        }
+    }
+    return '';
+}
+
+// 표/정의 목록 -> "항목: 값" 줄 (추천 목록/꼬리말 안의 표는 제외)
+const specLines = [], labelled = {};
+function addPair(key, value) {
+    key = key.replace(/\\s+/g, ' ').trim().replace(/[:：]$/, '');
+    value = value.replace(/\\s+/g, ' ').trim();
+    if (!key || !value || key.length > 60 || value.length > 200) return;
+    specLines.push(key + ': ' + value);
+    // 머리칸 정규화 (방향 표시 문자/끝의 구두점 제거) 후 정확히 일치할 때만 사용
+    const low = key.toLowerCase().replace(/[\u200e\u200f]/g, '').replace(/[\s:：.]+$/, '').trim();
+    for (const name in labels) {
+        if (!labelled[name] && labels[name].includes(low)) labelled[name] = value;
+    }
+}
+for (const row of document.querySelectorAll('table tr')) {
+    if (specLines.length >= 40) break;
+    const cells = row.querySelectorAll('th, td');
+    if (cells.length !== 2 || !visible(row) || isBoiler(row)) continue;
+    addPair(cells[0].innerText || '', cells[1].innerText || '');
+}
+for (const dt of document.querySelectorAll('dt')) {
+    if (specLines.length >= 40) break;
+    const dd = dt.nextElementSibling;
+    if (!dd || dd.tagName !== 'DD' || !visible(dt) || isBoiler(dt)) continue;
+    addPair(dt.innerText || '', dd.innerText || '');
+}
+
+const title = clean(first('title'))[0] || document.title || '';
+const brand = (clean(first('brand'))[0] || labelled.brand || '').replace(/^(visit the|brand:)\\s*/i, '');
+const manufacturer = clean(first('manufacturer'))[0] || labelled.manufacturer || '';
+let specs = clean(first('specs'));
+if (!specs.length) specs = specLines;
+let description = clean(first('description'));
+if (description.join(' ').length < 50) {
+    // 설명 영역을 못 찾으면 본문에서 메뉴/추천 목록 등을 뺀 나머지
+    const main = document.querySelector('main, [role="main"], article') || document.body;
+    let text = main.innerText || '';
+    for (const sel of boiler) {
+        let nodes;
+        try { nodes = main.querySelectorAll(sel); } catch (e) { continue; }
+        for (const el of nodes) {
+            const part = el.innerText;
+            if (part && part.length > 20) text = text.replace(part, '');
+        }
+    }
+    description = clean(text);
+}
+
+// 중복 줄 제거 후 예산(글자 수) 안에서 제목 > 브랜드/제조사 > 사양 > 설명 순으로 채움
+const seen = new Set(), out = [];
+let used = 0;
+function push(line, limit) {
+    if (!line || seen.has(line) || used >= limit) return;
+    seen.add(line);
+    line = line.slice(0, limit - used);
+    out.push(line);
+    used += line.length + 1;
+}
+push('Title: ' + title, budget);
+if (brand) push('Brand: ' + brand, budget);
+if (manufacturer) push('Manufacturer: ' + manufacturer, budget);
+const specLimit = used + Math.floor((budget - used) * 0.45);
+if (specs.length) push('[Specs]', specLimit);
+for (const line of specs) push(line, specLimit);
+if (description.length) push('[Description]', budget);
+for (const line of description) push(line, budget);
+return {text: out.join('\\n'), title: title, brand: brand, manufacturer: manufacturer, hits: hits,
+        collected: collectStructured()};
+"""
+
+
+class DetailExtractor:
+    """
+    상세 페이지 핵심 텍스트 추출 (페이지 안에서 실행)
+    - 제목 / 브랜드·제조사 / 사양표 / 상품 설명만 골라 예산(글자 수) 안의 짧은 텍스트로 정리
+    - 사이트 프로필 detail_fields 식별자(성공 순) -> 일반 식별자/표 구조 순으로 탐색
+    - 메뉴/꼬리말/추천 목록 제외, 공백/중복 줄 정리 -> WebDriver 전송량과 AI 프롬프트 토큰 절감
+    - 실패하면 기존처럼 body 텍스트 앞부분 사용
+    - structured: JSON-LD / microdata 의 브랜드·제조사·모델 값도 함께 수집 (있으면 AI 추출 대신 사용)
+      (사양표 값은 본문 텍스트로만 AI 에 전달, 페이지마다 표기가 달라 그대로 덮어쓰지 않음)
+    """
+    def __init__(self, profiles, budget=2000, enabled=True, structured=True):
+        self.profiles = profiles  # SiteProfileRegistry (식별자 순서/성공 기록)
+        self.budget = max(200, budget)
+        self.enabled = enabled
+        self.structured = structured
+
+    def extract(self, driver):
+        """현재 페이지 -> {'text', 'title', 'brand', 'manufacturer', 'structured'}"""
+        if self.enabled:
+            try:
+                profile = self.profiles.detect(driver.current_url)
+                fields = {kind: self.profiles.ordered(profile, kind) for kind in DETAIL_KINDS}
+                result = driver.execute_script(_EXTRACT_JS, fields, GENERIC_FIELDS, LABELS, BOILERPLATE, self.budget)
+                if result and result.get('text'):
+                    for kind, selector in (result.get('hits') or {}).items():
+                        self.profiles.record_hit(profile.key, kind, selector)
+                    result['structured'] = structured_fields(result.get('collected')) if self.structured else {}
+                    return result
+            except Exception:
+                pass
+        return {'text': self.body_text(driver), 'title': '', 'brand': '', 'manufacturer': '',
+                'structured': self.structured_only(driver)}
+
+    def structured_only(self, driver):
+        """구조화 데이터(JSON-LD/microdata)만 수집 (본문 추출을 끈 경우)"""
+        if not self.structured: return {}
+        try:
+            return structured_fields(driver.execute_script(STRUCTURED_JS))
+        except Exception:
+            return {}
+
+    def body_text(self, driver):
+        """기존 방식: body 전체 텍스트 앞부분 (최대 3000자)"""
+        try:
+            return driver.find_element(By.TAG_NAME, "body").text[:3000]
+        except Exception:
+            return ""
@@ -1,139 +1,258 @@
 import os
+import threading
 import pandas as pd
-import openpyxl
+
+from config_manager import get_int, get_float
+from logic.category_index import CategoryIndexCache
+from logic.workbook_writer import WorkbookWriter
+from logic.result_store import ResultStore
+
+# 카테고리 시트에서 경로가 들어있는 열 이름
+CATEGORY_COLUMN = '여기서 카테고리를 복사해주세요'
+# 수집 결과를 기록하는 시트
+RESULT_SHEET = '엑셀 수집 양식 (Ver.9)'
 
 class ExcelHandler:
     def __init__(self, target_file, log_callback, config):
         self.target_file = target_file
         self.log_callback = log_callback
-        self.coupang_cat = None
-        self.naver_cat = None
+        self.coupang_index = None
+        self.naver_index = None
+        self.category_cache = CategoryIndexCache(target_file, log_callback)
+        self.writer = None # 결과 시트 버퍼 라이터 (첫 저장 시 생성)
+        self._write_lock = threading.RLock() # 파이프라인 작업 스레드들이 동시에 저장하므로 쓰기 보호
+        self._autosave_stop = threading.Event()
+        self._autosave_thread = None # 새 행이 없어도 SAVE_INTERVAL_SEC 마다 버퍼를 저장하는 스레드
+
+        # 저장 방식: excel(기본, 엑셀에 바로 기록) / sqlite(스테이징 DB 후 일괄 내보내기)
+        self.store = None
+        if str(config.get('SAVE_BACKEND', 'excel')).strip().lower() == 'sqlite':
+            db_path = os.path.splitext(target_file)[0] + '_staging.db'
+            self.store = ResultStore(db_path)
+            self.log_callback(f"🗃️ [DB] 스테이징 저장소 사용: {db_path}")
         self.config = config # 설정값 저장
         
         # 초기 로드
         self.load_categories()
 
     def load_categories(self):
-        """카테고리 엑셀 파일 로드"""
+        """
+        카테고리 색인 로드
+        - 엑셀 옆의 컴파일된 색인(.catidx)이 유효하면 mmap 으로 바로 사용
+        - 엑셀이 바뀐 경우에만 카테고리 시트를 다시 읽어 색인 재생성
+        """
         try:
             if not os.path.exists(self.target_file): 
                 self.log_callback(f"⚠️ [Excel] 파일 없음: {self.target_file}")
                 return
-            # 데이터 타입을 str로 강제 변환하여 로드 (에러 방지)
-            self.coupang_cat = pd.read_excel(self.target_file, sheet_name='쿠팡 전체 카테고리 (240517)', dtype=str)
-            self.naver_cat = pd.read_excel(self.target_file, sheet_name='네이버 전체 카테고리 (251215)', dtype=str)
-            self.log_callback(f"✅ [Excel] 카테고리 데이터 로드 완료")
+            self.coupang_index = self.naver_index = None
+            indexes = self.category_cache.load(self._read_category_sheets)
+            self.coupang_index = indexes['coupang']
+            self.naver_index = indexes['naver']
+            self.log_callback(f"✅ [Excel] 카테고리 데이터 로드 완료 (쿠팡 {len(self.coupang_index)} / 네이버 {len(self.naver_index)})")
         except Exception as e:
             self.log_callback(f"❌ [Excel] 로드 실패: {e}")
 
+    def _read_category_sheets(self):
+        """카테고리 시트 원본 읽기 (색인 재생성 시에만 호출)"""
+        # 데이터 타입을 str로 강제 변환하여 로드 (에러 방지)
+        coupang_cat = pd.read_excel(self.target_file, sheet_name='쿠팡 전체 카테고리 (240517)', dtype=str, usecols=[CATEGORY_COLUMN])
+        naver_cat = pd.read_excel(self.target_file, sheet_name='네이버 전체 카테고리 (251215)', dtype=str, usecols=[CATEGORY_COLUMN])
+        return {
+            'coupang': list(coupang_cat[CATEGORY_COLUMN]),
+            'naver': list(naver_cat[CATEGORY_COLUMN]),
+        }
+
     def find_best_category(self, ai_path_hint, platform='coupang'):
         """
         [개선된 알고리즘]
         1. 단순 포함(in) 대신 단어 단위 분리(Split) 후 일치 여부 확인
         2. 경로의 '마지막 단어'가 정확히 일치하면 가산점 부여
         3. 점수가 같으면 '더 짧은 경로'를 선택 (군더더기 없는 매칭 선호)
+        (채점은 load_categories 에서 만든 역색인으로 힌트와 토큰을 공유하는 행만 수행)
         """
-        df = self.coupang_cat if platform == 'coupang' else self.naver_cat
-        if df is None or not ai_path_hint: return ""
-        
-        target_col = '여기서 카테고리를 복사해주세요'
-        
-        # 1. AI 힌트 전처리 (특수문자 제거 및 리스트화)
-        # 예: "문구 > 필기구 > 연필" -> ['문구', '필기구', '연필']
-        hint_keywords = [k.strip() for k in ai_path_hint.replace('>', ' ').split() if len(k.strip()) > 0]
-        if not hint_keywords: return ""
-        
-        hint_last_word = hint_keywords[-1] # 핵심 키워드 (예: 연필)
+        index = self.coupang_index if platform == 'coupang' else self.naver_index
+        if index is None or not ai_path_hint: return ""
+        return index.find_best(ai_path_hint)
 
-        best_match = ""
-        max_score = -1 # 초기값
-        
-        # 후보군 필터링 (속도 최적화: 핵심 단어가 포함된 것만 1차 조회)
-        candidates = df[df[target_col].str.contains(hint_last_word, na=False, case=False)]
-        if candidates.empty:
-            candidates = df # 없으면 전체 검색
+    def _normalize_row(self, data_row):
+        """수집 결과 dict -> 저장용 dict (태그 문자열화, 배송비 설정값 포함)"""
+        # 리스트 -> 문자열 변환
+        tags_value = data_row['tags']
+        if isinstance(tags_value, list):
+            tags_value = ", ".join(tags_value)
 
-        for cat_path in candidates[target_col]:
-            if not isinstance(cat_path, str): continue
-            
-            # 2. 카테고리 경로를 단어 단위로 쪼개기 (Tokenization)
-            # 구분자(>, /)를 모두 공백으로 바꾸고 리스트로 만듦
-            # 예: "문구/사무용품>연필꽂이" -> ['문구', '사무용품', '연필꽂이']
-            cat_tokens = cat_path.replace('>', ' ').replace('/', ' ').split()
-            cat_tokens = [t.strip() for t in cat_tokens if t.strip()]
-            
-            score = 0
-            
-            # [채점 기준 1] 단어 일치 개수 (Set Intersection 개념)
-            # '연필'을 찾는데 '연필꽂이' 토큰은 '연필'과 다르므로 매칭되지 않음
-            for kw in hint_keywords:
-                if kw in cat_tokens: 
-                    score += 10 # 단순 포함보다 높은 점수 부여
-                elif kw in cat_path: 
-                    score += 1  # (보조) 단어는 안 맞지만 글자가 포함되면 소폭 점수 (예: 띄어쓰기 차이)
-
-            # [채점 기준 2] 마지막 단어(Leaf Category) 완전 일치 보너스 (핵심!)
-            if cat_tokens and (cat_tokens[-1] == hint_last_word):
-                score += 50 # 강력한 가산점 (확실한 타겟)
-
-            # [갱신 로직]
-            if score > max_score:
-                max_score = score
-                best_match = cat_path
-            
-            elif score == max_score:
-                # [동점 처리 수정] 더 짧은 것을 선택!
-                # 이유: '연필'(짧음)이 '연필 교정 그립'(김)보다 사용자의 의도에 가까울 확률이 높음 (일반화)
-                if len(cat_path) < len(best_match):
-                    best_match = cat_path
+        # 고정값들
+        # [수정] 설정값 불러오기 (없으면 기본값 사용)
+        try:
+            cost_basic = int(self.config.get('COST_BASIC', 0))
+            cost_exchange = int(self.config.get('COST_EXCHANGE', 5000))
+            cost_return = int(self.config.get('COST_RETURN', 10000))
+        except:
+            cost_basic, cost_exchange, cost_return = 0, 5000, 10000
+
+        return {
+            'shop': data_row.get('shop', ''),
+            'keyword': data_row.get('keyword', ''),
+            'cp_cat': data_row['cp_cat'],
+            'nv_cat': data_row['nv_cat'],
+            'title': data_row['title'],
+            'tags': tags_value,
+            'url': data_row['url'],
+            'manufacturer': data_row['manufacturer'],
+            'brand': data_row['brand'],
+            'model': data_row['model'],
+            'cost_basic': cost_basic,
+            'cost_exchange': cost_exchange,
+            'cost_return': cost_return,
+        }
+
+    @staticmethod
+    def _sheet_values(row):
+        """저장용 dict -> {엑셀 열 번호: 값} ('엑셀 수집 양식 (Ver.9)' 기준)"""
+        return {
+            2: row['cp_cat'],
+            3: row['nv_cat'],
+            4: row['title'],
+            5: row['tags'],
+            6: row['url'],
+            7: 0,                                           # 공급가
+            8: '유료' if row['cost_basic'] > 0 else '무료',
+            9: row['cost_basic'],                           # 기본 배송비
+            10: row['cost_exchange'],                       # 교환 배송비
+            11: row['cost_return'],                         # 반품 배송비
+            12: row['manufacturer'],
+            13: row['brand'],
+            14: row['model'],
+        }
+
+    def _open_writer(self):
+        if self.writer is None:
+            self.writer = WorkbookWriter(
+                self.target_file, RESULT_SHEET, self.log_callback,
+                flush_every=get_int(self.config, 'SAVE_EVERY_N', 10),
+                flush_interval=get_float(self.config, 'SAVE_INTERVAL_SEC', 30.0),
+                # 결과 시트만 수정했으므로 카테고리 색인은 그대로 두고 지문만 갱신
+                on_flush=self.category_cache.restamp
+            )
+            self._start_autosave()
+        return self.writer
+
+    def _start_autosave(self):
+        """
+        주기 저장 스레드 시작 (첫 저장 시 1회)
+        - 페이지 로딩/AI/KIPRIS 지연으로 새 행이 한동안 없어도 버퍼의 행이 SAVE_INTERVAL_SEC 안에 디스크에 기록되도록
+        """
+        if self._autosave_thread is not None: return
+        interval = self.writer.flush_interval
+        check_every = min(5.0, max(0.5, interval / 4))
+
+        def loop():
+            while not self._autosave_stop.wait(check_every):
+                try:
+                    with self._write_lock:
+                        if self.writer: self.writer.flush_if_due()
+                except Exception as e:
+                    self.log_callback(f"⚠️ [Excel] 주기 저장 실패: {e}")
+
+        self._autosave_stop.clear()
+        self._autosave_thread = threading.Thread(target=loop, name="excel-autosave", daemon=True)
+        self._autosave_thread.start()
 
-        return best_match
+    def _stop_autosave(self):
+        if self._autosave_thread is None: return
+        self._autosave_stop.set()
+        self._autosave_thread.join(timeout=5)
+        self._autosave_thread = None
 
     def save_product(self, data_row):
-        """수집된 상품 정보를 엑셀에 추가"""
+        """
+        수집된 상품 정보 저장
+        - SAVE_BACKEND=excel : 엑셀에 추가 (버퍼 라이터 사용, 실제 디스크 기록은 주기적으로)
+        - SAVE_BACKEND=sqlite: 스테이징 DB 에만 저장 (엑셀 반영은 export_results)
+        """
         try:
-            wb = openpyxl.load_workbook(self.target_file)
-            ws = wb['엑셀 수집 양식 (Ver.9)']
-            
-            # 빈 행 찾기 (4열 상품명 기준)
-            start_row = 7
-            while ws.cell(row=start_row, column=4).value is not None:
-                start_row += 1
-            
-            # 리스트 -> 문자열 변환
-            tags_value = data_row['tags']
-            if isinstance(tags_value, list):
-                tags_value = ", ".join(tags_value)
-            
+            row = self._normalize_row(data_row)
+            if self.store is not None:
+                row_id = self.store.add(row)
+                self.log_callback(f"🗃️ [DB] #{row_id} 스테이징 저장 | {row['title'][:10]}...")
+                return
+
             # 엑셀 쓰기
-            ws.cell(row=start_row, column=2, value=data_row['cp_cat'])
-            ws.cell(row=start_row, column=3, value=data_row['nv_cat'])
-            ws.cell(row=start_row, column=4, value=data_row['title'])
-            ws.cell(row=start_row, column=5, value=tags_value)
-            ws.cell(row=start_row, column=6, value=data_row['url'])
-            
-            # 고정값들
-            # [수정] 설정값 불러오기 (없으면 기본값 사용)
-            try:
-                cost_basic = int(self.config.get('COST_BASIC', 0))
-                cost_exchange = int(self.config.get('COST_EXCHANGE', 5000))
-                cost_return = int(self.config.get('COST_RETURN', 10000))
-            except:
-                cost_basic, cost_exchange, cost_return = 0, 5000, 10000
-
-            # [수정] 엑셀에 설정값 적용
-            ws.cell(row=start_row, column=7, value=0) # 공급가
-            ws.cell(row=start_row, column=8, value='유료' if cost_basic > 0 else '무료')
-            ws.cell(row=start_row, column=9, value=cost_basic)    # 기본 배송비
-            ws.cell(row=start_row, column=10, value=cost_exchange) # 교환 배송비
-            ws.cell(row=start_row, column=11, value=cost_return)   # 반품 배송비
-            
-            ws.cell(row=start_row, column=12, value=data_row['manufacturer'])
-            ws.cell(row=start_row, column=13, value=data_row['brand'])
-            ws.cell(row=start_row, column=14, value=data_row['model'])
-            
-            wb.save(self.target_file)
-            self.log_callback(f"💾 [Excel] {start_row}행 저장 | {data_row['title'][:10]}...")
+            with self._write_lock:
+                row_num = self._open_writer().append(self._sheet_values(row))
+            self.log_callback(f"💾 [Excel] {row_num}행 기록 | {row['title'][:10]}...")
             
         except Exception as e:
-            self.log_callback(f"❌ [Excel] 저장 실패: {e}")
\ No newline at end of file
+            self.log_callback(f"❌ [Excel] 저장 실패: {e}")
+
+    def export_results(self, output_file=None, shop=None, keyword=None, since=None, until=None, shard_size=0):
+        """
+        스테이징 DB 의 결과를 '엑셀 수집 양식 (Ver.9)' 에 한 번에 기록
+        - output_file 이 없으면 원본 엑셀(target_file)의 결과 시트에 이어서 기록
+        - 쇼핑몰/키워드/기간(epoch 초)으로 필터링 가능
+        - shard_size > 0 이면 해당 개수씩 나누어 '<파일명>_01.xlsx', '<파일명>_02.xlsx' ... 로 저장
+        반환: 저장된 파일 경로 목록
+        """
+        if self.store is None:
+            self.log_callback("⚠️ [Export] 스테이징 DB 가 없습니다. (SAVE_BACKEND=sqlite 필요)")
+            return []
+
+        rows = self.store.query(shop=shop, keyword=keyword, since=since, until=until)
+        if not rows:
+            self.log_callback("⚠️ [Export] 내보낼 결과가 없습니다.")
+            return []
+
+        output_file = output_file or self.target_file
+        if shard_size and shard_size > 0 and len(rows) > shard_size:
+            base, ext = os.path.splitext(output_file)
+            shards = [(f"{base}_{i + 1:02d}{ext}", rows[start:start + shard_size])
+                      for i, start in enumerate(range(0, len(rows), shard_size))]
+        else:
+            shards = [(output_file, rows)]
+
+        with self._write_lock:
+            return self._export_shards(shards)
+
+    def _export_shards(self, shards):
+        # 원본 엑셀에 직접 기록할 경우 열려있는 라이터와 충돌하지 않도록 먼저 정리
+        if self.writer:
+            self.writer.close()
+            self.writer = None
+
+        saved = []
+        for path, shard_rows in shards:
+            is_target = os.path.abspath(path) == os.path.abspath(self.target_file)
+            writer = WorkbookWriter(
+                self.target_file, RESULT_SHEET, self.log_callback,
+                flush_every=len(shard_rows), flush_interval=float('inf'),
+                # 별도 파일은 양식만 복사하고 기존 결과 행은 비움
+                output_path=path, clear_existing=not is_target
+            )
+            try:
+                for row in shard_rows:
+                    writer.append(self._sheet_values(row))
+            finally:
+                writer.close()
+            if is_target:
+                self.category_cache.restamp()
+            saved.append(path)
+            self.log_callback(f"📤 [Export] {len(shard_rows)}개 행 -> {path}")
+        return saved
+
+    def flush(self):
+        """버퍼에 쌓인 행을 즉시 디스크에 기록"""
+        with self._write_lock:
+            if self.writer: self.writer.flush()
+
+    def close(self):
+        """남은 행 저장 후 워크북 및 mmap 된 카테고리 색인 해제"""
+        self._stop_autosave()
+        with self._write_lock:
+            if self.writer:
+                self.writer.close()
+                self.writer = None
+        if self.store:
+            self.store.close()
+        self.coupang_index = self.naver_index = None
+        self.category_cache.close()
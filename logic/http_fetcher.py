@@ -0,0 +1,224 @@
+import re
+import threading
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlsplit
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import lxml.html as lxml_html  # 있으면 빠른 파서 사용 (없으면 표준 라이브러리 파서)
+except ImportError:
+    lxml_html = None
+
+from logic.structured_data import json_ld_blocks, structured_fields
+
+# 차단/캡차 페이지로 판단하는 문구
+BLOCK_MARKERS = [
+    'captcha', 'robot check', 'are you a human', 'access denied', 'pardon our interruption',
+    'unusual traffic', 'verify you are human', 'security check', '滑动验证', '验证码', 'アクセスが集中',
+]
+BLOCK_STATUS = {403, 429, 503}
+
+# 텍스트에 포함하지 않는 태그 / 줄바꿈을 넣는 블록 태그
+_SKIP_TAGS = {'script', 'style', 'noscript', 'template', 'head', 'svg'}
+_BLOCK_TAGS = {'p', 'div', 'br', 'li', 'tr', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'section', 'article', 'table', 'ul', 'dd', 'dt'}
+
+# 상세 본문이 이보다 짧으면 JS 로 그려지는 페이지로 보고 브라우저로 대체
+MIN_DETAIL_CHARS = 200
+
+
+class _PageParser(HTMLParser):
+    """표준 라이브러리 파서: 링크(주소, 텍스트) 목록 + 보이는 본문 텍스트"""
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.links = []
+        self.parts = []
+        self._skip = 0
+        self._anchor = None  # [href, 텍스트 조각들]
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIP_TAGS:
+            self._skip += 1
+        elif tag == 'a':
+            self._anchor = [dict(attrs).get('href'), []]
+        if tag in _BLOCK_TAGS: self.parts.append('\n')
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS:
+            self._skip = max(0, self._skip - 1)
+        elif tag == 'a' and self._anchor is not None:
+            href, texts = self._anchor
+            if href: self.links.append((href, " ".join("".join(texts).split())))
+            self._anchor = None
+            self.parts.append(' ')
+        if tag in _BLOCK_TAGS: self.parts.append('\n')
+
+    def handle_data(self, data):
+        if self._skip: return
+        self.parts.append(data)
+        if self._anchor is not None: self._anchor[1].append(data)
+
+
+def _clean_text(text):
+    lines = (" ".join(line.split()) for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def parse_page(html, base_url):
+    """HTML -> ([(절대 주소, 링크 텍스트), ...], 본문 텍스트)"""
+    if lxml_html is not None:
+        try:
+            doc = lxml_html.fromstring(html)
+            for bad in doc.xpath('//script|//style|//noscript|//template'):
+                bad.drop_tree()
+            links = [(urljoin(base_url, a.get('href')), " ".join(a.text_content().split()))
+                     for a in doc.iter('a') if a.get('href')]
+            body = doc.find('body')
+            return links, _clean_text((body if body is not None else doc).text_content())
+        except Exception:
+            pass
+    parser = _PageParser()
+    parser.feed(html)
+    links = [(urljoin(base_url, href), text) for href, text in parser.links]
+    return links, _clean_text("".join(parser.parts))
+
+
+class HttpFetcher:
+    """
+    브라우저 없이 HTTP 로 결과/상세 페이지를 읽는 엔진 (서버에서 그려지는 사이트 전용)
+    - 연결 재사용 세션 + 상세 페이지 동시 요청
+    - Selenium 세션의 쿠키/User-Agent 를 가져와 같은 사용자처럼 요청
+    - 차단 페이지/JS 전용 페이지를 감지하면 None 반환 -> 호출 측에서 브라우저로 대체
+    - 같은 사이트에서 연속으로 실패하면 이번 실행 동안 해당 사이트는 브라우저만 사용
+    """
+    def __init__(self, log_callback, sites=('ebay', 'rakuten'), pool_size=6, timeout=10, max_failures=2,
+                 structured_data=True):
+        self.log_callback = log_callback
+        self.structured_data = structured_data
+        self.sites = {s.lower() for s in sites}
+        self.pool_size = max(1, pool_size)
+        self.timeout = timeout
+        self.max_failures = max(1, max_failures)
+        self.failures = {}            # site -> 연속 실패 횟수 (상세 페이지 동시 요청 스레드에서도 갱신)
+        self._lock = threading.Lock()
+        self.session_sites = set()    # 브라우저 쿠키를 가져온 사이트
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="http-fetch")
+
+    def supports(self, site):
+        with self._lock:
+            return site in self.sites and self.failures.get(site, 0) < self.max_failures
+
+    def mark_failure(self, site, reason):
+        with self._lock:
+            self.failures[site] = self.failures.get(site, 0) + 1
+            count = self.failures[site]
+        if count >= self.max_failures:
+            self.log_callback(f"   ↩️ [HTTP] {site.upper()} {reason} -> 이번 실행은 브라우저로만 수집")
+        else:
+            self.log_callback(f"   ↩️ [HTTP] {site.upper()} {reason} -> 브라우저로 대체")
+
+    def mark_success(self, site):
+        with self._lock:
+            self.failures[site] = 0
+
+    # ==========================
+    # 브라우저 세션 공유
+    # ==========================
+    def import_browser_session(self, driver, site):
+        """현재 브라우저 탭 도메인의 쿠키 + User-Agent/언어를 HTTP 세션에 복사"""
+        try:
+            for c in driver.get_cookies():
+                self.session.cookies.set(c['name'], c['value'], domain=c.get('domain'), path=c.get('path', '/'))
+            user_agent, language = driver.execute_script("return [navigator.userAgent, navigator.language];")
+            self.session.headers.update({
+                'User-Agent': user_agent,
+                'Accept-Language': f"{language},en;q=0.8",
+                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            })
+            self.session_sites.add(site)
+        except Exception as e:
+            self.log_callback(f"⚠️ [HTTP] 브라우저 세션 복사 실패: {e}")
+
+    # ==========================
+    # 요청
+    # ==========================
+    @staticmethod
+    def is_blocked(text):
+        """보이는 텍스트 앞부분에 차단/캡차 문구가 있는지 (스크립트 안의 문자열은 보지 않음)"""
+        head = text[:5000].lower()
+        return any(marker in head for marker in BLOCK_MARKERS)
+
+    def _get(self, url, referer=None, site=None):
+        """
+        url -> (링크 목록, 본문 텍스트, 최종 주소, HTML 원문), 실패/차단 시 None
+        - site 가 주어지면 차단(BLOCK_STATUS 응답 / 차단 문구)을 해당 사이트의 연속 실패로 기록
+        """
+        try:
+            headers = {'Referer': referer} if referer else None
+            res = self.session.get(url, timeout=self.timeout, headers=headers)
+            if res.status_code in BLOCK_STATUS:
+                if site: self.mark_failure(site, f"HTTP {res.status_code} 차단")
+                return None
+            if res.status_code != 200: return None
+            links, text = parse_page(res.text, res.url)
+            if self.is_blocked(text):
+                if site: self.mark_failure(site, "차단 페이지 감지")
+                return None
+            return links, text, res.url, res.text
+        except Exception:
+            return None
+
+    def fetch_page(self, url, referer=None):
+        """url -> (링크 목록, 본문 텍스트, 최종 주소), 실패/차단 시 None"""
+        page = self._get(url, referer)
+        return page[:3] if page is not None else None
+
+    def fetch_detail(self, url, referer=None, site=None):
+        """
+        상세 페이지 -> {'url', 'detail_text', 'structured'} (본문 3000자), 차단/JS 전용이면 None
+        - structured: JSON-LD 의 상품명/브랜드/제조사/모델 (structured_data=False 면 빈 dict)
+        - site: 차단되면 해당 사이트 연속 실패로 기록 (기준에 도달하면 이후 브라우저로만 수집)
+        """
+        page = self._get(url, referer, site)
+        if page is None: return None
+        _, text, final_url, html = page
+        if len(text) < MIN_DETAIL_CHARS: return None
+        structured = structured_fields({'jsonld': json_ld_blocks(html)}) if self.structured_data else {}
+        return {'url': final_url, 'detail_text': text[:3000], 'structured': structured}
+
+    def fetch_details(self, urls, referer=None, site=None):
+        """여러 상세 페이지 동시 요청 -> 입력 순서대로 결과 (생성기, 앞의 것부터 바로 사용 가능)"""
+        futures = [self.executor.submit(self.fetch_detail, url, referer, site) for url in urls]
+        for future in futures:
+            yield future.result()
+
+    @staticmethod
+    def harvest_links(links, patterns, bad_words):
+        """결과 페이지 링크 중 상품 주소 패턴(정규식)에 맞는 것만 -> [(주소, 상품명), ...] (중복 제거, 순서 유지)"""
+        regexes = [re.compile(p) for p in patterns]
+        seen, out = set(), []
+        for href, text in links:
+            if len(text) < 5 or href in seen: continue
+            if not any(r.search(href) for r in regexes): continue
+            low_text, low_href = text.lower(), href.lower()
+            if any(b in low_text or b in low_href for b in bad_words): continue
+            seen.add(href)
+            out.append((href, text))
+        return out
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        try: self.session.close()
+        except Exception: pass
+
+
+def origin_of(url):
+    parts = urlsplit(url if '://' in url else 'https://' + url)
+    return f"{parts.scheme}://{parts.netloc}"
@@ -0,0 +1,31 @@
+import threading
+
+
+class JobScheduler:
+    """
+    (쇼핑몰, 키워드) 작업을 여러 브라우저 작업자에게 분배
+    - 같은 사이트는 한 번에 한 작업자만 (사이트별 요청 간격 유지)
+    - 다른 사이트 작업이 남아 있으면 바쁜 사이트 작업을 건너뛰고 먼저 가져감 (같은 사이트 안에서는 입력 순서 유지)
+    """
+    def __init__(self, jobs, site_of):
+        self.pending = list(jobs)  # [(shop_url, keyword), ...]
+        self.site_of = site_of     # shop_url -> 사이트 구분값
+        self.active_sites = set()
+        self._cond = threading.Condition()
+
+    def next_job(self, is_running):
+        """다음 작업 -> (shop_url, keyword), 남은 작업이 없거나 중지되면 None (다른 작업자가 사이트를 쓰는 중이면 대기)"""
+        with self._cond:
+            while self.pending and is_running():
+                for i, job in enumerate(self.pending):
+                    site = self.site_of(job[0])
+                    if site in self.active_sites: continue
+                    self.active_sites.add(site)
+                    return self.pending.pop(i)
+                self._cond.wait(0.5)
+            return None
+
+    def done(self, job):
+        with self._cond:
+            self.active_sites.discard(self.site_of(job[0]))
+            self._cond.notify_all()
@@ -0,0 +1,62 @@
+import re
+import json
+
+_FENCE_RE = re.compile(r"```(?:json)?", re.I)
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+_CLOSERS = {'{': '}', '[': ']'}
+
+
+def _scan(text, start):
+    """
+    start 위치의 괄호부터 한 글자씩 읽음 (문자열/이스케이프 고려)
+    -> (닫힌 위치 또는 None, 끝까지 닫히지 않았을 때 마지막으로 완성된 항목이 끝나는 위치)
+    """
+    depth, in_string, escaped, complete = 0, False, False, start + 1
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped: escaped = False
+            elif ch == '\\': escaped = True
+            elif ch == '"': in_string = False
+            continue
+        if ch == '"': in_string = True
+        elif ch in _CLOSERS: depth += 1
+        elif ch in '}]':
+            depth -= 1
+            if depth <= 0: return i, complete
+            if depth == 1: complete = i + 1   # 안쪽 객체/목록이 닫힌 곳까지는 완성된 항목
+        elif ch == ',' and depth == 1:
+            complete = i
+    return None, complete
+
+
+def _drop_unfinished(text, start, complete):
+    """잘린 JSON -> 마지막으로 완성된 항목까지만 남기고 바깥 괄호를 닫음 (끝나지 않은 마지막 항목은 버림)"""
+    return text[start:complete].rstrip().rstrip(',') + _CLOSERS[text[start]]
+
+
+def repair_json(text, expect=dict):
+    """
+    AI 응답 문자열 -> JSON 값 (dict 또는 list), 복구할 수 없으면 None
+    - 코드블록 표시/앞뒤 설명문 제거 후 첫 번째 { (expect=list 면 [) 부터 짝이 맞는 곳까지 사용
+    - 끝의 쉼표 제거, 응답이 중간에 잘렸으면 완성된 항목까지만 살림 (잘린 마지막 항목은 버림)
+    """
+    if not text: return None
+    text = _FENCE_RE.sub('', str(text)).strip()
+    try:
+        data = json.loads(text)
+        if isinstance(data, expect): return data
+    except ValueError:
+        pass
+
+    start = text.find('[' if expect is list else '{')
+    if start == -1: return None
+    end, complete = _scan(text, start)
+    body = text[start:end + 1] if end is not None else _drop_unfinished(text, start, complete)
+    for variant in (body, _TRAILING_COMMA_RE.sub(r'\1', body)):
+        try:
+            data = json.loads(variant)
+            if isinstance(data, expect): return data
+        except ValueError:
+            continue
+    return None
@@ -0,0 +1,110 @@
+import threading
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from logic.trademark_cache import normalize_brand
+
+
+class KiprisClient:
+    """
+    KIPRIS 상표 검색 클라이언트
+    - keep-alive 세션 재사용 (매 조회마다 TCP/TLS 연결을 새로 맺지 않음)
+    - 스레드 풀로 여러 브랜드를 동시에 조회 (키당 동시 요청 수 제한)
+    - 키 교체 규칙은 기존과 동일: 서버 오류/API 에러/통신 실패 시 다음 키로 교체 후 재시도
+    """
+    API_URL = "https://plus.kipris.or.kr/kipo-api/kipi/trademarkInfoSearchService/getWordSearch"
+
+    def __init__(self, keys, log_callback, max_workers=4, per_key_limit=2, timeout=5, api_url=None):
+        self.keys = list(keys)
+        self.log_callback = log_callback
+        self.timeout = timeout
+        self.api_url = api_url or self.API_URL
+        self.current_idx = 0
+        self._idx_lock = threading.Lock()
+        self._key_slots = {key: threading.BoundedSemaphore(max(1, per_key_limit)) for key in self.keys}
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max(1, max_workers))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="kipris")
+
+    # ==========================
+    # 키 로테이션
+    # ==========================
+    def rotate_key(self, failed_idx=None):
+        """
+        다음 키로 교체 (교체할 여분 키가 없으면 False)
+        - failed_idx: 실패한 요청이 사용한 키 번호. 다른 스레드가 이미 교체했다면 다시 교체하지 않음
+        """
+        with self._idx_lock:
+            if len(self.keys) <= 1:
+                self.log_callback("⚠️ [KIPRIS] 교체할 여분 키가 없습니다.")
+                return False
+            if failed_idx is not None and failed_idx != self.current_idx:
+                return True
+            self.current_idx = (self.current_idx + 1) % len(self.keys)
+            self.log_callback(f"🔄 [KIPRIS] 키 교체 ({self.current_idx + 1}/{len(self.keys)})")
+            return True
+
+    # ==========================
+    # 조회
+    # ==========================
+    def lookup(self, brand):
+        """
+        브랜드 1건 조회 -> (사용 가능 여부, 검색 건수)
+        - 조회 자체가 실패한 경우 (True, None) 반환 (기존과 같이 통과 처리, 캐시하지 않음)
+        """
+        if not self.keys: return True, None
+
+        for _ in range(max(1, len(self.keys))):
+            with self._idx_lock:
+                key_idx = self.current_idx
+            key = self.keys[key_idx]
+            params = {'searchString': brand, 'ServiceKey': key}
+
+            try:
+                with self._key_slots[key]:
+                    res = self.session.get(self.api_url, params=params, timeout=self.timeout)
+                if res.status_code != 200:
+                    self.log_callback(f"⚠️ [KIPRIS] 서버 오류({res.status_code}). 키 교체...")
+                    if self.rotate_key(key_idx): continue
+                    return True, None
+
+                root = ET.fromstring(res.content)
+                error_info = root.find(".//errMsg")
+                if error_info is not None and error_info.text:
+                    self.log_callback(f"⚠️ [KIPRIS] API 에러. 키 교체...")
+                    if self.rotate_key(key_idx): continue
+                    return True, None
+
+                count_tag = root.find(".//totalCount")
+                if count_tag is None: return True, None
+
+                count = int(count_tag.text)
+                return count == 0, count
+
+            except Exception:
+                self.log_callback(f"⚠️ [KIPRIS] 조회 실패. 재시도...")
+                if self.rotate_key(key_idx): continue
+                return True, None
+        return True, None
+
+    def lookup_many(self, brands):
+        """
+        여러 브랜드 동시 조회 -> {brand: (사용 가능 여부, 검색 건수)}
+        - 정규화 후 같은 브랜드는 한 번만 조회
+        """
+        unique = {}
+        for brand in brands:
+            unique.setdefault(normalize_brand(brand), brand)
+        futures = {key: self.executor.submit(self.lookup, brand) for key, brand in unique.items()}
+        return {brand: futures[normalize_brand(brand)].result() for brand in brands}
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        try: self.session.close()
+        except Exception: pass
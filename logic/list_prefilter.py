@@ -0,0 +1,34 @@
+import re
+
+from logic.trademark_cache import normalize_brand
+
+
+class ListPrefilter:
+    """
+    목록(검색 결과) 단계 사전 필터 - 상세 페이지를 열기 전에 브랜드로 제외
+    - 브랜드 금지 목록(BRAND_DENY_LIST): 상품명/카드 브랜드에 단어로 포함되면 제외
+    - 상표권 캐시: 결과 카드에 브랜드가 따로 표시되고, 그 브랜드가 이전 조회에서 상표권이 확인된 경우만 제외
+      (캐시의 브랜드는 AI 가 추출한 값이라 'PRO', 'USB' 같은 일반 단어도 있어 상품명과는 비교하지 않음)
+    """
+    def __init__(self, trademark_cache=None, deny_brands=()):
+        self.trademark_cache = trademark_cache
+        self.deny = {normalize_brand(b) for b in deny_brands if normalize_brand(b)}
+        self._deny_re = self._compile(self.deny)
+
+    @staticmethod
+    def _compile(brands):
+        """브랜드 목록 -> 단어 경계 기준 일치 정규식 (긴 이름 우선, 2자 미만 제외)"""
+        names = sorted((b for b in brands if len(b) >= 2), key=len, reverse=True)
+        if not names: return None
+        pattern = "|".join(re.escape(name) for name in names)
+        return re.compile(rf"(?<![0-9A-Z])(?:{pattern})(?![0-9A-Z])")
+
+    def check(self, title, brand=''):
+        """제외할 이유 (통과면 None)"""
+        text = normalize_brand(f"{title} {brand}")
+        match = self._deny_re.search(text) if self._deny_re is not None else None
+        if match: return f"금지 브랜드 '{match.group(0)}'"
+
+        if brand and self.trademark_cache is not None and self.trademark_cache.get(brand) is False:
+            return f"상표권 브랜드 '{normalize_brand(brand)}'"
+        return None
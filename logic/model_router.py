@@ -0,0 +1,158 @@
+import os
+import json
+import time
+import random
+import threading
+
+_MAX_SAMPLES = 50
+
+
+def _percentile(values, ratio):
+    if not values: return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * ratio))]
+
+
+class ModelRouter:
+    """
+    작업(context: 번역/정보추출/통합분석/카테고리 등)별 Gemini 모델 선택
+    - (작업, 모델)마다 최근 응답 시간(p50/p95), 오류율, 응답 해석 실패율 기록 (model_stats.json)
+    - 성공률(오류/해석 실패 제외)이 quality_floor 이상인 모델 중 p50 이 가장 빠른 모델부터 시도
+    - 기록이 min_samples 개 미만인 모델은 가끔(explore 비율) 먼저 시도해 기록을 쌓음
+    - 연속 오류가 breaker_errors 번이면 해당 모델 / 키를 cooldown 초 동안 제외 (회로 차단기)
+    - 한도 초과(429)는 품질 문제가 아니므로 기록하지 않음 (RateScheduler 가 처리)
+    """
+    def __init__(self, log_callback, models, stats_path='model_stats.json', quality_floor=0.9, min_samples=5,
+                 breaker_errors=3, cooldown=120, explore=0.05):
+        self.log_callback = log_callback
+        self.models = list(models)
+        self.stats_path = stats_path
+        self.quality_floor = quality_floor
+        self.min_samples = min_samples
+        self.breaker_errors = max(1, breaker_errors)
+        self.cooldown = cooldown
+        self.explore = explore
+
+        self.stats = {}          # context -> model -> {'lat': [초, ...], 'out': ['o' 성공 / 'e' 오류 / 'p' 해석 실패, ...]}
+        self.failures = {}       # 차단 대상('model' 이름 또는 ('key', 번호)) -> 연속 오류 수
+        self.open_until = {}     # 차단 대상 -> 제외 해제 시각
+        self._lock = threading.Lock()
+        self._load_stats()
+
+    # ==========================
+    # 기록 저장/불러오기
+    # ==========================
+    def _load_stats(self):
+        if not os.path.exists(self.stats_path): return
+        try:
+            with open(self.stats_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.stats = {
+                context: {model: {'lat': [float(v) for v in s.get('lat', [])][-_MAX_SAMPLES:],
+                                  'out': [str(v) for v in s.get('out', [])][-_MAX_SAMPLES:]}
+                          for model, s in models.items()}
+                for context, models in data.items()
+            }
+        except Exception:
+            self.stats = {}
+
+    def save(self):
+        with self._lock:
+            data = json.dumps(self.stats, ensure_ascii=False)
+        try:
+            with open(self.stats_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+        except Exception as e:
+            self.log_callback(f"⚠️ [AI] 모델 기록 저장 실패: {e}")
+
+    def _entry(self, context, model):
+        return self.stats.setdefault(context or '-', {}).setdefault(model, {'lat': [], 'out': []})
+
+    def _add(self, context, model, outcome, latency=None):
+        entry = self._entry(context, model)
+        entry['out'].append(outcome)
+        del entry['out'][:-_MAX_SAMPLES]
+        if latency is not None:
+            entry['lat'].append(round(latency, 3))
+            del entry['lat'][:-_MAX_SAMPLES]
+
+    # ==========================
+    # 결과 기록
+    # ==========================
+    def record_success(self, context, model, key_idx, latency):
+        with self._lock:
+            self._add(context, model, 'o', latency)
+            self.failures.pop(model, None)
+            self.failures.pop(('key', key_idx), None)
+
+    def _count_failure(self, target):
+        """연속 오류 수 증가 -> 기준에 도달해 제외했으면 True"""
+        self.failures[target] = self.failures.get(target, 0) + 1
+        if self.failures[target] < self.breaker_errors: return False
+        self.open_until[target] = time.time() + self.cooldown
+        name = f"키 {target[1] + 1}" if isinstance(target, tuple) else target
+        self.log_callback(f"🔌 [AI] {name} 연속 오류 {self.failures[target]}회 -> {int(self.cooldown)}초 동안 제외")
+        return True
+
+    def record_error(self, context, model, key_idx):
+        with self._lock:
+            self._add(context, model, 'e')
+            # 모델이 제외되면 이번 오류는 모델 탓으로 보고 키에는 세지 않음 (키 1개일 때 전체가 멈추지 않도록)
+            if not self._count_failure(model):
+                self._count_failure(('key', key_idx))
+
+    def record_parse_failure(self, context, model):
+        """응답은 받았지만 JSON 해석 실패 (성공으로 기록된 마지막 결과를 해석 실패로 바꿈)"""
+        with self._lock:
+            out = self._entry(context, model)['out']
+            if out and out[-1] == 'o': out[-1] = 'p'
+            else: self._add(context, model, 'p')
+
+    # ==========================
+    # 선택
+    # ==========================
+    def is_open(self, target):
+        """차단기가 열려 있어(제외 중) 사용할 수 없는지"""
+        return self.open_until.get(target, 0) > time.time()
+
+    def key_available(self, key_idx):
+        return not self.is_open(('key', key_idx))
+
+    def summary(self, context, model):
+        """(p50, p95, 성공률, 기록 수)"""
+        with self._lock:
+            entry = self.stats.get(context or '-', {}).get(model, {'lat': [], 'out': []})
+            lat, out = list(entry['lat']), list(entry['out'])
+        quality = out.count('o') / len(out) if out else None
+        return _percentile(lat, 0.5), _percentile(lat, 0.95), quality, len(out)
+
+    def order(self, context):
+        """이 작업에 시도할 모델 순서 (빠르고 품질 기준을 넘는 모델 -> 기록 부족 -> 기준 미달)"""
+        fast, unknown, poor, closed = [], [], [], []
+        for idx, model in enumerate(self.models):
+            p50, _, quality, count = self.summary(context, model)
+            if self.is_open(model): closed.append((idx, model))
+            elif count < self.min_samples: unknown.append((idx, model))
+            elif p50 is not None and quality >= self.quality_floor: fast.append((p50, model))
+            else: poor.append((-quality, model))
+        fast.sort(); poor.sort(); unknown.sort(); closed.sort()
+        ordered = [m for _, m in fast] + [m for _, m in unknown] + [m for _, m in poor]
+        if unknown and fast and random.random() < self.explore:
+            # 기록이 부족한 모델을 가끔 먼저 시도
+            ordered.remove(unknown[0][1])
+            ordered.insert(0, unknown[0][1])
+        # 제외 중인 모델은 모든 모델이 제외 중일 때만 사용
+        return ordered or [m for _, m in closed]
+
+    def report(self):
+        """작업별 모델 기록 요약 로그"""
+        with self._lock:
+            contexts = {context: list(models) for context, models in self.stats.items()}
+        for context, models in contexts.items():
+            parts = []
+            for model in models:
+                p50, p95, quality, count = self.summary(context, model)
+                if not count: continue
+                latency = f"p50 {p50:.1f}s / p95 {p95:.1f}s" if p50 is not None else "응답 없음"
+                parts.append(f"{model} {latency} / 성공 {quality:.0%} ({count}건)")
+            if parts: self.log_callback(f"📊 [AI Router] {context}: " + " | ".join(parts))
@@ -0,0 +1,137 @@
+import queue
+import threading
+
+
+class ProductPipeline:
+    """
+    브라우저(수집)와 분석(AI/KIPRIS/카테고리/저장)을 분리한 생산자-소비자 파이프라인
+    - 브라우저는 상세 페이지에서 추출한 item 만 submit() 하고 바로 다음 상품으로 이동
+    - 작업 스레드들이 대기열에서 item 을 꺼내 분석/저장 (여러 개가 쌓여 있으면 일괄 분석)
+    - 대기열이 가득 차거나, 저장 완료 + 분석 중인 개수가 목표에 도달하면 submit() 이 대기 (역압력)
+    - 목표 달성 여부는 작업 스레드의 실제 저장 결과로 판단
+    """
+    def __init__(self, processor, target, context, workers=2, queue_size=4):
+        self.processor = processor
+        self.log_callback = processor.log_callback
+        self.target = target
+        self.context = context  # {'shop': ..., 'keyword': ...} 결과 저장 시 함께 기록
+        self.workers = max(1, workers)
+        self.queue = queue.Queue(maxsize=max(1, queue_size))
+
+        self.succeeded = 0
+        self.in_flight = 0   # 대기열 + 분석 중인 item 수
+        self._closed = False
+        self._cond = threading.Condition()
+        self._threads = []
+
+    def _is_running(self):
+        return self.processor.is_running
+
+    def start(self):
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker_loop, name=f"pipeline-{i + 1}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    # ==========================
+    # 생산자 (브라우저 스레드)
+    # ==========================
+    def is_done(self):
+        return self.succeeded >= self.target
+
+    def submit(self, item):
+        """item 을 분석 대기열에 넣음 (들어가면 True, 목표 달성/중지로 필요 없으면 False)"""
+        with self._cond:
+            # 진행 중인 것만으로 목표를 채울 수 있으면 결과가 나올 때까지 대기
+            while self._is_running() and not self.is_done() and self.succeeded + self.in_flight >= self.target:
+                self._cond.wait(0.5)
+            if not self._is_running() or self.is_done(): return False
+            self.in_flight += 1
+
+        # 대기열이 가득 차면 빈 자리가 날 때까지 대기 (중지 요청은 0.5초마다 확인)
+        while self._is_running():
+            try:
+                self.queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        self._release(0)
+        return False
+
+    # ==========================
+    # 소비자 (작업 스레드)
+    # ==========================
+    def _release(self, saved_count, count=1):
+        with self._cond:
+            self.in_flight -= count
+            self.succeeded += saved_count
+            self._cond.notify_all()
+
+    def _next_batch(self):
+        """대기열에서 item 을 꺼냄 (첫 개는 대기, 이후는 이미 쌓여 있는 것만 일괄 분석 크기까지)"""
+        while True:
+            try:
+                batch = [self.queue.get(timeout=0.5)]
+                break
+            except queue.Empty:
+                if self._closed or not self._is_running(): return []
+        limit = self.processor.ai_batch_size if self.processor.analysis_mode == 'combined' else 1
+        while len(batch) < limit:
+            try: batch.append(self.queue.get_nowait())
+            except queue.Empty: break
+        return batch
+
+    def _worker_loop(self):
+        while True:
+            batch = self._next_batch()
+            if not batch: return
+            if not self._is_running() or self.is_done():
+                self._release(0, len(batch))  # 중지 또는 목표 달성 -> 남은 item 폐기
+                continue
+            self._process_batch(batch)
+
+    def _process_batch(self, batch):
+        proc = self.processor
+
+        analyzed = [(item, None, "") for item in batch]
+        try:
+            # 1. AI 분석 (2개 이상이면 일괄 분석, 해석 실패 항목은 개별 분석)
+            if len(batch) > 1:
+                results = proc.analyze_products_batch([(it['name'], proc._ai_detail(it)) for it in batch])
+            else:
+                results = [None]
+            for i, (item, info) in enumerate(zip(batch, results)):
+                if info is not None:
+                    analyzed[i] = (item, info, (info.get('categoryPath') or '').strip())
+                elif self._is_running():
+                    analyzed[i] = (item,) + proc._analyze_single(item['name'], proc._ai_detail(item))
+                proc._apply_structured(analyzed[i][1], item)
+
+            # 2. 상표권 일괄 조회 (결과는 캐시에 남아 아래 저장 단계에서 바로 사용됨)
+            brands = [info.get('brand', '') for _, info, _ in analyzed if info and info.get('is_valid', True)]
+            if brands: proc.check_trademarks(brands)
+        except Exception as e:
+            self.log_callback(f"   ⚠️ [Pipeline] 분석 중 오류: {e}")
+
+        # 3. 상표권 확인 / 카테고리 매칭 / 저장
+        for item, info, cat_hint in analyzed:
+            saved = False
+            if self._is_running() and not self.is_done():
+                self.log_callback(f"   🧠 [분석] '{item['name'][:15]}...'")
+                try:
+                    saved = proc._finish_product(info, cat_hint, item['url'], self.context)
+                except Exception as e:
+                    self.log_callback(f"   ⚠️ [Process Error] 분석 중 오류: {e}")
+            self._release(1 if saved else 0)
+            if saved:
+                self.log_callback(f"   ✅ 저장 완료 ({self.succeeded}/{self.target})")
+
+    # ==========================
+    # 종료
+    # ==========================
+    def close(self):
+        """더 이상 submit 하지 않음 -> 남은 item 처리 후 작업 스레드 종료 대기, 저장 개수 반환"""
+        self._closed = True
+        for t in self._threads:
+            t.join()
+        return self.succeeded
@@ -1,14 +1,25 @@
+import os
 import time
-import json
-import requests
-import xml.etree.ElementTree as ET
+import threading
+from typing import List
 import google.genai as genai 
 from selenium.common.exceptions import WebDriverException
-from selenium.webdriver.common.by import By # [필수] 본문 추출용 추가
 from tkinter import messagebox 
 
-from logic.excel_handler import ExcelHandler
+from config_manager import get_int, get_float, get_bool, get_list
+from logic.excel_handler import ExcelHandler, RESULT_SHEET
+from logic.seen_urls import SeenUrlIndex
+from logic.trademark_cache import TrademarkCache, normalize_brand
+from logic.kipris_client import KiprisClient
+from logic.ai_cache import AIResponseCache
 from logic.browser_manager import BrowserManager
+from logic.pipeline import ProductPipeline
+from logic.job_scheduler import JobScheduler
+from logic.list_prefilter import ListPrefilter
+from logic.rate_scheduler import RateScheduler, parse_limits
+from logic.model_router import ModelRouter
+from logic.json_repair import repair_json
+from logic.ai_schemas import ProductInfo, ProductAnalysis, BatchProductAnalysis, CategoryResult, to_typed
 
 class SourcingProcessor:
     def __init__(self, config, log_callback):
@@ -16,33 +27,102 @@ class SourcingProcessor:
         self.log_callback = log_callback
         self.is_running = True
         
-        # KIPRIS 상표권 캐시
-        self.brand_cache = {}
+        # KIPRIS 상표권 캐시 (실행/키워드/쇼핑몰 간 공유되는 영구 캐시)
+        self.trademark_cache = TrademarkCache(
+            'kipris_cache.db',
+            found_ttl_days=get_float(self.config, 'KIPRIS_CACHE_FOUND_DAYS', 90),
+            clear_ttl_days=get_float(self.config, 'KIPRIS_CACHE_CLEAR_DAYS', 14)
+        )
+
+        # 현재 작업 중인 쇼핑몰/키워드 (결과 저장 시 함께 기록)
+        self.current_shop = ''
+        self.current_keyword = ''
         
         # 1. 엑셀 핸들러
         excel_file = self.config.get('EXCEL_FILE', 'windly-excel-bulk-upload-ver9.xlsx')
+        self.excel_file = excel_file
         self.excel = ExcelHandler(excel_file, log_callback, config)
+
+        # 1-1. 이미 수집한 상품 URL 색인 (재실행 시 중복 수집 방지)
+        self.seen_urls = SeenUrlIndex(os.path.splitext(excel_file)[0] + '_seen_urls.txt', log_callback)
+        self.seen_urls.sync_workbook(excel_file, RESULT_SHEET)
+        if self.excel.store is not None:
+            self.seen_urls.update(r['url'] for r in self.excel.store.query() if r['url'])
         
-        # 2. 브라우저 매니저
-        self.browser = BrowserManager(log_callback)
+        # 1-2. 목록 단계 사전 필터 (금지 브랜드 / 상표권 캐시 -> 상세 페이지를 열기 전에 제외)
+        self.prefilter = None
+        if get_bool(self.config, 'LIST_PREFILTER', True):
+            self.prefilter = ListPrefilter(self.trademark_cache, deny_brands=get_list(self.config, 'BRAND_DENY_LIST'))
+        
+        # 2. 브라우저 매니저 (BROWSER_WORKERS > 1 이면 작업자마다 브라우저를 따로 띄워 쇼핑몰/키워드 작업을 나눠 수행)
+        self.browser_workers = max(1, get_int(self.config, 'BROWSER_WORKERS', 1))
+        self.browser = self._create_browser(0)
 
         # 3. AI 설정
         raw_keys = self.config['GEMINI_API_KEY']
         self.api_keys = [k.strip() for k in raw_keys.split(',') if k.strip()]
         self.current_key_idx = 0
         
-        # 4. KIPRIS 키 설정
+        # 4. KIPRIS 키 설정 (연결 재사용 + 동시 조회 클라이언트)
         raw_kipris = self.config['KIPRIS_API_KEY']
         self.kipris_keys = [k.strip() for k in raw_kipris.split(',') if k.strip()]
-        self.current_kipris_idx = 0
+        self.kipris = KiprisClient(
+            self.kipris_keys, log_callback,
+            max_workers=get_int(self.config, 'KIPRIS_WORKERS', 4),
+            per_key_limit=get_int(self.config, 'KIPRIS_PER_KEY_LIMIT', 2)
+        )
+        # 조회 실패한 브랜드 -> 실패 시각 (캐시하지 않으므로, 잠시 동안은 다시 조회하지 않고 통과 처리)
+        self._kipris_failed = {}
+        self.kipris_failed_ttl = 300
         
-        # 모델 후보군
-        self.model_candidates = [
+        # 모델 후보군 (AI_MODELS 로 변경 가능, 모델 선택기 사용 시 작업별로 빠른 모델부터 시도)
+        self.model_candidates = get_list(self.config, 'AI_MODELS', [
             "gemini-2.5-flash-lite",
             "gemini-2.5-flash"      
-        ]
+        ])
         self.current_model_idx = 0
         self.client = None
+        self._ai_lock = threading.RLock()  # 분석 작업 스레드 간 키/모델 교체 보호
+
+        # Gemini 키 풀 스케줄러: (키, 모델)별 RPM/TPM/RPD 한도 안에서 여유가 가장 많은 키에 배정 (0 이면 기존 오류 후 교체 방식)
+        self.rate_scheduler = None
+        self._clients = {}  # 키 번호 -> genai.Client
+        if get_bool(self.config, 'AI_RATE_LIMITER', True) and self.api_keys:
+            self.rate_scheduler = RateScheduler(
+                log_callback, len(self.api_keys), self.model_candidates,
+                limits=parse_limits(get_list(self.config, 'AI_RATE_LIMITS')),
+                max_wait=get_float(self.config, 'AI_QUEUE_MAX_WAIT', 300)
+            )
+
+        # 작업별 모델 선택기: 응답 시간/오류율/해석 실패율 기록 -> 품질 기준을 넘는 가장 빠른 모델 우선 (키 풀 스케줄러 사용 시)
+        self.model_router = None
+        self._ai_local = threading.local()  # 스레드별 마지막 응답의 (작업, 모델) - 해석 실패 기록용
+        if self.rate_scheduler is not None and get_bool(self.config, 'AI_MODEL_ROUTER', True):
+            self.model_router = ModelRouter(
+                log_callback, self.model_candidates,
+                quality_floor=get_float(self.config, 'AI_QUALITY_FLOOR', 0.9),
+                breaker_errors=get_int(self.config, 'AI_BREAKER_ERRORS', 3),
+                cooldown=get_float(self.config, 'AI_BREAKER_COOLDOWN', 120)
+            )
+
+        # 수집-분석 파이프라인: 분석 작업 스레드 수 (0 이면 기존 순차 처리) / 대기열 크기
+        self.pipeline_workers = get_int(self.config, 'PIPELINE_WORKERS', 2)
+        self.pipeline_queue_size = get_int(self.config, 'PIPELINE_QUEUE_SIZE', 4)
+
+        # 분석 방식: combined(정보추출+카테고리 1회 호출) / separate(기존 2회 호출)
+        self.analysis_mode = str(self.config.get('ANALYSIS_MODE', 'combined')).strip().lower()
+
+        # 일괄 분석: 한 번에 보낼 상품 수 / 상품당 상세 텍스트 길이
+        self.ai_batch_size = max(1, get_int(self.config, 'AI_BATCH_SIZE', 10))
+        self.ai_batch_detail_chars = get_int(self.config, 'AI_BATCH_DETAIL_CHARS', 1200)
+
+        # 구조화 출력: 정보추출/분석/카테고리 응답을 스키마(JSON)로 받음 (거부되면 자동으로 일반 응답 + JSON 복구)
+        self.structured_output = get_bool(self.config, 'AI_STRUCTURED_OUTPUT', True)
+
+        # AI 응답 캐시 (같은 프롬프트는 API 호출 없이 재사용)
+        self.ai_cache = None
+        if get_bool(self.config, 'AI_CACHE_ENABLED', True):
+            self.ai_cache = AIResponseCache('ai_cache.db', max_entries=get_int(self.config, 'AI_CACHE_MAX_ENTRIES', 5000))
 
         try:
             self._configure_genai()
@@ -78,49 +158,85 @@ class SourcingProcessor:
             self.log_callback(f"❌ [AI] 설정 오류: {e}")
             self.client = None
 
-    def _rotate_api_key(self):
-        self.current_key_idx, success = self._rotate_index(self.api_keys, self.current_key_idx, "AI")
-        if success: self._configure_genai()
-        return success
+    def _rotate_api_key(self, failed_key_idx=None):
+        with self._ai_lock:
+            # 다른 작업 스레드가 이미 교체했다면 다시 교체하지 않음
+            if failed_key_idx is not None and failed_key_idx != self.current_key_idx: return True
+            self.current_key_idx, success = self._rotate_index(self.api_keys, self.current_key_idx, "AI")
+            if success: self._configure_genai()
+            return success
     
-    def _switch_model(self):
+    def _switch_model(self, failed_model_idx=None):
         if len(self.model_candidates) <= 1: return False
-        self.current_model_idx = (self.current_model_idx + 1) % len(self.model_candidates)
-        new_model_name = self.model_candidates[self.current_model_idx]
-        self.log_callback(f"⚠️ [AI] 모델 한도 초과 예상 -> '{new_model_name}'(으)로 타겟 변경")
-        return True
+        with self._ai_lock:
+            if failed_model_idx is not None and failed_model_idx != self.current_model_idx: return True
+            self.current_model_idx = (self.current_model_idx + 1) % len(self.model_candidates)
+            new_model_name = self.model_candidates[self.current_model_idx]
+            self.log_callback(f"⚠️ [AI] 모델 한도 초과 예상 -> '{new_model_name}'(으)로 타겟 변경")
+            return True
+
+    def _generation_config(self, schema):
+        """구조화 출력 설정: 스키마가 있으면 응답을 해당 형식의 JSON 으로 강제 (없거나 꺼져 있으면 None)"""
+        if schema is None or not self.structured_output: return None
+        return {'response_mime_type': 'application/json', 'response_schema': schema}
+
+    def _disable_structured_output(self, error_msg):
+        """스키마 설정이 거부되면 이번 실행은 일반 텍스트 응답 + JSON 복구로 처리"""
+        if self.structured_output and 'schema' in error_msg:
+            self.structured_output = False
+            self.log_callback("⚠️ [AI] 구조화 출력(response_schema) 사용 불가 -> 일반 응답 + JSON 복구로 전환")
+
+    def _call_gemini_with_retry(self, prompt, context="", schema=None):
+        """
+        AI 호출 (캐시 -> 키 풀 스케줄러 또는 기존 오류 후 교체 방식)
+        - schema: 결과 형식(pydantic 모델), 주어지면 구조화 출력(JSON) 요청
+        """
+        self._ai_local.last = None
+        # 같은 프롬프트의 이전 응답이 있으면 API 호출 없이 반환
+        if self.ai_cache is not None:
+            cached = self.ai_cache.get(prompt, self.model_candidates, context)
+            if cached is not None: return cached
+        if self.rate_scheduler is not None:
+            return self._call_gemini_scheduled(prompt, context, schema)
 
-    def _call_gemini_with_retry(self, prompt, context=""):
         total_combinations = len(self.api_keys) * len(self.model_candidates)
         if total_combinations == 0: total_combinations = 1
         attempt_count = 0 
 
         while attempt_count < total_combinations:
+            key_idx, model_idx = self.current_key_idx, self.current_model_idx
             try:
-                if not self.client: self._configure_genai()
-                if not self.client: raise Exception("AI Client 객체 생성 실패")
-
-                current_model = self.model_candidates[self.current_model_idx]
-                response = self.client.models.generate_content(
-                    model=current_model, contents=prompt
+                with self._ai_lock:
+                    if not self.client: self._configure_genai()
+                    client = self.client
+                    key_idx, model_idx = self.current_key_idx, self.current_model_idx
+                if not client: raise Exception("AI Client 객체 생성 실패")
+
+                current_model = self.model_candidates[model_idx]
+                response = client.models.generate_content(
+                    model=current_model, contents=prompt, config=self._generation_config(schema)
                 )
                 if response and response.text: 
-                    return response.text.replace('```json', '').replace('```', '').strip()
+                    text = response.text.replace('```json', '').replace('```', '').strip()
+                    if self.ai_cache is not None:
+                        self.ai_cache.put(current_model, prompt, context, text)
+                    return text
 
             except Exception as e:
                 error_msg = str(e).lower()
                 attempt_count += 1 
                 
-                if "429" in error_msg or "quota" in error_msg or "resource" in error_msg or "model" in error_msg:
+                if self._is_limit_error(error_msg):
                     self.log_callback(f"⏳ [AI] {context} 중 오류, AI API 키를 재설정합니다. ({attempt_count}/{total_combinations})...")
-                    key_rotated = self._rotate_api_key()
+                    key_rotated = self._rotate_api_key(key_idx)
                     if (self.current_key_idx == 0) or (not key_rotated):
                         self.log_callback(f"⚠️ [AI] ({context}) 키 소진. 모델 변경.")
-                        self._switch_model()
+                        self._switch_model(model_idx)
                     time.sleep(1)
                     continue
                 else:
                     self.log_callback(f"⚠️ [AI] {context} 실패: {error_msg}")
+                    self._disable_structured_output(error_msg)
                     time.sleep(1)
                     continue
 
@@ -129,58 +245,126 @@ class SourcingProcessor:
         messagebox.showerror("AI 한도 초과", f"'{context}' 작업 실패. 프로그램을 종료합니다.")
         return None
 
+    @staticmethod
+    def _is_limit_error(error_msg):
+        return "429" in error_msg or "quota" in error_msg or "resource" in error_msg or "model" in error_msg
+
+    def _client_for(self, key_idx):
+        """키별 Gemini 클라이언트 (처음 사용할 때 생성, 이후 재사용)"""
+        with self._ai_lock:
+            client = self._clients.get(key_idx)
+            if client is None:
+                client = genai.Client(api_key=self.api_keys[key_idx])
+                self._clients[key_idx] = client
+            return client
+
+    @staticmethod
+    def _usage_tokens(response):
+        try: return int(response.usage_metadata.total_token_count or 0)
+        except Exception: return 0
+
+    def _call_gemini_scheduled(self, prompt, context="", schema=None):
+        """
+        [키 풀 스케줄러] 요청 전에 (키, 모델) 한도를 확인해 배정 -> 모두 한도면 오류 없이 대기열에서 대기
+        - 그래도 서버 한도 오류가 나면 해당 (키, 모델)만 쉬게 하고 바로 다른 자리로 재배정
+        """
+        estimate = self.rate_scheduler.estimate_tokens(prompt)
+        max_attempts = len(self.api_keys) * len(self.model_candidates) + 1
+        attempt_count = 0
+        router = self.model_router
+        while self.is_running and attempt_count < max_attempts:
+            slot = self.rate_scheduler.acquire(
+                estimate, lambda: self.is_running,
+                models=router.order(context) if router is not None else None,
+                allow=(lambda s: router.key_available(s[0])) if router is not None else None
+            )
+            if slot is None: break
+            key_idx, model = slot
+            started = time.time()
+            try:
+                response = self._client_for(key_idx).models.generate_content(
+                    model=model, contents=prompt, config=self._generation_config(schema)
+                )
+                self.rate_scheduler.record_usage(slot, estimate, self._usage_tokens(response))
+                if response and response.text:
+                    if router is not None: router.record_success(context, model, key_idx, time.time() - started)
+                    self._ai_local.last = (context, model)
+                    text = response.text.replace('```json', '').replace('```', '').strip()
+                    if self.ai_cache is not None:
+                        self.ai_cache.put(model, prompt, context, text)
+                    return text
+                attempt_count += 1
+                if router is not None: router.record_error(context, model, key_idx)
+            except Exception as e:
+                error_msg = str(e).lower()
+                attempt_count += 1
+                if self._is_limit_error(error_msg):
+                    self.rate_scheduler.report_limited(slot, error_msg)
+                    self.log_callback(f"⏳ [AI] {context}: 키 {key_idx + 1} / {model} 한도 도달 -> 다른 키로 재배정 ({attempt_count}/{max_attempts})")
+                else:
+                    if router is not None: router.record_error(context, model, key_idx)
+                    self.log_callback(f"⚠️ [AI] {context} 실패: {error_msg}")
+                    self._disable_structured_output(error_msg)
+                    time.sleep(1)
+
+        if not self.is_running: return None
+        self.log_callback(f"❌ [Critical] '{context}' 작업 중 모든 수단 실패.")
+        self.stop()
+        messagebox.showerror("AI 한도 초과", f"'{context}' 작업 실패. 프로그램을 종료합니다.")
+        return None
+
+    def _report_parse_failure(self):
+        """이 스레드의 마지막 AI 응답을 해석 실패로 기록 (모델 선택기 품질 기준에 반영)"""
+        last = getattr(self._ai_local, 'last', None)
+        if last and self.model_router is not None: self.model_router.record_parse_failure(*last)
+
     # ==========================
     # KIPRIS 관련 로직
     # ==========================
     def _rotate_kipris_key(self):
-        self.current_kipris_idx, success = self._rotate_index(self.kipris_keys, self.current_kipris_idx, "KIPRIS")
-        return success
-
-    def check_trademark(self, brand):
-        if not brand or str(brand).upper() in ["NULL", "NONE", "N/A"]: return True
-        brand_key = str(brand).strip().upper()
+        return self.kipris.rotate_key()
 
-        if brand_key in self.brand_cache: return self.brand_cache[brand_key]
-        if not self.kipris_keys: return True 
+    @staticmethod
+    def _is_empty_brand(brand):
+        return not brand or str(brand).upper() in ["NULL", "NONE", "N/A"]
 
-        api_url = "https://plus.kipris.or.kr/kipo-api/kipi/trademarkInfoSearchService/getWordSearch"
-        max_retries = max(1, len(self.kipris_keys))
-        
-        for attempt in range(max_retries):
-            current_key = self.kipris_keys[self.current_kipris_idx]
-            params = {'searchString': brand, 'ServiceKey': current_key}
-            
-            try:
-                res = requests.get(api_url, params=params, timeout=5)
-                if res.status_code != 200:
-                    self.log_callback(f"⚠️ [KIPRIS] 서버 오류({res.status_code}). 키 교체...")
-                    if self._rotate_kipris_key(): continue
-                    return True 
-                
-                root = ET.fromstring(res.content)
-                error_info = root.find(".//errMsg")
-                if error_info is not None and error_info.text:
-                    self.log_callback(f"⚠️ [KIPRIS] API 에러. 키 교체...")
-                    if self._rotate_kipris_key(): continue
-                    return True
-
-                count_tag = root.find(".//totalCount")
-                if count_tag is None: return True
-                
-                count = int(count_tag.text)
-                if count > 0:
-                    self.log_callback(f"   ❌ [KIPRIS] 상표권 발견! '{brand}' ({count}건)")
-                    self.brand_cache[brand_key] = False
-                    return False
-                
-                self.brand_cache[brand_key] = True
-                return True
+    def check_trademarks(self, brands):
+        """
+        여러 브랜드 상표권 일괄 확인 -> {brand: 사용 가능 여부}
+        - 캐시에 있는 브랜드는 바로 반환, 나머지는 중복 제거 후 동시에 조회
+        - 최근 조회에 실패한 브랜드는 kipris_failed_ttl 초 동안 다시 조회하지 않고 통과 처리
+          (일괄 확인 후 상품별 확인에서 같은 실패를 또 겪지 않도록)
+        """
+        results, pending = {}, []
+        now = time.time()
+        for brand in brands:
+            if self._is_empty_brand(brand):
+                results[brand] = True
+                continue
+            cached = self.trademark_cache.get(brand)
+            if cached is not None: results[brand] = cached
+            elif now - self._kipris_failed.get(normalize_brand(brand), 0) < self.kipris_failed_ttl: results[brand] = True
+            else: pending.append(brand)
+
+        if not pending: return results
+        if not self.kipris_keys:
+            results.update((brand, True) for brand in pending)
+            return results
+
+        for brand, (allowed, count) in self.kipris.lookup_many(pending).items():
+            results[brand] = allowed
+            if count is None:
+                # 조회 실패는 캐시하지 않음 (이번 실행에서만 잠시 기억)
+                self._kipris_failed[normalize_brand(brand)] = time.time()
+                continue
+            self._kipris_failed.pop(normalize_brand(brand), None)
+            if not allowed:
+                self.log_callback(f"   ❌ [KIPRIS] 상표권 발견! '{brand}' ({count}건)")
+            self.trademark_cache.put(brand, allowed, count)
+        return results
 
-            except Exception as e:
-                self.log_callback(f"⚠️ [KIPRIS] 조회 실패. 재시도...")
-                if self._rotate_kipris_key(): continue
-                return True
-        return True
+    def check_trademark(self, brand):
+        return self.check_trademarks([brand]).get(brand, True)
 
     # ==========================
     # 분석 및 데이터 처리 로직
@@ -193,14 +377,32 @@ class SourcingProcessor:
             f"Input: {product_title}\n"
             f"Output:"
         )
-        path_hint = self._call_gemini_with_retry(prompt, "개별 카테고리 분석")
+        path_hint = self._call_gemini_with_retry(prompt, "개별 카테고리 분석", CategoryResult)
         if path_hint:
+            typed = to_typed(repair_json(path_hint), CategoryResult)
+            if typed and typed['categoryPath'].strip(): return typed['categoryPath'].strip()
+            # 구조화 출력 이전에 캐시된 일반 텍스트 응답
             lines = path_hint.split('\n')
             for line in lines:
                 if '>' in line: return line.strip()
             return lines[0].strip()
         return ""
     
+    def _parse_json_response(self, res, prompt, schema=ProductInfo, required=('productTitle',)):
+        """
+        AI 응답 -> 형식 검증된 dict (실패 시 None, 깨진 응답은 캐시에서 삭제)
+        - 앞뒤에 설명이 붙거나 잘린 JSON 도 복구해서 사용, 누락 항목은 빈 값
+        - 유효 상품인데 required 항목(제목 등)이 비어 있으면 해석 실패
+        """
+        if not res: return None
+        data = to_typed(repair_json(res), schema)
+        if not self._is_complete_info(data, required):
+            data = None
+            # 깨진 응답이 캐시에서 계속 재사용되지 않도록 삭제
+            if self.ai_cache is not None: self.ai_cache.discard(prompt, self.model_candidates)
+            self._report_parse_failure()
+        return data
+
     def extract_full_info(self, p_name, detail_text=""):
         prompt = (
             f"Role: Product Data Extractor\n"
@@ -209,17 +411,99 @@ class SourcingProcessor:
             f"Task: Extract detailed info using BOTH Title and Context. Then translate Title to Korean.\n"
             f"Output JSON: {{ \"is_valid\": true, \"productTitle\": \"...\", \"manufacturer\": \"...\", \"brand\": \"...\", \"model\": \"...\", \"keywords\": [] }}"
         )
-        res = self._call_gemini_with_retry(prompt, "정보추출")
-        if res:
-            try:
-                clean_json = res.replace('```json', '').replace('```', '').strip()
-                if not clean_json.startswith('{'):
-                    start = clean_json.find('{'); end = clean_json.rfind('}') + 1
-                    if start != -1 and end != -1: clean_json = clean_json[start:end]
-                data = json.loads(clean_json)
-                return data
-            except: return None
-        return None
+        res = self._call_gemini_with_retry(prompt, "정보추출", ProductInfo)
+        return self._parse_json_response(res, prompt, ProductInfo)
+
+    def analyze_product(self, p_name, detail_text=""):
+        """
+        [단일 호출 분석] 정보추출 + 카테고리 분류를 한 번의 AI 호출로 수행
+        - 응답을 해석할 수 없으면 None (호출 측에서 기존 2회 호출 방식으로 대체)
+        """
+        prompt = (
+            f"Role: Product Data Extractor & E-commerce Category Classifier\n"
+            f"Input Title: '{p_name}'\n"
+            f"Input Detail Context (Truncated): '{detail_text[:2000]}'\n\n"
+            f"Task:\n"
+            f"1. Extract detailed info using BOTH Title and Context. Then translate Title to Korean.\n"
+            f"2. Classify the product into a Korean e-commerce category path (Coupang/Naver style), "
+            f"format: BigCategory > MiddleCategory > SmallCategory (in Korean).\n"
+            f"Output JSON: {{ \"is_valid\": true, \"productTitle\": \"...\", \"manufacturer\": \"...\", \"brand\": \"...\", "
+            f"\"model\": \"...\", \"keywords\": [], \"categoryPath\": \"... > ... > ...\" }}"
+        )
+        res = self._call_gemini_with_retry(prompt, "통합분석", ProductAnalysis)
+        # 필수 항목(제목/카테고리 경로) 누락 -> 해석 실패로 간주 (호출 측에서 기존 방식으로 대체)
+        return self._parse_json_response(res, prompt, ProductAnalysis, ('productTitle', 'categoryPath'))
+
+    @staticmethod
+    def _is_complete_info(data, required=('productTitle',)):
+        """AI 결과로 쓸 수 있는지 (유효 상품이면 required 항목이 비어 있지 않아야 함)"""
+        if not isinstance(data, dict): return False
+        if not data.get('is_valid', True): return True
+        return all(isinstance(data.get(field), str) and data[field].strip() for field in required)
+
+    @classmethod
+    def _is_complete_analysis(cls, data):
+        """통합 분석 결과로 쓸 수 있는지 (유효 상품이면 제목/카테고리 경로 필수)"""
+        return cls._is_complete_info(data, ('productTitle', 'categoryPath'))
+
+    def analyze_products_batch(self, items):
+        """
+        [일괄 분석] 여러 상품을 한 번의 AI 호출로 분석 (AI_BATCH_SIZE 개씩 묶어서 전송)
+        - items: [(상품명, 상세 텍스트), ...]
+        - 결과는 id 로 원래 순서에 맞춰 돌려주고, 해석에 실패한 항목만 1회 재전송
+        - 반환: items 와 같은 길이의 리스트 (끝내 실패한 항목은 None -> 호출 측에서 개별 분석)
+        """
+        results = [None] * len(items)
+        pending = list(range(len(items)))
+        for attempt in range(2):
+            if not pending or not self.is_running: break
+            for start in range(0, len(pending), self.ai_batch_size):
+                chunk = pending[start:start + self.ai_batch_size]
+                answers = self._request_batch_analysis([(i, items[i]) for i in chunk])
+                for i, data in answers.items():
+                    results[i] = data
+            pending = [i for i in pending if results[i] is None]
+            if pending and attempt == 0 and self.is_running:
+                self.log_callback(f"   ↩️ [AI] 일괄 분석 중 {len(pending)}개 해석 실패 -> 해당 상품만 재전송")
+        return results
+
+    def _request_batch_analysis(self, indexed_items):
+        """[(id, (상품명, 상세 텍스트)), ...] -> {id: 분석 결과} (해석된 항목만)"""
+        blocks = []
+        for item_id, (p_name, detail_text) in indexed_items:
+            blocks.append(
+                f"[id={item_id}]\n"
+                f"Input Title: '{p_name}'\n"
+                f"Input Detail Context (Truncated): '{(detail_text or '')[:self.ai_batch_detail_chars]}'"
+            )
+        prompt = (
+            f"Role: Product Data Extractor & E-commerce Category Classifier\n"
+            f"Products ({len(indexed_items)}):\n\n" + "\n\n".join(blocks) + "\n\n"
+            f"Task: For EACH product above:\n"
+            f"1. Extract detailed info using BOTH Title and Context. Then translate Title to Korean.\n"
+            f"2. Classify the product into a Korean e-commerce category path (Coupang/Naver style), "
+            f"format: BigCategory > MiddleCategory > SmallCategory (in Korean).\n"
+            f"Output JSON array with exactly one object per product, keeping its id: "
+            f"[ {{ \"id\": 0, \"is_valid\": true, \"productTitle\": \"...\", \"manufacturer\": \"...\", \"brand\": \"...\", "
+            f"\"model\": \"...\", \"keywords\": [], \"categoryPath\": \"... > ... > ...\" }} ]"
+        )
+        res = self._call_gemini_with_retry(prompt, "일괄분석", List[BatchProductAnalysis])
+        if not res: return {}
+
+        # 응답이 중간에 잘려도 완성된 상품 결과는 살려서 사용 (나머지만 재전송)
+        answers = {}
+        requested = {item_id for item_id, _ in indexed_items}
+        for entry in repair_json(res, list) or []:
+            entry = to_typed(entry, BatchProductAnalysis)
+            if entry is None: continue
+            item_id = entry['id']
+            if item_id in requested and self._is_complete_analysis(entry):
+                answers[item_id] = entry
+
+        if len(answers) < len(requested):
+            if self.ai_cache is not None: self.ai_cache.discard(prompt, self.model_candidates)
+            self._report_parse_failure()
+        return answers
 
     def detect_and_translate(self, url, keyword):
         try:
@@ -244,100 +528,233 @@ class SourcingProcessor:
     # ==========================
     # [NEW] 상세 페이지 처리 콜백
     # ==========================
-    def _process_product_callback(self, driver, product_name):
+    def _process_product_callback(self, item, context=None):
         """
-        BrowserManager가 상세 페이지에 진입했을 때 호출되는 콜백 함수
-        여기서 텍스트 추출 -> AI 분석 -> KIPRIS -> 엑셀 저장을 수행함
+        [순차 처리] BrowserManager가 상세 페이지에서 추출한 item 을 바로 분석/저장
+        item: {'name': 상품명, 'url': 상세 URL, 'detail_text': 본문 텍스트}
+        (PIPELINE_WORKERS > 0 이면 이 콜백 대신 ProductPipeline.submit 사용)
         """
         try:
-            # 1. 상세 페이지 본문 텍스트 추출
-            try:
-                # body 태그의 텍스트를 가져옴 (최대 3000자)
-                detail_text = driver.find_element(By.TAG_NAME, "body").text[:3000]
-            except:
-                detail_text = ""
-
-            # 2. AI 정보 추출
-            info = self.extract_full_info(product_name, detail_text)
-            
-            if info is None or not info.get('is_valid', True):
-                self.log_callback(f"   🗑️ [Skip] 유효하지 않은 상품")
-                return False
+            # 2. AI 정보 추출 (페이지 구조화 데이터로 찾은 브랜드/제조사/모델은 그대로 사용)
+            info, cat_hint = self._analyze_single(item['name'], self._ai_detail(item))
+            self._apply_structured(info, item)
 
-            # 3. KIPRIS 상표권 확인
-            if not self.check_trademark(info.get('brand', '')):
-                return False # 상표권 이슈로 저장 안 함
-
-            # 4. 카테고리 분석
-            cat_hint = self.analyze_category_with_ai(info['productTitle'])
-            
-            # 5. 엑셀 매칭 및 저장
-            best_cp = self.excel.find_best_category(cat_hint, 'coupang')
-            best_nv = self.excel.find_best_category(cat_hint, 'naver')
-            
-            self.log_callback(f"     ㄴ 카테고리: {best_cp.split('>')[-1]} / {best_nv.split('>')[-1]}")
-
-            self.excel.save_product({
-                'cp_cat': best_cp, 
-                'nv_cat': best_nv,
-                'title': info['productTitle'], 
-                'tags': info['keywords'],
-                'url': driver.current_url, # 현재 상세페이지 URL
-                'manufacturer': info.get('manufacturer', ''),
-                'brand': info.get('brand', ''), 
-                'model': info.get('model', '')
-            })
-            
-            return True # 저장 성공
+            # 3~5. 상표권 확인 / 카테고리 매칭 / 저장
+            return self._finish_product(info, cat_hint, item['url'], context)
 
         except Exception as e:
             self.log_callback(f"   ⚠️ [Process Error] 분석 중 오류: {e}")
             return False
 
+    @staticmethod
+    def _ai_detail(item):
+        """
+        AI 에 보낼 상세 텍스트: 페이지 구조화 데이터(JSON-LD/microdata)로 찾은 항목을 앞에 붙임
+        - 브랜드/모델을 모두 알면 상세 본문은 보내지 않음 (번역/키워드/카테고리만 요청)
+        """
+        known = item.get('structured') or {}
+        fields = {k: known[k] for k in ('brand', 'manufacturer', 'model') if known.get(k)}
+        if not fields: return item['detail_text']
+        header = "Known fields (from page structured data, use as-is): " + "; ".join(f"{k}={v}" for k, v in fields.items())
+        if fields.get('brand') and fields.get('model'): return header
+        return f"{header}\n{item['detail_text']}"
+
+    @staticmethod
+    def _apply_structured(info, item):
+        """AI 결과의 브랜드/제조사/모델을 구조화 데이터(JSON-LD/microdata) 값으로 덮어씀 (페이지에 명시된 값이 AI 추정보다 정확)"""
+        if not isinstance(info, dict) or not info.get('is_valid', True): return info
+        known = item.get('structured') or {}
+        for field in ('brand', 'manufacturer', 'model'):
+            if known.get(field): info[field] = known[field]
+        return info
+
+    def _analyze_single(self, product_name, detail_text):
+        """상품 1개 AI 분석 -> (정보, 카테고리 힌트) (통합 모드: 카테고리까지 한 번에, 실패 시 기존 2회 호출 방식)"""
+        info, cat_hint = None, ""
+        if self.analysis_mode == 'combined':
+            info = self.analyze_product(product_name, detail_text)
+            if info is not None:
+                cat_hint = (info.get('categoryPath') or '').strip()
+            elif self.is_running:
+                self.log_callback(f"   ↩️ [AI] 통합 분석 응답 해석 실패 -> 개별 분석으로 재시도")
+        if info is None and self.is_running:
+            info = self.extract_full_info(product_name, detail_text)
+        return info, cat_hint
+
+    def _finish_product(self, info, cat_hint, detail_url, context=None):
+        """
+        AI 분석 결과 -> 상표권 확인 -> 카테고리 매칭 -> 저장 (저장 성공 여부 반환)
+        - context: {'shop': ..., 'keyword': ...} (없으면 현재 작업 중인 쇼핑몰/키워드)
+        """
+        if context is None:
+            context = {'shop': self.current_shop, 'keyword': self.current_keyword}
+        if info is None or not info.get('is_valid', True):
+            self.log_callback(f"   🗑️ [Skip] 유효하지 않은 상품")
+            return False
+
+        # 3. KIPRIS 상표권 확인
+        if not self.check_trademark(info.get('brand', '')):
+            return False # 상표권 이슈로 저장 안 함
+
+        # 4. 카테고리 분석 (통합 분석에서 받지 못한 경우만)
+        if not cat_hint:
+            cat_hint = self.analyze_category_with_ai(info['productTitle'])
+        
+        # 5. 엑셀 매칭 및 저장
+        best_cp = self.excel.find_best_category(cat_hint, 'coupang')
+        best_nv = self.excel.find_best_category(cat_hint, 'naver')
+        
+        self.log_callback(f"     ㄴ 카테고리: {best_cp.split('>')[-1]} / {best_nv.split('>')[-1]}")
+
+        self.excel.save_product({
+            'cp_cat': best_cp, 
+            'nv_cat': best_nv,
+            'title': info['productTitle'], 
+            'tags': info['keywords'],
+            'url': detail_url, # 상세페이지 URL
+            'manufacturer': info.get('manufacturer', ''),
+            'brand': info.get('brand', ''), 
+            'model': info.get('model', ''),
+            'shop': context['shop'],
+            'keyword': context['keyword']
+        })
+        self.seen_urls.add(detail_url)
+        
+        return True # 저장 성공
+
     def stop(self):
         self.is_running = False
         self.log_callback("🛑 [Stop] 중지 요청됨")
 
+    def _create_browser(self, worker_id):
+        """브라우저 작업자 생성 (두 번째부터는 첫 작업자의 식별자/로딩 기록과 HTTP 세션을 공유)"""
+        label = f"[W{worker_id + 1}]" if self.browser_workers > 1 else ''
+        return BrowserManager(self.log_callback, seen_urls=self.seen_urls, config=self.config, worker_id=worker_id,
+                              label=label, shared=self.browser if worker_id > 0 else None, prefilter=self.prefilter)
+
+    def _run_job(self, browser, shop_url, kw, max_count):
+        """(쇼핑몰, 키워드) 작업 1개: 번역 -> 수집 + 분석 + 저장 (브라우저 오류 시 해당 브라우저만 재시작)"""
+        log = browser.log_callback
+        context = {'shop': shop_url, 'keyword': kw}
+        log(f"\n 📍 [Keyword] 키워드 검색 시작: '{kw}'")
+
+        try:
+            # 1. 언어 감지 및 번역
+            t_kw = self.detect_and_translate(shop_url, kw)
+            if len(t_kw) > 50: t_kw = kw 
+
+            # 2. [통합 실행] 수집 + 분석 + 저장
+            if self.pipeline_workers > 0:
+                # 브라우저는 수집만, 분석/저장은 작업 스레드에서 (브라우저가 AI 응답을 기다리지 않음)
+                pipeline = ProductPipeline(self, max_count, context,
+                                           workers=self.pipeline_workers,
+                                           queue_size=self.pipeline_queue_size)
+                pipeline.start()
+                try:
+                    browser.search_and_collect(
+                        url=shop_url,
+                        keyword=t_kw,
+                        count=max_count,
+                        is_running_check=lambda: self.is_running,
+                        process_callback=pipeline.submit,
+                        done_check=pipeline.is_done
+                    )
+                finally:
+                    collected = pipeline.close()
+            else:
+                # process_callback에 우리가 만든 함수를 넘겨줍니다.
+                collected = browser.search_and_collect(
+                    url=shop_url, 
+                    keyword=t_kw, 
+                    count=max_count, 
+                    is_running_check=lambda: self.is_running,
+                    process_callback=lambda item: self._process_product_callback(item, context)  # <--- [핵심 연결]
+                )
+            
+            log(f"   🏁 '{kw}' 수집 종료 (총 {collected}개 저장됨)")
+            time.sleep(2)
+
+        except WebDriverException:
+            log("🚨 브라우저 오류. 재시작...")
+            # 여러 작업자 실행 중에는 다른 작업자의 크롬까지 종료하지 않음
+            browser.close(); browser.start_driver(kill_existing=self.browser_workers == 1)
+        except Exception as e:
+            log(f"⚠️ [Loop Error] {e}")
+
+    def _run_parallel(self, urls, keywords, max_count):
+        """여러 브라우저로 (쇼핑몰, 키워드) 작업을 동시에 수행 (같은 사이트는 한 번에 한 작업자만)"""
+        jobs = [(shop_url, kw) for shop_url in urls for kw in keywords]
+        site_count = len({self.browser.site_key(u) for u in urls})
+        # 같은 사이트는 동시에 처리하지 않으므로 사이트 수보다 많은 브라우저는 띄우지 않음
+        count = min(self.browser_workers, site_count)
+        browsers = [self.browser] + [self._create_browser(i) for i in range(1, count)]
+        self.log_callback(f"🧵 [Workers] 브라우저 {count}개로 작업 {len(jobs)}개 분배 (사이트 {site_count}곳)")
+
+        scheduler = JobScheduler(jobs, self.browser.site_key)
+        threads = []
+        try:
+            for browser in browsers:
+                t = threading.Thread(target=self._browser_worker, args=(browser, scheduler, max_count),
+                                     name=f"browser-{browser.worker_id + 1}", daemon=True)
+                t.start()
+                threads.append(t)
+            for t in threads: t.join()
+        finally:
+            for browser in browsers[1:]: browser.shutdown()
+
+    def _browser_worker(self, browser, scheduler, max_count):
+        """브라우저 작업자 스레드: 남은 작업을 하나씩 가져와 처리"""
+        if browser is not self.browser:
+            try:
+                browser.start_driver(kill_existing=False)
+            except Exception as e:
+                browser.log_callback(f"❌ [Workers] 브라우저 시작 실패 -> 이 작업자 제외: {e}")
+                return
+        while True:
+            job = scheduler.next_job(lambda: self.is_running)
+            if job is None: return
+            try:
+                browser.log_callback(f"\n\n🌐 [Shop] 쇼핑몰 이동 및 작업 시작: {job[0]}")
+                self._run_job(browser, job[0], job[1], max_count)
+            finally:
+                scheduler.done(job)
+
     def run(self):
         keywords = [k.strip() for k in self.config['TARGET_ITEMS'].split(",") if k.strip()]
         urls = [u.strip() for u in self.config['SHOP_URLS'].split(",") if u.strip()]
         max_count = int(self.config.get('ITEM_COUNT', 10))
+        run_started_at = time.time()
         
         self.browser.start_driver()
         try:
-            for shop_url in urls:
-                if not self.is_running: break
-                self.log_callback(f"\n\n🌐 [Shop] 쇼핑몰 이동 및 작업 시작: {shop_url}")
-                
-                for kw in keywords:
+            if self.browser_workers > 1 and len(urls) > 1:
+                self._run_parallel(urls, keywords, max_count)
+            else:
+                for shop_url in urls:
                     if not self.is_running: break
+                    self.log_callback(f"\n\n🌐 [Shop] 쇼핑몰 이동 및 작업 시작: {shop_url}")
                     
-                    self.brand_cache = {} 
-                    self.log_callback(f"\n 📍 [Keyword] 키워드 검색 시작: '{kw}'")
-
-                    try:
-                        # 1. 언어 감지 및 번역
-                        t_kw = self.detect_and_translate(shop_url, kw)
-                        if len(t_kw) > 50: t_kw = kw 
-
-                        # 2. [통합 실행] 수집 + 분석 + 저장
-                        # process_callback에 우리가 만든 함수를 넘겨줍니다.
-                        collected = self.browser.search_and_collect(
-                            url=shop_url, 
-                            keyword=t_kw, 
-                            count=max_count, 
-                            is_running_check=lambda: self.is_running,
-                            process_callback=self._process_product_callback  # <--- [핵심 연결]
-                        )
-                        
-                        self.log_callback(f"   🏁 '{kw}' 수집 종료 (총 {collected}개 저장됨)")
-                        time.sleep(2)
-
-                    except WebDriverException:
-                        self.log_callback("🚨 브라우저 오류. 재시작...")
-                        self.browser.close(); self.browser.start_driver()
-                    except Exception as e:
-                        self.log_callback(f"⚠️ [Loop Error] {e}")
+                    for kw in keywords:
+                        if not self.is_running: break
+                        self.current_shop, self.current_keyword = shop_url, kw
+                        self._run_job(self.browser, shop_url, kw, max_count)
         finally:
-            self.browser.close()
+            self.browser.shutdown()
+            # 스테이징 DB 사용 시 이번 작업분을 엑셀 양식으로 일괄 내보내기
+            if self.excel.store is not None:
+                try:
+                    self.excel.export_results(since=run_started_at,
+                                              shard_size=get_int(self.config, 'EXPORT_SHARD_SIZE', 0))
+                except Exception as e:
+                    self.log_callback(f"❌ [Export] 내보내기 실패: {e}")
+            self.excel.close()
+            self.seen_urls.stamp_workbook(self.excel_file)
+            self.trademark_cache.close()
+            self.kipris.close()
+            if self.model_router is not None:
+                self.model_router.report()
+                self.model_router.save()
+            if self.ai_cache is not None:
+                self.log_callback(f"📊 [AI Cache] 적중/요청: {self.ai_cache.summary() or '-'}")
+                self.ai_cache.close()
             self.log_callback("\n🏁 [Finish] 작업 종료")
\ No newline at end of file
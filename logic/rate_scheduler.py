@@ -0,0 +1,168 @@
+import re
+import time
+import threading
+
+# 모델별 기본 한도 (분당 요청 수 / 분당 토큰 수 / 일일 요청 수) - AI_RATE_LIMITS 로 덮어씀
+DEFAULT_LIMITS = {
+    'gemini-2.5-flash-lite': (15, 250000, 1000),
+    'gemini-2.5-flash': (10, 250000, 250),
+}
+FALLBACK_LIMITS = (10, 250000, 250)
+
+_RETRY_RE = re.compile(r"retry(?:[ _-]?delay|[ _-]?in|[ _-]?after)?\D{0,20}?(\d+(?:\.\d+)?)\s*s", re.I)
+
+
+def parse_limits(entries):
+    """['gemini-2.5-flash:10/250000/250', ...] -> {'gemini-2.5-flash': (10, 250000, 250)} (형식이 잘못된 항목은 무시)"""
+    limits = {}
+    for entry in entries:
+        model, _, values = entry.partition(':')
+        try:
+            rpm, tpm, rpd = (float(v) for v in values.split('/'))
+        except ValueError:
+            continue
+        limits[model.strip()] = (rpm, tpm, rpd)
+    return limits
+
+
+class TokenBucket:
+    """용량 capacity, 초당 rate 만큼 다시 차는 버킷 (호출 측에서 잠금)"""
+    def __init__(self, capacity, rate):
+        self.capacity = max(1.0, float(capacity))
+        self.rate = max(1e-9, float(rate))
+        self.tokens = self.capacity
+        self.updated = time.time()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """amount 만큼 쓸 수 있을 때까지 남은 시간(초), 지금 가능하면 0"""
+        self._refill(now)
+        amount = min(amount, self.capacity)  # 용량보다 큰 요청은 가득 찼을 때 허용
+        if self.tokens >= amount: return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount, now):
+        self._refill(now)
+        self.tokens -= min(amount, self.capacity)
+
+    def give_back(self, amount, now):
+        self._refill(now)
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+    def drain(self, now):
+        self._refill(now)
+        self.tokens = min(self.tokens, 0.0)
+
+    def headroom(self):
+        return max(0.0, self.tokens) / self.capacity
+
+
+class RateScheduler:
+    """
+    Gemini 키 풀 스케줄러 (토큰 버킷)
+    - (키, 모델)마다 분당 요청 수(RPM) / 분당 토큰 수(TPM) / 일일 요청 수(RPD) 버킷을 두고 요청 전에 미리 차감
+    - 모델은 우선순위 순으로, 같은 모델 안에서는 여유가 가장 많은 키에 배정
+    - 모든 (키, 모델)이 한도면 오류를 내며 재시도하지 않고, 자리가 날 때까지 대기 (여러 작업 스레드에서 동시 사용 가능)
+    - 서버가 한도 오류를 주면 해당 (키, 모델)을 비우고 안내된 시간(없으면 cooldown 초)만큼 쉬게 함
+    - 일일 한도는 실행 중 사용량만 반영 (이전 실행 사용량은 모름)
+    """
+    def __init__(self, log_callback, key_count, models, limits=None, max_wait=300, cooldown=30):
+        self.log_callback = log_callback
+        self.models = list(models)
+        self.max_wait = max_wait
+        self.cooldown = cooldown
+        limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self.buckets = {}     # (키 번호, 모델) -> {'rpm', 'tpm', 'rpd'}
+        self.blocked_until = {}
+        for key_idx in range(key_count):
+            for model in self.models:
+                rpm, tpm, rpd = limits.get(model, FALLBACK_LIMITS)
+                self.buckets[(key_idx, model)] = {
+                    'rpm': TokenBucket(rpm, rpm / 60.0),
+                    'tpm': TokenBucket(tpm, tpm / 60.0),
+                    'rpd': TokenBucket(rpd, rpd / 86400.0),
+                }
+        self._cond = threading.Condition()
+        self._waiting_logged = False
+
+    @staticmethod
+    def estimate_tokens(prompt, output_tokens=512):
+        """요청 토큰 추정 (문자 3개당 1토큰 + 예상 응답), 실제 사용량은 record_usage 로 보정"""
+        return len(prompt) // 3 + output_tokens
+
+    def _wait_for(self, slot, tokens, now):
+        buckets = self.buckets[slot]
+        wait = max(buckets['rpm'].wait_time(1, now), buckets['tpm'].wait_time(tokens, now),
+                   buckets['rpd'].wait_time(1, now))
+        return max(wait, self.blocked_until.get(slot, 0) - now)
+
+    def acquire(self, tokens, is_running=lambda: True, models=None, allow=None):
+        """
+        요청 1건 배정 -> (키 번호, 모델), 중지되었거나 max_wait 초 안에 자리가 나지 않으면 None
+        - models: 시도할 모델 우선순위 (없으면 생성 시 순서)
+        - allow(slot): False 인 (키, 모델)은 배정하지 않음 (예: 회로 차단기로 제외된 키)
+        - 배정과 동시에 한도를 차감하므로 여러 스레드가 같은 자리를 받지 않음
+        """
+        if not self.buckets: return None
+        models = [m for m in (models or self.models) if m in self.models] or self.models
+        with self._cond:
+            while is_running():
+                now = time.time()
+                shortest = None
+                for model in models:
+                    best, best_room = None, -1.0
+                    for slot in (s for s in self.buckets if s[1] == model):
+                        if allow is not None and not allow(slot):
+                            shortest = 1.0 if shortest is None else min(shortest, 1.0)
+                            continue
+                        wait = self._wait_for(slot, tokens, now)
+                        if wait > 0:
+                            shortest = wait if shortest is None else min(shortest, wait)
+                            continue
+                        buckets = self.buckets[slot]
+                        room = min(b.headroom() for b in buckets.values())
+                        if room > best_room: best, best_room = slot, room
+                    if best is not None:
+                        buckets = self.buckets[best]
+                        buckets['rpm'].take(1, now)
+                        buckets['tpm'].take(tokens, now)
+                        buckets['rpd'].take(1, now)
+                        self._waiting_logged = False
+                        return best
+
+                if shortest is None or shortest > self.max_wait:
+                    self.log_callback(f"⚠️ [AI] 모든 키/모델 한도 소진 (다음 여유까지 {int(shortest or 0)}초)")
+                    return None
+                if not self._waiting_logged:
+                    self._waiting_logged = True
+                    self.log_callback(f"⏳ [AI] 모든 키/모델 한도 도달 -> 대기열에서 대기 (약 {shortest:.0f}초)")
+                self._cond.wait(min(shortest, 1.0))
+            return None
+
+    def record_usage(self, slot, estimated, actual):
+        """응답의 실제 토큰 사용량으로 TPM 차감량 보정"""
+        if not actual or slot not in self.buckets: return
+        with self._cond:
+            bucket, now = self.buckets[slot]['tpm'], time.time()
+            if actual > estimated: bucket.take(actual - estimated, now)
+            else: bucket.give_back(estimated - actual, now)
+            self._cond.notify_all()
+
+    def report_limited(self, slot, error_msg):
+        """서버 한도 오류 -> 해당 (키, 모델)을 비우고 일정 시간 배정 중지"""
+        if slot not in self.buckets: return
+        with self._cond:
+            now = time.time()
+            buckets = self.buckets[slot]
+            if 'per day' in error_msg or 'perday' in error_msg or 'daily' in error_msg:
+                buckets['rpd'].drain(now)
+                until = now + buckets['rpd'].wait_time(1, now)
+            else:
+                buckets['rpm'].drain(now)
+                match = _RETRY_RE.search(error_msg)
+                until = now + (float(match.group(1)) if match else self.cooldown)
+            self.blocked_until[slot] = max(self.blocked_until.get(slot, 0), until)
+            self._cond.notify_all()
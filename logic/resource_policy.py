@@ -0,0 +1,86 @@
+def _extension_patterns(*extensions):
+    """확장자 -> 주소 끝 또는 쿼리스트링(?w=200 등) 바로 앞에서만 일치하는 패턴 ('/movies/', '.icon' 등은 제외)"""
+    return [pattern for ext in extensions for pattern in (f"*.{ext}", f"*.{ext}?*")]
+
+
+# 차단할 리소스 종류별 URL 패턴 (CDP Network.setBlockedURLs 와일드카드 형식)
+CATEGORY_PATTERNS = {
+    'images': _extension_patterns('jpg', 'jpeg', 'png', 'gif', 'webp', 'avif', 'bmp', 'ico'),
+    'media': _extension_patterns('mp4', 'webm', 'm3u8', 'mov', 'mp3'),
+    'fonts': _extension_patterns('woff', 'woff2', 'ttf', 'otf', 'eot'),
+    'trackers': [
+        "*doubleclick.net*", "*googlesyndication.com*", "*google-analytics.com*", "*googletagmanager.com*",
+        "*googleadservices.com*", "*facebook.net*", "*connect.facebook.com*", "*criteo.*", "*amazon-adsystem.com*",
+        "*adnxs.com*", "*scorecardresearch.com*", "*hotjar.com*", "*taboola.com*", "*outbrain.com*",
+    ],
+}
+DEFAULT_CATEGORIES = ['images', 'media', 'fonts', 'trackers']
+
+
+def parse_site_entries(entries):
+    """['taobao:images', 'ebay:*ebaystatic*'] -> {'taobao': ['images'], 'ebay': ['*ebaystatic*']}"""
+    result = {}
+    for entry in entries:
+        site, sep, value = entry.partition(':')
+        if not sep or not value.strip(): continue
+        result.setdefault(site.strip().lower(), []).append(value.strip())
+    return result
+
+
+class ResourcePolicy:
+    """
+    크롤링 중 불필요한 리소스(이미지/영상/폰트/광고·추적 스크립트) 차단 - CDP Network.setBlockedURLs
+    - 본문 텍스트만 읽으므로 로딩 시간/트래픽 절감
+    - 사이트별 허용(site_allow: 종류 또는 패턴) / 추가 차단(site_deny: 패턴) / 차단 끄기(disabled_sites)
+    - 차단 목록은 탭마다 적용되므로 새 탭을 열면 다시 apply() 해야 함
+    - 캡차/로그인 등 사용자가 직접 화면을 봐야 할 때는 suspend() 로 잠시 해제
+    """
+    def __init__(self, log_callback, enabled=True, categories=None, site_allow=None, site_deny=None, disabled_sites=None):
+        self.log_callback = log_callback
+        self.enabled = enabled
+        self.categories = [c for c in (categories or DEFAULT_CATEGORIES) if c in CATEGORY_PATTERNS]
+        self.site_allow = site_allow or {}
+        self.site_deny = site_deny or {}
+        self.disabled_sites = {s.lower() for s in (disabled_sites or [])}
+        self._applied = {}  # 탭 핸들 -> 적용된 사이트
+        self._suspended = False
+        self._logged_sites = set()
+
+    def patterns_for(self, site):
+        if not self.enabled or site in self.disabled_sites: return []
+        allow = set(self.site_allow.get(site, []))
+        patterns = []
+        for category in self.categories:
+            if category in allow: continue
+            patterns.extend(p for p in CATEGORY_PATTERNS[category] if p not in allow)
+        patterns.extend(self.site_deny.get(site, []))
+        return patterns
+
+    def apply(self, driver, site):
+        """현재 탭에 사이트 정책 적용 (이미 같은 정책이면 생략)"""
+        if not self.enabled or self._suspended or driver is None: return
+        try:
+            handle = driver.current_window_handle
+            if self._applied.get(handle) == site: return
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.patterns_for(site)})
+            if site not in self._logged_sites:
+                self._logged_sites.add(site)
+                self.log_callback(f"🧱 [Block] {site.upper()} 리소스 차단 적용 ({len(self.patterns_for(site))}개 패턴)")
+            self._applied[handle] = site
+        except Exception as e:
+            self.log_callback(f"⚠️ [Block] 리소스 차단 설정 실패: {e}")
+
+    def suspend(self, driver):
+        """현재 탭의 차단 해제 (캡차/로그인 화면 표시용), resume() 전까지 새로 적용하지 않음"""
+        if not self.enabled or driver is None: return
+        self._suspended = True
+        try:
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": []})
+            self._applied.pop(driver.current_window_handle, None)
+        except Exception: pass
+
+    def resume(self, driver, site):
+        if not self._suspended: return
+        self._suspended = False
+        self.apply(driver, site)
@@ -0,0 +1,96 @@
+import time
+import sqlite3
+import threading
+
+# 스테이징 테이블 컬럼 (id / created_at 제외, 저장 순서)
+COLUMNS = [
+    'shop', 'keyword',
+    'cp_cat', 'nv_cat', 'title', 'tags', 'url',
+    'manufacturer', 'brand', 'model',
+    'cost_basic', 'cost_exchange', 'cost_return',
+]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at    REAL NOT NULL,
+    shop          TEXT,
+    keyword       TEXT,
+    cp_cat        TEXT,
+    nv_cat        TEXT,
+    title         TEXT,
+    tags          TEXT,
+    url           TEXT,
+    manufacturer  TEXT,
+    brand         TEXT,
+    model         TEXT,
+    cost_basic    INTEGER,
+    cost_exchange INTEGER,
+    cost_return   INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_products_created ON products(created_at);
+CREATE INDEX IF NOT EXISTS idx_products_shop_keyword ON products(shop, keyword);
+CREATE INDEX IF NOT EXISTS idx_products_url ON products(url);
+"""
+
+
+class ResultStore:
+    """
+    수집 결과 스테이징 저장소 (SQLite, WAL 모드)
+    - 상품 1개 저장 = INSERT 1번 (엑셀 파일 크기와 무관)
+    - 스레드별 연결을 사용하므로 여러 작업 스레드가 동시에 저장 가능
+    - 엑셀 반영은 ExcelHandler.export_results() 에서 한 번에 수행
+    """
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._conns = []
+        self._conns_lock = threading.Lock()
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._conns_lock:
+                self._conns.append(conn)
+        return conn
+
+    def add(self, row):
+        """row: COLUMNS 키를 가진 dict -> 저장된 id"""
+        conn = self._conn()
+        with conn:
+            cur = conn.execute(
+                f"INSERT INTO products (created_at, {', '.join(COLUMNS)}) "
+                f"VALUES (?, {', '.join('?' * len(COLUMNS))})",
+                [time.time()] + [row.get(col) for col in COLUMNS]
+            )
+        return cur.lastrowid
+
+    def query(self, shop=None, keyword=None, since=None, until=None):
+        """조건(쇼핑몰/키워드/기간, epoch 초)에 맞는 행을 저장 순서대로 반환"""
+        where, params = [], []
+        if shop:
+            where.append("shop = ?"); params.append(shop)
+        if keyword:
+            where.append("keyword = ?"); params.append(keyword)
+        if since is not None:
+            where.append("created_at >= ?"); params.append(since)
+        if until is not None:
+            where.append("created_at < ?"); params.append(until)
+        sql = "SELECT * FROM products"
+        if where: sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY id"
+        return [dict(r) for r in self._conn().execute(sql, params)]
+
+    def close(self):
+        with self._conns_lock:
+            for conn in self._conns:
+                try: conn.close()
+                except Exception: pass
+            self._conns = []
+        self._local = threading.local()
@@ -0,0 +1,157 @@
+import os
+import re
+import threading
+import openpyxl
+from urllib.parse import urlsplit, parse_qsl, urlencode, unquote
+
+# 상품을 식별하는 쿼리 파라미터 (있으면 이 값만 유지하고 나머지 쿼리는 추적용으로 보고 제거)
+_ID_PARAMS = {'id', 'itemid', 'item_id', 'offerid', 'offer_id', 'productid', 'product_id', 'goodsid', 'pid',
+              'goodscode', 'goodsno', 'itemno', 'itemcode', 'prdno', 'product_no'}
+# 식별 파라미터가 없을 때 전체 쿼리에서 빼는 추적용 파라미터
+_TRACKING_PARAMS = {'gclid', 'fbclid', 'spm', 'scm', 'ref', 'ref_', 'tag', 'clickid', 'trackingid'}
+
+_AMAZON_ASIN_RE = re.compile(r"/(?:dp|gp/product|gp/aw/d)/([A-Z0-9]{10})", re.I)
+_EBAY_ITEM_RE = re.compile(r"/itm/(?:[^/]+/)?(\d{6,})")
+
+
+def normalize_url(url):
+    """
+    상품 URL 정규화 (같은 상품이면 같은 문자열이 되도록)
+    - 스킴/www/프래그먼트 제거, 호스트 소문자화
+    - 상품 id 파라미터가 있으면 그것만 유지, 없으면 추적용(utm_* 등)만 뺀 전체 쿼리를 정렬해 유지
+      (id 가 다른 이름의 파라미터에 있는 서로 다른 상품이 하나로 합쳐지지 않도록)
+    - 아마존은 /dp/<ASIN> (광고 링크 /sspa/click 은 url 파라미터 안의 ASIN), 이베이는 /itm/<번호> 로 축약
+    """
+    if not url: return ""
+    url = url.strip()
+    if url.startswith('//'): url = 'https:' + url
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+
+    host = parts.netloc.lower()
+    if host.startswith('www.'): host = host[4:]
+    path = parts.path
+
+    if 'amazon' in host:
+        m = _AMAZON_ASIN_RE.search(path) or _AMAZON_ASIN_RE.search(unquote(parts.query))
+        if m: return f"{host}/dp/{m.group(1).upper()}"
+    if 'ebay' in host:
+        m = _EBAY_ITEM_RE.search(path)
+        if m: return f"{host}/itm/{m.group(1)}"
+
+    path = path.rstrip('/')
+    params = [(k.lower(), v) for k, v in parse_qsl(parts.query, keep_blank_values=True)]
+    query = sorted(p for p in params if p[0] in _ID_PARAMS)
+    if not query:
+        query = sorted(p for p in params if p[0] not in _TRACKING_PARAMS and not p[0].startswith('utm_'))
+    return f"{host}{path}" + (f"?{urlencode(query)}" if query else "")
+
+
+class SeenUrlIndex:
+    """
+    이미 수집한 상품 URL 색인 (정규화된 URL 집합)
+    - 파일(<엑셀파일명>_seen_urls.txt)에 한 줄씩 추가 기록되어 다음 실행에도 유지
+    - 첫 줄에 마지막으로 동기화한 결과 엑셀의 지문(mtime/size)을 저장 -> 엑셀이 바뀐 경우에만 다시 읽고 엑셀 기준으로 파일을 다시 씀
+    """
+    _HEADER_PREFIX = '#workbook '
+
+    def __init__(self, path, log_callback):
+        self.path = path
+        self.log_callback = log_callback
+        self.urls = set()
+        self.workbook_stamp = None
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path): return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line: continue
+                    if line.startswith(self._HEADER_PREFIX):
+                        self.workbook_stamp = line[len(self._HEADER_PREFIX):]
+                        continue
+                    self.urls.add(line)
+        except Exception as e:
+            self.log_callback(f"⚠️ [Seen] 색인 읽기 실패: {e}")
+
+    def __len__(self):
+        return len(self.urls)
+
+    def __contains__(self, url):
+        key = normalize_url(url)
+        return bool(key) and key in self.urls
+
+    def add(self, url):
+        key = normalize_url(url)
+        if not key: return
+        with self._lock:
+            if key in self.urls: return
+            self.urls.add(key)
+            try:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(key + '\n')
+            except Exception as e:
+                self.log_callback(f"⚠️ [Seen] 색인 저장 실패: {e}")
+
+    def update(self, urls):
+        """여러 URL 을 한 번에 추가 (새로 추가된 개수 반환)"""
+        with self._lock:
+            new_keys = [k for k in dict.fromkeys(normalize_url(u) for u in urls) if k and k not in self.urls]
+            self.urls.update(new_keys)
+            self._rewrite()
+        return len(new_keys)
+
+    def _rewrite(self):
+        tmp_path = self.path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                if self.workbook_stamp: f.write(self._HEADER_PREFIX + self.workbook_stamp + '\n')
+                for key in self.urls: f.write(key + '\n')
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            self.log_callback(f"⚠️ [Seen] 색인 저장 실패: {e}")
+
+    @staticmethod
+    def _workbook_stamp(workbook_path):
+        st = os.stat(workbook_path)
+        return f"{st.st_mtime_ns} {st.st_size}"
+
+    def sync_workbook(self, workbook_path, sheet_name, url_column=6, start_row=7):
+        """결과 엑셀의 URL 열을 읽어 색인에 반영 (엑셀이 마지막 동기화 이후 바뀐 경우에만)"""
+        if not os.path.exists(workbook_path): return
+        if self.workbook_stamp == self._workbook_stamp(workbook_path): return
+        try:
+            wb = openpyxl.load_workbook(workbook_path, read_only=True)
+            try:
+                ws = wb[sheet_name]
+                urls = [row[0] for row in ws.iter_rows(min_row=start_row, min_col=url_column, max_col=url_column, values_only=True)
+                        if row and isinstance(row[0], str)]
+            finally:
+                wb.close()
+        except Exception as e:
+            self.log_callback(f"⚠️ [Seen] 결과 엑셀 읽기 실패: {e}")
+            return
+
+        # 엑셀이 바뀌었으면 엑셀 기준으로 색인을 새로 만듦 (엑셀에서 지운 행의 URL 은 다시 수집 가능, 파일도 압축)
+        with self._lock:
+            keys = set(k for k in (normalize_url(u) for u in urls) if k)
+            added, removed = len(keys - self.urls), len(self.urls - keys)
+            self.urls = keys
+            self.workbook_stamp = self._workbook_stamp(workbook_path)
+            self._rewrite()
+        self.log_callback(f"🗂️ [Seen] 기존 수집 URL {len(self.urls)}개 (엑셀에서 {added}개 추가, {removed}개 정리)")
+
+    def stamp_workbook(self, workbook_path):
+        """
+        이 프로그램이 저장한 URL 은 이미 색인에 들어 있으므로,
+        작업 종료 후 엑셀 지문만 갱신해 다음 실행 시 다시 읽지 않도록 함
+        """
+        if not os.path.exists(workbook_path): return
+        with self._lock:
+            self.workbook_stamp = self._workbook_stamp(workbook_path)
+            self._rewrite()
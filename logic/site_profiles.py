@@ -0,0 +1,307 @@
+import os
+import json
+import time
+import threading
+from urllib.parse import quote, urlsplit
+
+# 공통 검색창 식별자 (사이트 전용 식별자 뒤에 이어서 시도)
+COMMON_SEARCH_INPUTS = [
+    "input#q", "input[name='q']", "input#mq",               # 타오바오
+    "input#commonSearchInput", "input[name='k']",           # 라쿠텐
+    "input#gh-ac",                                          # 이베이
+    "input.alisearch-input", "input#alisearch-input",       # 1688
+    "input#twotabsearchtextbox", "input[name='field-keywords']", # 아마존
+    "input#headerSearchKeyword",                            # 쿠팡
+    "input[name='keyword']", "input[type='search']", "input[id*='search']"
+]
+
+# 공통 다음 페이지 버튼 (XPath)
+COMMON_NEXT_BUTTONS = [
+    "//a[contains(text(), 'Next')]", "//a[contains(text(), 'next')]",
+    "//a[contains(text(), '다음')]", "//a[contains(@class, 'next')]",
+    "//li[contains(@class, 'next')]/a"
+]
+
+# 여러 식별자를 브라우저 안에서 순서대로 확인 -> 처음으로 보이는 요소 [식별자 번호, 요소] (없으면 null)
+_PROBE_JS = """
+const selectors = arguments[0], isXpath = arguments[1], needEnabled = arguments[2], minY = arguments[3];
+const usable = el => {
+    if (!el.getClientRects || !el.getClientRects().length) return false;
+    if (needEnabled && (el.disabled || el.readOnly)) return false;
+    if (minY !== null && el.getBoundingClientRect().top + window.scrollY < minY) return false;
+    return true;
+};
+for (let i = 0; i < selectors.length; i++) {
+    try {
+        if (isXpath) {
+            const snap = document.evaluate(selectors[i], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            for (let j = 0; j < snap.snapshotLength; j++) {
+                if (usable(snap.snapshotItem(j))) return [i, snap.snapshotItem(j)];
+            }
+        } else {
+            for (const el of document.querySelectorAll(selectors[i])) {
+                if (usable(el)) return [i, el];
+            }
+        }
+    } catch (e) {}
+}
+return null;
+"""
+
+
+def _merge(primary, extra):
+    """순서를 유지하며 중복 제거"""
+    return list(dict.fromkeys(list(primary) + list(extra)))
+
+
+class SiteProfile:
+    """
+    사이트별 식별자 묶음
+    - match: URL 에 포함되면 이 사이트로 판단하는 문자열 목록
+    - search_inputs / product_links (CSS), next_buttons (XPath)
+    - detail_fields: 상세 페이지 항목별 CSS ({title/brand/manufacturer/specs/description: [CSS, ...]})
+    - login_required: 검색 전에 사용자 로그인 확인이 필요한 사이트
+    - search_url: 검색 결과 N 페이지 주소 템플릿 ({origin}: 쇼핑몰 주소의 스킴+호스트, {keyword}, {page})
+      있으면 검색창 입력/다음 버튼 클릭 없이 주소로 바로 이동 (url_encoding: 검색어 인코딩, 예: 1688 은 gbk)
+    - http_links: 브라우저 없이(HTTP) 읽은 결과 페이지에서 상품 주소를 골라낼 정규식 (있으면 HTTP 수집 가능)
+    """
+    def __init__(self, key, match, search_inputs=(), product_links=(), next_buttons=(), detail_fields=None,
+                 login_required=False, search_url=None, url_encoding='utf-8', http_links=()):
+        self.key = key
+        self.match = [m.lower() for m in match]
+        self.search_inputs = _merge(search_inputs, COMMON_SEARCH_INPUTS)
+        self.product_links = list(product_links)
+        self.next_buttons = _merge(next_buttons, COMMON_NEXT_BUTTONS)
+        self.detail_fields = dict(detail_fields or {})
+        self.login_required = login_required
+        self.search_url = search_url
+        self.url_encoding = url_encoding
+        self.http_links = list(http_links)
+
+    def matches(self, url):
+        url_lower = (url or '').lower()
+        return any(m in url_lower for m in self.match)
+
+    def build_search_url(self, shop_url, keyword, page=1):
+        """검색 결과 page 페이지 주소 (템플릿이 없거나 검색어를 인코딩할 수 없으면 None)"""
+        if not self.search_url: return None
+        parts = urlsplit(shop_url if '://' in shop_url else 'https://' + shop_url)
+        try:
+            encoded = quote(keyword, safe='', encoding=self.url_encoding)
+        except UnicodeEncodeError:
+            return None
+        return self.search_url.format(origin=f"{parts.scheme}://{parts.netloc}", keyword=encoded, page=page)
+
+    def selectors(self, kind):
+        if kind == 'search': return self.search_inputs
+        if kind == 'products': return self.product_links
+        if kind == 'next': return self.next_buttons
+        return self.detail_fields.get(kind, [])
+
+    @classmethod
+    def from_dict(cls, key, data):
+        return cls(
+            key, data.get('match', [key]),
+            search_inputs=data.get('search_inputs', ()),
+            product_links=data.get('product_links', ()),
+            next_buttons=data.get('next_buttons', ()),
+            detail_fields=data.get('detail_fields'),
+            login_required=bool(data.get('login_required', False)),
+            search_url=data.get('search_url'),
+            url_encoding=data.get('url_encoding', 'utf-8'),
+            http_links=data.get('http_links', ())
+        )
+
+
+DEFAULT_PROFILES = [
+    SiteProfile(
+        'ebay', ['ebay'],
+        search_inputs=["input#gh-ac"],
+        product_links=[
+            # 1. [표준] 가장 일반적인 상품 링크 클래스
+            "a.s-item__link",
+            # 2. [제목 기반] 링크가 아니라 제목 텍스트(h3)를 직접 찾음
+            "h3.s-item__title",
+            # 3. href 주소에 '/itm/'이 포함된 모든 링크 (가장 강력함)
+            # 이베이 상품 주소는 무조건 ebay.com/itm/1234... 형식을 따릅니다.
+            "a[href*='/itm/']",
+            # 4. [구조 기반] 상품 정보 박스 안의 첫 번째 링크
+            "div.s-item__info a"
+        ],
+        next_buttons=["//a[contains(@type, 'next')]", "//a[@aria-label='Next page']", "//a[contains(@class, 'pagination__next')]"],
+        detail_fields={'title': ["h1.x-item-title__mainTitle", "h1#itemTitle"]},
+        search_url="{origin}/sch/i.html?_nkw={keyword}&_pgn={page}",
+        http_links=[r"/itm/(?:[^/?#]+/)?\d{6,}"]
+    ),
+    SiteProfile(
+        'rakuten', ['rakuten'],
+        search_inputs=["input#commonSearchInput", "input[name='k']"],
+        product_links=[
+            "div.searchresultitem h2 a",   # [라쿠텐]
+            "div[data-shop-id] h2 a",
+            "a[data-link='item']",
+            "div[class*='title-link-wrapper'] a",
+            "div[class*='title--'] a"
+        ],
+        next_buttons=["//a[@class='nextPage']", "//div[@class='pagination']//a[contains(text(), '次の')]"],
+        detail_fields={'title': ["span.normal_reserve_item_name", "h1"]},
+        search_url="https://search.rakuten.co.jp/search/mall/{keyword}/?p={page}",
+        http_links=[r"//item\.rakuten\.co\.jp/[^/]+/[^/?#]+"]
+    ),
+    SiteProfile(
+        'taobao', ['taobao', 'tmall'],
+        search_inputs=["input#q", "input[name='q']", "input#mq"],
+        product_links=[
+            "div[class*='title--']",       # [타오바오]
+            "a[class*='doubleCardWrapper']",
+            ".ctx-box .title a"
+        ],
+        next_buttons=["//button[contains(@class, 'next-next')]", "//span[contains(text(), '下一页')]"],
+        detail_fields={'title': ["[class*='mainTitle--']", "h1"]},
+        login_required=True
+    ),
+    SiteProfile(
+        '1688', ['1688'],
+        search_inputs=["input.alisearch-input", "input#alisearch-input"],
+        product_links=[
+            "div.title a",
+            ".offer-title a"
+        ],
+        next_buttons=["//a[contains(@class, 'next')]", "//a[contains(text(), '下一页')]"],
+        detail_fields={'title': [".title-text", "h1"]},
+        login_required=True,
+        search_url="https://s.1688.com/selloffer/offer_search.htm?keywords={keyword}&beginPage={page}",
+        url_encoding='gbk'
+    ),
+    SiteProfile(
+        'amazon', ['amazon'],
+        search_inputs=["input#twotabsearchtextbox", "input[name='field-keywords']"],
+        product_links=[
+            "div[data-component-type='s-search-result'] h2 a", # 검색 결과 표준
+            "div.s-result-item h2 a",      # 백업
+            "h2.a-size-mini a",            # 모바일/컴팩트 뷰
+            "a.a-link-normal.s-underline-text" # 최신 텍스트 링크
+        ],
+        next_buttons=["//a[contains(@class, 's-pagination-next')]", "//a[contains(text(), 'Next')]"],
+        detail_fields={
+            'title': ["span#productTitle"],
+            'brand': ["a#bylineInfo"],
+            'specs': ["#productDetails_techSpec_section_1", "#detailBullets_feature_div", "#productOverview_feature_div"],
+            'description': ["#feature-bullets", "#productDescription"]
+        },
+        search_url="{origin}/s?k={keyword}&page={page}"
+    ),
+]
+
+COMMON_PROFILE = SiteProfile(
+    'common', [],
+    product_links=[
+        "[class*='title--']", "[class*='Title--']",
+        "span.a-text-normal", "div.item-name", "a[id*='item-title']",
+        "h1", "h2", "h3"
+    ],
+    detail_fields={'title': ["h1"]}
+)
+
+
+class SiteProfileRegistry:
+    """
+    사이트 프로필 등록소 (실행 시 1회 로드)
+    - 기본 프로필 + site_profiles.json (있으면 사이트 추가/덮어쓰기)
+    - 식별자별 성공 기록을 selector_stats.json 에 저장 -> 마지막으로 성공한 식별자부터 시도
+    - 여러 식별자를 스크립트 1회로 한꺼번에 확인 (식별자마다 따로 기다리지 않음)
+    """
+    def __init__(self, log_callback, profiles_path='site_profiles.json', stats_path='selector_stats.json'):
+        self.log_callback = log_callback
+        self.stats_path = stats_path
+        self.profiles = {p.key: p for p in DEFAULT_PROFILES}
+        self.common = COMMON_PROFILE
+        self.stats = {}  # site -> kind -> selector -> [성공 횟수, 마지막 성공 시각]
+        self._lock = threading.Lock()
+        self._load_custom(profiles_path)
+        self._load_stats()
+
+    def register(self, profile):
+        """프로필 추가/교체 (나중에 등록한 프로필이 같은 키를 덮어씀)"""
+        if profile.key == 'common': self.common = profile
+        else: self.profiles[profile.key] = profile
+
+    def _load_custom(self, path):
+        if not os.path.exists(path): return
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for key, spec in data.items():
+                self.register(SiteProfile.from_dict(key, spec))
+            self.log_callback(f"🧩 [Profile] 사용자 사이트 프로필 {len(data)}개 로드")
+        except Exception as e:
+            self.log_callback(f"⚠️ [Profile] {path} 읽기 실패: {e}")
+
+    def detect(self, url):
+        for profile in self.profiles.values():
+            if profile.matches(url): return profile
+        return self.common
+
+    # ==========================
+    # 식별자 성공 기록
+    # ==========================
+    def _load_stats(self):
+        if not os.path.exists(self.stats_path): return
+        try:
+            with open(self.stats_path, 'r', encoding='utf-8') as f:
+                self.stats = json.load(f)
+        except Exception:
+            self.stats = {}
+
+    def save(self):
+        with self._lock:
+            data = json.dumps(self.stats, ensure_ascii=False)
+        try:
+            with open(self.stats_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+        except Exception as e:
+            self.log_callback(f"⚠️ [Profile] 식별자 기록 저장 실패: {e}")
+
+    def record_hit(self, site, kind, selector):
+        with self._lock:
+            entry = self.stats.setdefault(site, {}).setdefault(kind, {}).setdefault(selector, [0, 0])
+            entry[0] += 1
+            entry[1] = time.time()
+
+    def ordered(self, profile, kind):
+        """프로필 식별자를 마지막 성공 순(동률이면 성공 횟수, 그다음 원래 순서)으로 정렬"""
+        selectors = profile.selectors(kind)
+        with self._lock:
+            stats = self.stats.get(profile.key, {}).get(kind, {})
+            rank = {sel: (-stats[sel][1], -stats[sel][0]) for sel in selectors if sel in stats}
+        return sorted(selectors, key=lambda sel: rank.get(sel, (0, 0)))
+
+    # ==========================
+    # 식별자 탐색
+    # ==========================
+    @staticmethod
+    def probe(driver, selectors, xpath=False, need_enabled=False, min_y=None):
+        """식별자들을 스크립트 1회로 확인 -> (식별자, 요소) / 없으면 (None, None)"""
+        found = driver.execute_script(_PROBE_JS, list(selectors), xpath, need_enabled, min_y)
+        if not found: return None, None
+        return selectors[int(found[0])], found[1]
+
+    def find(self, driver, profile, kind, timeout=0, poll=0.2, need_enabled=False, min_y=None):
+        """
+        학습된 순서로 식별자를 한꺼번에 확인해 처음 찾은 요소 반환 (timeout 초 동안 재확인, 없으면 None)
+        - 찾으면 해당 식별자의 성공 기록 갱신
+        """
+        selectors = self.ordered(profile, kind)
+        if not selectors: return None
+        deadline = time.time() + timeout
+        while True:
+            try:
+                selector, element = self.probe(driver, selectors, xpath=(kind == 'next'),
+                                               need_enabled=need_enabled, min_y=min_y)
+            except Exception:
+                selector, element = None, None
+            if element is not None:
+                self.record_hit(profile.key, kind, selector)
+                return element
+            if time.time() >= deadline: return None
+            time.sleep(poll)
@@ -0,0 +1,105 @@
+import re
+import json
+
+# 구조화 데이터에서 바로 채우는 상품 항목 (원문 그대로, 번역 전)
+STRUCTURED_FIELDS = ('title', 'brand', 'manufacturer', 'model')
+
+# 값이 없다는 뜻으로 쓰이는 표기 (eBay 의 'Does Not Apply', 'Unbranded' 등)
+_EMPTY_VALUES = {'', '-', 'n/a', 'na', 'none', 'null', 'does not apply', 'unbranded', 'generic', 'not applicable'}
+
+# 페이지 안에서 JSON-LD 원문 + 상품(schema.org/Product) microdata 값 수집
+COLLECT_JS = """
+function collectStructured() {
+    const jsonld = [];
+    for (const s of document.querySelectorAll('script[type="application/ld+json"]')) {
+        const t = s.textContent || '';
+        if (t && t.length < 200000) jsonld.push(t);
+    }
+    const micro = {};
+    const scope = document.querySelector('[itemtype*="schema.org/Product" i]');
+    if (scope) {
+        for (const prop of ['name', 'brand', 'manufacturer', 'model', 'mpn']) {
+            const el = scope.querySelector('[itemprop="' + prop + '"]');
+            if (!el) continue;
+            // brand/manufacturer 는 안쪽에 name 속성을 가진 객체인 경우가 많음
+            const inner = prop !== 'name' ? el.querySelector('[itemprop="name"]') : null;
+            const target = inner || el;
+            const value = (target.getAttribute('content') || target.innerText || '').trim();
+            if (value) micro[prop] = value.slice(0, 200);
+        }
+    }
+    return {jsonld: jsonld, micro: micro};
+}
+"""
+STRUCTURED_JS = COLLECT_JS + "return collectStructured();"
+
+_JSON_LD_RE = re.compile(r'<script[^>]+application/ld\+json[^>]*>(.*?)</script>', re.S | re.I)
+
+
+def json_ld_blocks(html):
+    """HTML 원문 -> JSON-LD 스크립트 내용 목록 (HTTP 수집용)"""
+    return _JSON_LD_RE.findall(html or '')
+
+
+def _clean(value):
+    """JSON-LD/microdata 값 -> 문자열 (객체면 name, 목록이면 첫 값, '없음' 표기는 빈 문자열)"""
+    if isinstance(value, list): value = value[0] if value else ''
+    if isinstance(value, dict): value = value.get('name') or ''
+    text = " ".join(str(value or '').split())[:200]
+    return '' if text.lower() in _EMPTY_VALUES else text
+
+
+def _iter_nodes(data):
+    if isinstance(data, list):
+        for node in data: yield from _iter_nodes(node)
+    elif isinstance(data, dict):
+        yield data
+        if '@graph' in data: yield from _iter_nodes(data['@graph'])
+
+
+def _is_product(node):
+    types = node.get('@type')
+    types = types if isinstance(types, list) else [types]
+    return any(str(t).lower() in ('product', 'productgroup', 'individualproduct') for t in types)
+
+
+def parse_json_ld(texts):
+    """JSON-LD 원문 목록 -> 첫 번째 Product 의 {title, brand, manufacturer, model} (없으면 빈 dict)"""
+    for raw in texts:
+        try:
+            data = json.loads(raw.strip().rstrip(';'))
+        except (ValueError, TypeError):
+            continue
+        for node in _iter_nodes(data):
+            if not _is_product(node): continue
+            return {
+                'title': _clean(node.get('name')),
+                'brand': _clean(node.get('brand')),
+                'manufacturer': _clean(node.get('manufacturer')),
+                'model': _clean(node.get('model')) or _clean(node.get('mpn')),
+            }
+    return {}
+
+
+def merge_fields(*sources):
+    """앞의 출처를 우선해 항목별로 처음 나오는 값 사용 -> 값이 있는 항목만"""
+    merged = {}
+    for source in sources:
+        for field in STRUCTURED_FIELDS:
+            value = _clean((source or {}).get(field))
+            if value and field not in merged: merged[field] = value
+    return merged
+
+
+def structured_fields(collected):
+    """
+    수집 결과 -> {title, brand, manufacturer, model} 중 찾은 항목
+    - 우선순위: JSON-LD > microdata (사양표 항목은 표기가 제각각이라 사용하지 않음)
+    """
+    collected = collected or {}
+    micro = collected.get('micro') or {}
+    return merge_fields(
+        parse_json_ld(collected.get('jsonld') or []),
+        {'title': micro.get('name'), 'brand': micro.get('brand'),
+         'manufacturer': micro.get('manufacturer'), 'model': micro.get('model') or micro.get('mpn')}
+    )
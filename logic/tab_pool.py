@@ -0,0 +1,101 @@
+import time
+from collections import deque
+
+
+class DetailTabPool:
+    """
+    상세 페이지 미리 열기용 백그라운드 탭 묶음
+    - 목록 페이지(메인 탭)는 그대로 두고, 상세 URL 을 새 탭으로 바로 엶 (클릭/뒤로가기/목록 재로딩 없음)
+    - 현재 상품을 읽는 동안 다음 상품 탭들이 미리 로딩됨
+    - 본문 추출이 끝난 탭은 바로 닫음
+    """
+    def __init__(self, driver, log_callback, size=3, load_timeout=15, waits=None, site='common', prepare_tab=None):
+        self.driver = driver
+        self.log_callback = log_callback
+        self.size = max(1, size)
+        self.load_timeout = load_timeout
+        self.waits = waits  # WaitEngine (있으면 사이트별 학습된 대기 사용)
+        self.site = site
+        self.prepare_tab = prepare_tab  # 새 탭에서 로딩 전에 실행 (예: 리소스 차단 적용)
+        self.main_window = driver.current_window_handle
+        self.tabs = deque()  # (탭 핸들, URL, 상품명)
+
+    def __len__(self):
+        return len(self.tabs)
+
+    def free_slots(self):
+        return self.size - len(self.tabs)
+
+    def open(self, url, name):
+        """백그라운드 탭에서 상세 페이지 로딩 시작 (메인 탭에 그대로 머묾)"""
+        driver = self.driver
+        try:
+            before = set(driver.window_handles)
+            # 로딩 전 준비가 필요하면 빈 탭을 먼저 열고, 준비 후 주소 이동 (완료를 기다리지 않음)
+            driver.execute_script("window.open(arguments[0], '_blank');", 'about:blank' if self.prepare_tab else url)
+            new_tabs = [h for h in driver.window_handles if h not in before]
+            if new_tabs and self.prepare_tab:
+                driver.switch_to.window(new_tabs[-1])
+                self.prepare_tab()
+                driver.execute_script("window.location.href = arguments[0];", url)
+            if not new_tabs:
+                # 팝업 차단 등으로 열리지 않으면 직접 새 탭을 만들어 이동 (이 경우 로딩 완료까지 대기)
+                driver.switch_to.new_window('tab')
+                new_tabs = [driver.current_window_handle]
+                if self.prepare_tab: self.prepare_tab()
+                driver.get(url)
+            self.tabs.append((new_tabs[-1], url, name))
+            return True
+        except Exception as e:
+            self.log_callback(f"   ⚠️ 상세 탭 열기 실패: {e}")
+            return False
+        finally:
+            try: driver.switch_to.window(self.main_window)
+            except: pass
+
+    def take(self):
+        """
+        가장 먼저 연 탭으로 이동해 로딩 완료까지 대기 -> (URL, 상품명), 열 탭이 없으면 None
+        - 닫혀버린 탭은 건너뜀. 사용 후 release() 로 닫아야 함
+        """
+        while self.tabs:
+            handle, url, name = self.tabs.popleft()
+            try:
+                self.driver.switch_to.window(handle)
+            except Exception:
+                continue
+            self._wait_loaded()
+            return url, name
+        return None
+
+    def _wait_loaded(self):
+        if self.waits is not None and self.waits.enabled:
+            # 미리 로딩된 탭은 실제 로딩 시간보다 짧게 측정되므로 학습 기록에서 제외
+            self.waits.wait_ready(self.site, fallback=0, record=False)
+            return
+        deadline = time.time() + self.load_timeout
+        while time.time() < deadline:
+            try:
+                if self.driver.execute_script("return document.readyState") == 'complete': return
+            except Exception:
+                return
+            time.sleep(0.2)
+
+    def release(self):
+        """현재(상세) 탭을 닫고 메인 탭으로 복귀"""
+        try:
+            if self.driver.current_window_handle != self.main_window: self.driver.close()
+        except: pass
+        try: self.driver.switch_to.window(self.main_window)
+        except: pass
+
+    def close_all(self):
+        """아직 읽지 않은 탭 정리 (목표 달성/중지 시)"""
+        while self.tabs:
+            handle, _, _ = self.tabs.popleft()
+            try:
+                self.driver.switch_to.window(handle)
+                self.driver.close()
+            except: pass
+        try: self.driver.switch_to.window(self.main_window)
+        except: pass
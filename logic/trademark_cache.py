@@ -0,0 +1,75 @@
+import time
+import sqlite3
+import threading
+import unicodedata
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trademarks (
+    brand_key   TEXT PRIMARY KEY,
+    allowed     INTEGER NOT NULL,   -- 1: 등록 상표 없음(사용 가능) / 0: 상표권 존재
+    count       INTEGER NOT NULL,   -- KIPRIS 검색 결과 건수
+    hits        INTEGER NOT NULL DEFAULT 0,
+    checked_at  REAL NOT NULL,
+    last_hit_at REAL
+);
+"""
+
+_DAY = 24 * 60 * 60
+
+
+def normalize_brand(brand):
+    """브랜드 캐시 키 (전각/반각 통일, 공백 정리, 대문자)"""
+    if brand is None: return ""
+    text = unicodedata.normalize('NFKC', str(brand))
+    return " ".join(text.split()).upper()
+
+
+class TrademarkCache:
+    """
+    KIPRIS 상표 조회 결과 영구 캐시 (SQLite)
+    - 모든 키워드/쇼핑몰/실행에서 공유
+    - 상표 발견(사용 불가) / 미발견(사용 가능) 결과의 만료 기간을 따로 설정
+    """
+    def __init__(self, db_path, found_ttl_days=90, clear_ttl_days=14):
+        self.db_path = db_path
+        self.found_ttl = found_ttl_days * _DAY
+        self.clear_ttl = clear_ttl_days * _DAY
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def get(self, brand):
+        """캐시된 판정 (True=사용 가능, False=상표권 존재), 없거나 만료되었으면 None"""
+        key = normalize_brand(brand)
+        if not key: return None
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT allowed, checked_at FROM trademarks WHERE brand_key = ?", (key,)
+            ).fetchone()
+            if row is None: return None
+            allowed, checked_at = bool(row[0]), row[1]
+            ttl = self.clear_ttl if allowed else self.found_ttl
+            if now - checked_at > ttl: return None
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE trademarks SET hits = hits + 1, last_hit_at = ? WHERE brand_key = ?", (now, key)
+                )
+        return allowed
+
+    def put(self, brand, allowed, count=0):
+        key = normalize_brand(brand)
+        if not key: return
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO trademarks (brand_key, allowed, count, hits, checked_at) VALUES (?, ?, ?, 0, ?) "
+                "ON CONFLICT(brand_key) DO UPDATE SET allowed = excluded.allowed, count = excluded.count, "
+                "checked_at = excluded.checked_at",
+                (key, int(bool(allowed)), int(count), time.time())
+            )
+
+    def close(self):
+        with self._lock:
+            try: self._conn.close()
+            except Exception: pass
@@ -0,0 +1,209 @@
+import os
+import json
+import time
+import random
+import socket
+import threading
+
+# 한 번의 스크립트 실행으로 준비 상태를 모두 확인 (readyState / 현재 URL / 식별자 존재 / 로딩된 리소스 수)
+_PROBE_JS = """
+const selectors = arguments[0];
+let found = selectors.length === 0;
+for (const sel of selectors) {
+    try { if (document.querySelector(sel)) { found = true; break; } } catch (e) {}
+}
+// 리소스 수: getEntriesByType 버퍼는 기본 250개에서 멈추므로 PerformanceObserver 로 누적 (무거운 페이지도 유휴 판단 가능)
+if (window.__waitResources === undefined) {
+    window.__waitResources = 0;
+    try {
+        performance.setResourceTimingBufferSize(10000);
+        new PerformanceObserver(list => { window.__waitResources += list.getEntries().length; })
+            .observe({type: 'resource', buffered: true});
+    } catch (e) { window.__waitResources = -1; }
+}
+let resources = window.__waitResources;
+if (resources < 0) {
+    try { resources = performance.getEntriesByType('resource').length; } catch (e) { resources = 0; }
+}
+return [document.readyState, location.href, found, resources];
+"""
+
+_MAX_SAMPLES = 50
+
+
+class WaitEngine:
+    """
+    조건 기반 대기 (고정 sleep 대체)
+    - 실제 준비 신호를 기다림: readyState, 사이트 상품 식별자 등장, 네트워크 유휴(리소스 수 변화 없음), URL 변경
+    - 사이트별 최대 대기시간 + 실제 로딩 시간 기록 -> 충분히 쌓이면 p95 기준으로 대기 상한을 줄임 (wait_stats.json)
+    - 사람처럼 보이기 위한 지연(pause)은 로딩 대기와 분리해 따로 설정
+    - enabled=False 이면 기존처럼 지정된 시간만큼 고정 대기
+    """
+    def __init__(self, log_callback, stats_path='wait_stats.json', enabled=True, default_timeout=15.0,
+                 site_timeouts=None, jitter=(1.0, 3.0), idle_window=0.5, idle_cap=2.0, poll=0.15):
+        self.log_callback = log_callback
+        self.stats_path = stats_path
+        self.enabled = enabled
+        self.default_timeout = default_timeout
+        self.site_timeouts = dict(site_timeouts or {})
+        self.jitter = (min(jitter), max(jitter))
+        self.idle_window = idle_window  # 리소스 수가 이 시간 동안 그대로면 유휴로 판단
+        self.idle_cap = idle_cap        # 다른 조건이 충족된 뒤 유휴를 기다리는 최대 시간 (광고/폴링 페이지 대비)
+        self.poll = poll
+        self.driver = None
+
+        self.samples = {}  # site -> 최근 로딩 시간(초) 목록
+        self._lock = threading.Lock()
+        self._load_stats()
+
+    def bind(self, driver):
+        self.driver = driver
+
+    def share_stats(self, other):
+        """다른 브라우저 작업자의 WaitEngine 과 로딩 시간 기록을 함께 사용 (저장은 원래 엔진에서)"""
+        self.samples = other.samples
+        self._lock = other._lock
+
+    # ==========================
+    # 학습된 로딩 시간
+    # ==========================
+    def _load_stats(self):
+        if not os.path.exists(self.stats_path): return
+        try:
+            with open(self.stats_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.samples = {site: [float(v) for v in values][-_MAX_SAMPLES:] for site, values in data.items()}
+        except Exception:
+            self.samples = {}
+
+    def save(self):
+        with self._lock:
+            data = {site: values[-_MAX_SAMPLES:] for site, values in self.samples.items()}
+        try:
+            with open(self.stats_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+        except Exception as e:
+            self.log_callback(f"⚠️ [Wait] 로딩 시간 기록 저장 실패: {e}")
+
+    def _record(self, site, elapsed):
+        with self._lock:
+            values = self.samples.setdefault(site, [])
+            values.append(round(elapsed, 3))
+            del values[:-_MAX_SAMPLES]
+
+    def p95(self, site):
+        """사이트 로딩 시간 p95 (기록이 5개 미만이면 None)"""
+        with self._lock:
+            values = sorted(self.samples.get(site, []))
+        if len(values) < 5: return None
+        return values[min(len(values) - 1, int(len(values) * 0.95))]
+
+    def timeout_for(self, site):
+        """대기 상한: 설정된 사이트별 최대값 이내에서 학습된 p95 의 2배 (최소 3초)"""
+        limit = self.site_timeouts.get(site, self.default_timeout)
+        learned = self.p95(site)
+        if learned is None: return limit
+        return min(limit, max(3.0, learned * 2))
+
+    # ==========================
+    # 대기
+    # ==========================
+    def _probe(self, selectors):
+        return self.driver.execute_script(_PROBE_JS, list(selectors or []))
+
+    def wait_ready(self, site, selectors=None, old_url=None, url_grace=None, fallback=3.0, record=True):
+        """
+        페이지 준비될 때까지 대기 -> 준비되면 True, 시간 초과면 False
+        - selectors: 이 중 하나라도 나타나야 준비 완료 (없으면 확인 안 함)
+        - old_url: 주어지면 URL 이 바뀐 뒤부터 준비 확인 (url_grace 초 안에 안 바뀌면 같은 URL 로딩으로 간주, 예: AJAX 페이지 이동)
+        - fallback: 비활성화 시 고정 대기 시간 (기존 동작)
+        """
+        if not self.enabled or self.driver is None:
+            time.sleep(fallback)
+            return True
+
+        start = time.time()
+        deadline = start + self.timeout_for(site)
+        met_since = None
+        last_resources, resources_since = -1, start
+        while time.time() < deadline:
+            try:
+                state, url, found, resources = self._probe(selectors)
+            except Exception:
+                # 페이지 전환 중에는 스크립트가 실패할 수 있음
+                time.sleep(self.poll)
+                continue
+
+            now = time.time()
+            if resources != last_resources:
+                last_resources, resources_since = resources, now
+
+            url_ok = old_url is None or url != old_url or (url_grace is not None and now - start >= url_grace)
+            # 식별자를 확인하는 경우에는 DOM 만 준비되어도(interactive) 충분
+            ready = url_ok and found and (state == 'complete' or (bool(selectors) and state == 'interactive'))
+            if ready:
+                if met_since is None: met_since = now
+                idle = now - resources_since >= self.idle_window
+                if idle or now - met_since >= self.idle_cap:
+                    if record: self._record(site, now - start)
+                    return True
+            else:
+                met_since = None
+            time.sleep(self.poll)
+
+        if record: self._record(site, time.time() - start)
+        return False
+
+    def wait_for_navigation(self, site, old_handles, old_url, timeout=None):
+        """
+        클릭 후 새 탭이 열리거나 현재 탭의 URL 이 바뀔 때까지 대기
+        -> 새 탭 핸들 / 'same'(같은 탭 이동) / None(변화 없음)
+        """
+        if not self.enabled or self.driver is None:
+            time.sleep(3)
+        deadline = time.time() + (timeout or self.timeout_for(site))
+        while True:
+            try:
+                handles = self.driver.window_handles
+                new_tabs = [h for h in handles if h not in old_handles]
+                if new_tabs: return new_tabs[-1]
+                if self.driver.current_url != old_url: return 'same'
+            except Exception:
+                pass
+            if not self.enabled or time.time() >= deadline: return None
+            time.sleep(self.poll)
+
+    def wait_idle(self, max_wait=1.5, fallback=1.5):
+        """스크롤 후 추가 로딩(lazy load)이 잠잠해질 때까지 대기 (최대 max_wait 초)"""
+        if not self.enabled or self.driver is None:
+            time.sleep(fallback)
+            return
+        deadline = time.time() + max_wait
+        last, since = -1, time.time()
+        while time.time() < deadline:
+            try: _, _, _, resources = self._probe(())
+            except Exception: resources = last
+            now = time.time()
+            if resources != last: last, since = resources, now
+            elif now - since >= self.idle_window: return
+            time.sleep(self.poll)
+
+    def wait_port(self, port, host='127.0.0.1', timeout=15.0, fallback=3.0):
+        """브라우저 디버그 포트가 열릴 때까지 대기 (크롬 실행 직후) -> 열리면 True"""
+        if not self.enabled:
+            time.sleep(fallback)
+            return True
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            try:
+                with socket.create_connection((host, port), timeout=self.poll):
+                    return True
+            except OSError:
+                time.sleep(self.poll)
+        return False
+
+    def pause(self, scale=1.0):
+        """사람처럼 보이기 위한 지연 (로딩 대기와 별개, 설정된 범위에서 무작위)"""
+        low, high = self.jitter
+        if high <= 0: return
+        time.sleep(random.uniform(low, high) * scale)
@@ -0,0 +1,94 @@
+import os
+import time
+import openpyxl
+
+
+class WorkbookWriter:
+    """
+    작업 동안 워크북을 열어둔 채로 행을 추가하는 버퍼 라이터
+    - 다음 빈 행 번호를 기억하므로 매번 빈 행을 찾지 않음
+    - N행마다 또는 T초마다, 그리고 close() 시에만 디스크에 기록
+      (새 행이 없는 동안에도 T초가 지나면 저장되도록 호출 측에서 flush_if_due() 를 주기적으로 호출)
+    - 임시 파일에 저장 후 os.replace 로 교체 (저장 도중 종료되어도 원본 보존)
+    """
+    def __init__(self, path, sheet_name, log_callback, flush_every=10, flush_interval=30.0,
+                 start_row=7, key_column=4, on_flush=None, output_path=None, clear_existing=False):
+        self.path = path
+        self.output_path = output_path or path  # 다른 파일로 저장할 경우 (path 는 양식으로만 사용)
+        self.sheet_name = sheet_name
+        self.log_callback = log_callback
+        self.flush_every = max(1, flush_every)
+        self.flush_interval = flush_interval
+        self.start_row = start_row
+        self.key_column = key_column  # 빈 행 판정 기준 열 (4열 = 상품명)
+        self.on_flush = on_flush
+        self.clear_existing = clear_existing  # True 면 기존 결과 행을 지우고 start_row 부터 기록
+
+        self.wb = None
+        self.ws = None
+        self.next_row = start_row
+        self.pending = 0
+        self.last_flush = time.monotonic()
+
+    def open(self):
+        if self.wb is not None: return
+        self.wb = openpyxl.load_workbook(self.path)
+        self.ws = self.wb[self.sheet_name]
+
+        if self.clear_existing and self.ws.max_row >= self.start_row:
+            self.ws.delete_rows(self.start_row, self.ws.max_row - self.start_row + 1)
+
+        # 빈 행 찾기 (열 때 1회만)
+        row = self.start_row
+        while self.ws.cell(row=row, column=self.key_column).value is not None:
+            row += 1
+        self.next_row = row
+        self.last_flush = time.monotonic()
+
+    def append(self, values):
+        """values: {열 번호: 값} -> 기록한 행 번호 반환"""
+        self.open()
+        row = self.next_row
+        for col, val in values.items():
+            self.ws.cell(row=row, column=col, value=val)
+        self.next_row += 1
+        self.pending += 1
+
+        if self.pending >= self.flush_every: self.flush()
+        else: self.flush_if_due()
+        return row
+
+    def flush_if_due(self):
+        """저장하지 않은 행이 있고 마지막 저장 후 T초가 지났으면 저장"""
+        if self.pending and (time.monotonic() - self.last_flush) >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        if self.wb is None or self.pending == 0: return
+        directory, name = os.path.split(os.path.abspath(self.output_path))
+        tmp_path = os.path.join(directory, f".~{name}.tmp")
+        try:
+            with open(tmp_path, 'wb') as f:
+                self.wb.save(f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.output_path)
+        except Exception as e:
+            # 엑셀에서 파일을 열어둔 경우 등 -> 버퍼는 유지하고 다음 주기에 재시도
+            self.log_callback(f"❌ [Excel] 저장 실패 (다음 주기에 재시도): {e}")
+            try: os.remove(tmp_path)
+            except OSError: pass
+            return
+
+        self.log_callback(f"💾 [Excel] {self.pending}개 행 저장 완료 (다음 빈 행: {self.next_row})")
+        self.pending = 0
+        self.last_flush = time.monotonic()
+        if self.on_flush: self.on_flush()
+
+    def close(self):
+        if self.wb is None: return
+        self.flush()
+        try: self.wb.close()
+        except Exception: pass
+        self.wb = None
+        self.ws = None
@@ -0,0 +1,56 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+import pytest
+
+
+class StubServer:
+    """
+    로컬 HTTP 대역 서버 (외부 API 대신 사용)
+    - handle(method, path, query, body) -> (HTTP 코드, Content-Type, 응답 bytes)
+    - 요청마다 별도 스레드에서 처리 (동시 요청 측정 가능)
+    """
+    def __init__(self, handle):
+        class Handler(BaseHTTPRequestHandler):
+            def _reply(self, method):
+                parts = urlsplit(self.path)
+                body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                status, content_type, payload = handle(method, parts.path, parse_qs(parts.query), body)
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                self._reply('GET')
+
+            def do_POST(self):
+                self._reply('POST')
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub_server():
+    """stub_server(handle) -> 실행 중인 StubServer (테스트가 끝나면 종료)"""
+    servers = []
+
+    def start(handle):
+        server = StubServer(handle)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
@@ -0,0 +1,92 @@
+import threading
+import time
+
+import pytest
+
+from logic.kipris_client import KiprisClient
+
+# 키별 응답 방식: ok (정상) / 500 (서버 오류) / err (errMsg 포함 응답)
+_OK_XML = ("<response><header><resultCode>00</resultCode></header>"
+           "<count><totalCount>{count}</totalCount></count><body><items/></body></response>")
+_ERR_XML = "<response><header><errMsg>SERVICE KEY IS NOT REGISTERED</errMsg></header></response>"
+
+
+class StubKipris:
+    """KIPRIS 상표 검색 형식의 XML 응답 (요청 기록 + 키별 동시 요청 수 측정)"""
+    def __init__(self, modes, counts=None, delay=0.0):
+        self.modes = modes
+        self.counts = counts or {}
+        self.delay = delay
+        self.calls = []
+        self.active = {}
+        self.peak = {}
+        self.lock = threading.Lock()
+
+    def handle(self, method, path, query, body):
+        key, brand = query['ServiceKey'][0], query['searchString'][0]
+        with self.lock:
+            self.calls.append((key, brand))
+            self.active[key] = self.active.get(key, 0) + 1
+            self.peak[key] = max(self.peak.get(key, 0), self.active[key])
+        try:
+            time.sleep(self.delay)
+            mode = self.modes.get(key, 'ok')
+            if mode == '500': return 500, 'text/plain', b"error"
+            if mode == 'err': return 200, 'application/xml', _ERR_XML.encode()
+            return 200, 'application/xml', _OK_XML.format(count=self.counts.get(brand, 0)).encode()
+        finally:
+            with self.lock:
+                self.active[key] -= 1
+
+
+@pytest.fixture
+def make_client(stub_server):
+    clients = []
+
+    def make(keys, modes, counts=None, delay=0.0, **kwargs):
+        stub = StubKipris(modes, counts, delay)
+        server = stub_server(stub.handle)
+        client = KiprisClient(keys, lambda msg: None, api_url=f"{server.url}/getWordSearch", **kwargs)
+        clients.append(client)
+        return stub, client
+
+    yield make
+    for client in clients:
+        client.close()
+
+
+def test_rotates_key_on_server_error(make_client):
+    stub, client = make_client(['bad', 'good'], {'bad': '500'}, counts={'Sony': 12})
+    assert client.lookup('Sony') == (False, 12)
+    assert stub.calls == [('bad', 'Sony'), ('good', 'Sony')]
+    assert client.current_idx == 1
+
+
+def test_rotates_key_on_error_message(make_client):
+    stub, client = make_client(['expired', 'good'], {'expired': 'err'})
+    assert client.lookup('Acme') == (True, 0)
+    assert [key for key, _ in stub.calls] == ['expired', 'good']
+    assert client.current_idx == 1
+
+
+def test_all_keys_failing_passes_without_count(make_client):
+    stub, client = make_client(['a', 'b'], {'a': '500', 'b': 'err'})
+    assert client.lookup('Acme') == (True, None)
+    assert len(stub.calls) == 2
+
+
+def test_lookup_many_deduplicates_brands(make_client):
+    stub, client = make_client(['k'], {}, counts={'Sony': 3})
+    results = client.lookup_many(['Sony', ' sony', 'SONY', 'Acme', 'Ａｃｍｅ'])
+    assert sorted(brand for _, brand in stub.calls) == ['Acme', 'Sony']
+    assert results == {'Sony': (False, 3), ' sony': (False, 3), 'SONY': (False, 3),
+                       'Acme': (True, 0), 'Ａｃｍｅ': (True, 0)}
+
+
+def test_per_key_limit_bounds_concurrent_requests(make_client):
+    stub, client = make_client(['k'], {}, delay=0.1, max_workers=6, per_key_limit=2)
+    brands = [f"brand{i}" for i in range(6)]
+    results = client.lookup_many(brands)
+    assert len(stub.calls) == 6
+    assert all(results[brand] == (True, 0) for brand in brands)
+    assert stub.peak['k'] == 2
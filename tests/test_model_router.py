@@ -0,0 +1,146 @@
+import json
+import time
+
+import pytest
+from google.genai import types
+
+import logic.processor as processor_module
+from config_manager import ConfigManager
+from logic.processor import SourcingProcessor
+
+_GOOD = '{"is_valid": true, "productTitle": "무선 이어폰", "manufacturer": "", "brand": "Sony", "model": "", "keywords": []}'
+_TRUNCATED = '{"is_valid": true, "productTitle": "무선'
+
+
+class StubGemini:
+    """
+    generateContent 형식 응답 (모델별 지연/HTTP 코드/응답 본문을 테스트 중에 바꿀 수 있음)
+    - calls: 요청을 받은 모델 순서
+    """
+    def __init__(self, models):
+        self.models = models
+        self.calls = []
+
+    def handle(self, method, path, query, body):
+        model = path.split('/models/')[1].split(':')[0]
+        self.calls.append(model)
+        spec = self.models[model]
+        time.sleep(spec.get('latency', 0))
+        status = spec.get('status', 200)
+        if status == 200:
+            payload = {'candidates': [{'content': {'parts': [{'text': spec.get('text', _GOOD)}], 'role': 'model'}}],
+                       'usageMetadata': {'totalTokenCount': 10}}
+        else:
+            payload = {'error': {'code': status, 'message': 'internal error', 'status': 'INTERNAL'}}
+        return status, 'application/json', json.dumps(payload).encode()
+
+
+@pytest.fixture
+def gemini(stub_server, monkeypatch):
+    """대역 서버 + genai.Client 가 대역 서버로 요청하도록 주소만 변경 (generate_content 는 실제 클라이언트 그대로)"""
+    stub = StubGemini({'slow': {'latency': 0.06}, 'fast': {'latency': 0.005}})
+    server = stub_server(stub.handle)
+    real_client = processor_module.genai.Client
+    monkeypatch.setattr(processor_module.genai, 'Client', lambda api_key: real_client(
+        api_key=api_key, http_options=types.HttpOptions(base_url=server.url)))
+    return stub
+
+
+@pytest.fixture
+def make_processor(gemini, tmp_path, monkeypatch):
+    """실제 SourcingProcessor (임시 폴더에서 실행, 모델 'slow' -> 'fast' 순서, 한도는 넉넉하게)"""
+    monkeypatch.chdir(tmp_path)
+    opened = []
+
+    def make(**overrides):
+        config = dict(ConfigManager.DEFAULTS)
+        config.update({
+            'GEMINI_API_KEY': 'key-1', 'KIPRIS_API_KEY': '', 'EXCEL_FILE': str(tmp_path / 'result.xlsx'),
+            'AI_MODELS': 'slow,fast', 'AI_CACHE_ENABLED': '0',
+            'AI_RATE_LIMITS': 'slow:1000/100000000/100000,fast:1000/100000000/100000',
+            # 오류 뒤 1초 대기 후 재배정되므로 제외 시간은 그보다 길게
+            'AI_BREAKER_ERRORS': '2', 'AI_BREAKER_COOLDOWN': '1.5',
+        })
+        config.update(overrides)
+        proc = SourcingProcessor(config, lambda msg: None)
+        # 기록 3건이면 판단, 기록이 부족한 모델은 항상 먼저 시도 (무작위 탐색 대신 결정적으로)
+        proc.model_router.min_samples = 3
+        proc.model_router.explore = 1.0
+        opened.append(proc)
+        return proc
+
+    yield make
+    for proc in opened:
+        proc.kipris.close()
+        proc.trademark_cache.close()
+
+
+def translate(proc, times=1):
+    return [proc._call_gemini_with_retry(f"translate {i}", "번역") for i in range(times)]
+
+
+def test_fastest_healthy_model_first(make_processor, gemini):
+    proc = make_processor()
+    router = proc.model_router
+    assert router.order('번역') == ['slow', 'fast']
+
+    # 설정 순서대로 기록을 쌓고, 기록이 부족한 빠른 모델도 시도한 뒤 빠른 모델로 이동
+    assert all(translate(proc, 6))
+    assert gemini.calls == ['slow'] * 3 + ['fast'] * 3
+    assert router.order('번역') == ['fast', 'slow']
+    p50, _, quality, count = router.summary('번역', 'fast')
+    assert count == 3 and quality == 1.0 and p50 < router.summary('번역', 'slow')[0]
+
+    translate(proc)
+    assert gemini.calls[-1] == 'fast'
+
+
+def test_quality_floor_for_extraction(make_processor, gemini):
+    proc = make_processor()
+    router = proc.model_router
+    # 빠른 모델이 정보추출에서 잘린 JSON 을 돌려줌 -> 해석 실패로 기록되어 품질 기준 미달
+    gemini.models['fast']['text'] = _TRUNCATED
+    results = [proc.extract_full_info(f"Wireless earbuds {i}") for i in range(6)]
+    assert results[:3] == [results[0]] * 3 and results[0]['brand'] == 'Sony'
+    assert results[3:] == [None] * 3
+    assert router.summary('정보추출', 'fast')[2] == 0.0
+    assert router.order('정보추출') == ['slow', 'fast']
+    assert proc.extract_full_info("Wireless earbuds 6") is not None
+    assert gemini.calls[-1] == 'slow'
+
+    # 다른 작업은 빠른 모델 사용 (작업별 기록)
+    gemini.models['fast']['text'] = _GOOD
+    translate(proc, 6)
+    assert router.order('번역')[0] == 'fast'
+
+
+def test_breaker_readmits_model_after_cooldown(make_processor, gemini):
+    # 오류 2건이 성공률에 남아도 품질 기준은 넘도록 낮춤 (차단기 동작만 확인)
+    proc = make_processor(AI_QUALITY_FLOOR='0.5')
+    router = proc.model_router
+    translate(proc, 6)
+    assert router.order('번역')[0] == 'fast'
+
+    # 빠른 모델 연속 오류 2회 -> 제외되고 같은 요청은 느린 모델로 처리
+    gemini.models['fast']['status'] = 500
+    del gemini.calls[:]
+    assert translate(proc) == [_GOOD]
+    assert gemini.calls == ['fast', 'fast', 'slow']
+    assert router.is_open('fast')
+    assert router.order('번역') == ['slow']
+    # 모델이 제외되었으므로 키는 차단하지 않음
+    assert router.key_available(0)
+
+    gemini.models['fast']['status'] = 200
+    time.sleep(max(0.0, router.open_until['fast'] - time.time()) + 0.05)
+    assert not router.is_open('fast')
+    translate(proc)
+    assert gemini.calls[-1] == 'fast'
+    assert router.failures.get('fast') is None
+
+
+def test_stats_survive_restart(make_processor, gemini):
+    proc = make_processor()
+    translate(proc, 6)
+    proc.model_router.save()
+    assert make_processor().model_router.order('번역') == ['fast', 'slow']